@@ -7,10 +7,11 @@ from pydantic import BaseModel
 from typing import Dict, Any, List
 import asyncio
 import json
-import subprocess
 import logging
 from pathlib import Path
 
+from app.services.mcp_prefetch import mcp_prefetcher
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
@@ -32,8 +33,25 @@ class MCPResponse(BaseModel):
 # MCP 서버 경로
 MCP_SERVER_PATH = Path(__file__).parent.parent.parent.parent / "mcp-servers" / "pykrx-server"
 
-async def call_mcp_tool(tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
-    """MCP 서버의 도구를 호출합니다."""
+# MCP 도구 호출 제한 시간 (초)
+MCP_CALL_TIMEOUT = 30
+
+class MCPUnavailableError(RuntimeError):
+    """MCP 서버 호출 실패 (기본 데이터 대체를 허용하지 않은 경우)"""
+
+async def call_mcp_tool(tool_name: str, parameters: Dict[str, Any], allow_fallback: bool = True) -> Dict[str, Any]:
+    """MCP 서버의 도구를 호출합니다. (allow_fallback=False면 기본 데이터 대신 MCPUnavailableError)
+
+    워크플로우 생성 중 같은 호출을 선행 조회했다면 그 결과를 사용합니다.
+    """
+    prefetched = await mcp_prefetcher.take(tool_name, parameters)
+    if prefetched is not None:
+        logger.info(f"MCP tool call served from prefetch: {tool_name}")
+        return prefetched
+    return await fetch_from_server(tool_name, parameters, allow_fallback)
+
+async def fetch_from_server(tool_name: str, parameters: Dict[str, Any], allow_fallback: bool = True) -> Dict[str, Any]:
+    """MCP 서버 프로세스로 도구 호출 (선행 조회 결과를 보지 않음)"""
     try:
         logger.info(f"MCP tool call requested: {tool_name} with params: {parameters}")
         
@@ -42,11 +60,7 @@ async def call_mcp_tool(tool_name: str, parameters: Dict[str, Any]) -> Dict[str,
         
         if not mcp_server_path.exists():
             logger.warning("MCP server script not found, using fallback data")
-            return await get_fallback_data(tool_name, parameters)
-        
-        # MCP 서버와 통신
-        import subprocess
-        import json
+            return await _fallback(tool_name, parameters, allow_fallback)
         
         # MCP 서버에 요청 전송
         request_data = {
@@ -60,19 +74,22 @@ async def call_mcp_tool(tool_name: str, parameters: Dict[str, Any]) -> Dict[str,
         }
         
         try:
-            # MCP 서버 프로세스 실행
-            process = subprocess.Popen(
-                ["python", str(mcp_server_path)],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
+            # MCP 서버 프로세스 실행 (이벤트 루프를 막지 않도록 비동기 서브프로세스 사용)
+            process = await asyncio.create_subprocess_exec(
+                "python", str(mcp_server_path),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
                 cwd=str(MCP_SERVER_PATH)
             )
             
             # 요청 전송
             request_json = json.dumps(request_data) + "\n"
-            stdout, stderr = process.communicate(input=request_json, timeout=30)
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(input=request_json.encode("utf-8")),
+                timeout=MCP_CALL_TIMEOUT
+            )
+            stdout, stderr = stdout.decode("utf-8", "replace"), stderr.decode("utf-8", "replace")
             
             if process.returncode == 0 and stdout.strip():
                 try:
@@ -82,26 +99,36 @@ async def call_mcp_tool(tool_name: str, parameters: Dict[str, Any]) -> Dict[str,
                         return response["result"]
                     else:
                         logger.warning(f"MCP server error: {response.get('error', 'Unknown error')}")
-                        return await get_fallback_data(tool_name, parameters)
+                        return await _fallback(tool_name, parameters, allow_fallback)
                 except json.JSONDecodeError:
                     logger.warning("Invalid JSON response from MCP server")
-                    return await get_fallback_data(tool_name, parameters)
+                    return await _fallback(tool_name, parameters, allow_fallback)
             else:
                 logger.warning(f"MCP server process failed: {stderr}")
-                return await get_fallback_data(tool_name, parameters)
+                return await _fallback(tool_name, parameters, allow_fallback)
                 
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             logger.warning("MCP server timeout")
             process.kill()
-            return await get_fallback_data(tool_name, parameters)
+            await process.wait()
+            return await _fallback(tool_name, parameters, allow_fallback)
+        except MCPUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"MCP server communication failed: {e}")
-            return await get_fallback_data(tool_name, parameters)
+            return await _fallback(tool_name, parameters, allow_fallback)
         
+    except MCPUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"MCP tool call failed: {e}")
         # 예외 발생 시 기본 더미 데이터 반환
-        return await get_fallback_data(tool_name, parameters)
+        return await _fallback(tool_name, parameters, allow_fallback)
+
+async def _fallback(tool_name: str, parameters: Dict[str, Any], allow_fallback: bool) -> Dict[str, Any]:
+    if not allow_fallback:
+        raise MCPUnavailableError(f"MCP 도구 호출 실패: {tool_name}")
+    return await get_fallback_data(tool_name, parameters)
 
 async def get_fallback_data(tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
     """MCP 서버 연결 실패 시 사용할 기본 데이터"""
@@ -554,3 +581,8 @@ async def get_mcp_status():
     except Exception as e:
         logger.error(f"Failed to check MCP status: {e}")
         raise HTTPException(status_code=500, detail=f"MCP 상태 확인 실패: {str(e)}")
+
+@router.get("/prefetch/metrics")
+async def get_prefetch_metrics():
+    """워크플로우 생성 중 MCP 선행 조회 지표 (조회/사용/취소 수)"""
+    return mcp_prefetcher.metrics()
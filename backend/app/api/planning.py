@@ -18,8 +18,12 @@ from app.schemas.conversation import (
     Plan,
     PlanCreate
 )
+from app.api.mcp import fetch_from_server
 from app.services.ai_planner import AIPlanner
 from app.services.conversation_service import ConversationService
+from app.services.history_packer import history_packer
+from app.services.mcp_prefetch import mcp_prefetcher
+from app.services.workflow_steps import tool_classifier
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -311,20 +315,33 @@ async def chat_stream(request: ChatRequest):
     logger.info(f"API 키 상태: {api_key_preview}")
     
     async def generate_stream():
+        # 워크플로우 생성 중 첫 노드들이 쓸 MCP 데이터를 미리 조회
+        prefetch = mcp_prefetcher.session(
+            lambda tool_name, parameters: fetch_from_server(tool_name, parameters, allow_fallback=False),
+            tool_classifier
+        )
+        completed = False
         try:
             # AI 플래너로 스트리밍 응답 생성
             ai_planner = AIPlanner(api_key=request.openai_api_key)
             
             # 워크플로우 모드인 경우 대화 내용과 함께 전달
             if request.mode == "workflow" and request.chat_history:
-                query = f"다음 대화 내용을 워크플로우로 변환해주세요:\n\n{request.chat_history}\n\n사용자 추가 요청: {request.message}"
-                logger.info(f"워크플로우 변환 쿼리 길이: {len(query)}")
+                # 긴 대화는 토큰 예산에 맞게 이전 대화를 요약
+                query = await history_packer.build_workflow_query(
+                    request.chat_history, request.message, request.openai_api_key, request.conversation_id
+                )
             else:
                 query = request.message
+            if request.mode == "workflow":
+                prefetch.observe_query(query)
             
             async for chunk in ai_planner.generate_plan_stream(query, request.mode):
+                if chunk["type"] == "task":
+                    prefetch.observe_task(chunk["task"])
                 # SSE 형식으로 데이터 전송
                 yield f"data: {json.dumps(chunk)}\n\n"
+            completed = True
                 
         except Exception as e:
             logger.error("스트리밍 채팅 오류", error=str(e))
@@ -333,6 +350,10 @@ async def chat_stream(request: ChatRequest):
                 "content": f"오류가 발생했습니다: {str(e)}"
             }
             yield f"data: {json.dumps(error_chunk)}\n\n"
+        finally:
+            # 생성이 실패하거나 클라이언트가 연결을 끊으면 쓰이지 않을 조회 취소
+            if not completed:
+                prefetch.cancel()
     
     return StreamingResponse(
         generate_stream(),
@@ -3,13 +3,18 @@
 GPT를 사용하여 워크플로우 결과를 바탕으로 투자 분석 보고서를 생성합니다.
 """
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import json
 from datetime import datetime
 import logging
 
+from app.core.config import settings
+from app.services.llm_calls import ClientDisconnected, chat_completion
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,7 +32,7 @@ class ReportRequest(BaseModel):
     workflow_data: Dict[str, Any]
 
 @router.post("/generate")
-async def generate_report(request: ReportRequest):
+async def generate_report(request: ReportRequest, http_request: Request):
     """
     워크플로우 실행 결과를 바탕으로 투자 분석 보고서를 생성합니다.
     """
@@ -35,12 +40,11 @@ async def generate_report(request: ReportRequest):
         logger.info("보고서 생성 요청 수신")
         logger.info(f"워크플로우 데이터: {request.workflow_data}")
         
-        # OpenAI API를 사용하여 보고서 생성
-        import openai
-        
-        client = openai.OpenAI(api_key=request.openai_api_key)
-        
-        response = client.chat.completions.create(
+        # 비동기 호출 (보고서는 길어서 별도 제한 시간 적용, 클라이언트 연결 종료 시 취소)
+        response = await chat_completion(
+            request.openai_api_key,
+            request=http_request,
+            timeout=settings.OPENAI_REPORT_TIMEOUT,
             model="gpt-4",
             messages=[
                 {
@@ -61,6 +65,12 @@ async def generate_report(request: ReportRequest):
         logger.info("보고서 생성 완료")
         return report_content
         
+    except ClientDisconnected:
+        logger.info("클라이언트 연결 종료로 보고서 생성 취소")
+        raise HTTPException(status_code=499, detail="클라이언트 연결 종료")
+    except asyncio.TimeoutError:
+        logger.error("보고서 생성 시간 초과")
+        raise HTTPException(status_code=504, detail="보고서 생성 시간 초과")
     except Exception as e:
         logger.error(f"보고서 생성 실패: {str(e)}")
         raise HTTPException(status_code=500, detail=f"보고서 생성 실패: {str(e)}")
@@ -5,8 +5,9 @@
 from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel
 from typing import Optional
-from openai import AsyncOpenAI
 import openai
+from app.services.openai_clients import client_registry, get_async_client
+from app.services.llm_cache import llm_cache
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -26,7 +27,7 @@ async def validate_openai_key(request: OpenAIKeyValidation):
     
     try:
         # 비동기 OpenAI 클라이언트로 간단한 요청 테스트
-        client = AsyncOpenAI(api_key=request.api_key)
+        client = get_async_client(request.api_key)
         
         # 간단한 completions 요청으로 API 키 유효성 확인
         response = await client.chat.completions.create(
@@ -69,3 +70,13 @@ async def get_openai_status():
         "configured": True,  # 클라이언트에서 키 관리
         "message": "클라이언트에서 API 키를 관리합니다."
     }
+
+@router.get("/openai-clients")
+async def get_openai_client_metrics():
+    """OpenAI 클라이언트 레지스트리 지표 (인증 없음)"""
+    return client_registry.metrics()
+
+@router.get("/llm-cache")
+async def get_llm_cache_metrics():
+    """LLM 응답 캐시 지표 (인증 없음)"""
+    return llm_cache.metrics()
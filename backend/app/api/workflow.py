@@ -2,70 +2,71 @@
 워크플로우 관련 API 라우터  
 """
 
+import asyncio
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from pydantic import BaseModel
 import json
-import openai
 
 from app.core.database import get_db
 from app.core.security import verify_token
+from app.models.workflow import Workflow, WorkflowExecution
+from app.services.execution_events import execution_events
+from app.services.llm_calls import ClientDisconnected
+from app.services.workflow_engine import ExecutionConflictError, WorkflowGraphError, workflow_engine
+from app.services.workflow_steps import (
+    AVAILABLE_TOOLS,
+    analyze_result as analyze_result_step,
+    analyze_results_batch,
+    fallback_analysis,
+    select_tool as select_tool_step,
+    select_tools_batch,
+    tool_classifier,
+)
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 router = APIRouter()
 
+# 실행 이벤트 스트림 keep-alive 주기 (초)
+EVENT_HEARTBEAT_SECONDS = 15.0
+
 class ToolSelectionRequest(BaseModel):
     node_description: str
     node_prompt: Optional[str] = ""
     workflow_context: List[Dict[str, Any]] = []
     openai_api_key: str
 
+class BatchToolSelectionRequest(BaseModel):
+    nodes: List[Dict[str, Any]]  # [{id, label, prompt}] 실행 순서대로
+    openai_api_key: str
+
+class ToolPlanRequest(BaseModel):
+    openai_api_key: str
+
+class WorkflowExecuteRequest(BaseModel):
+    openai_api_key: str
+    use_cache: bool = True  # 입력이 같은 노드는 저장된 결과 재사용
+
 class AnalysisRequest(BaseModel):
     node_description: str
     tool_used: str
     raw_result: Dict[str, Any]
     openai_api_key: str
 
-# 사용 가능한 MCP 도구 목록과 설명
-AVAILABLE_TOOLS = {
-    "get_all_tickers": {
-        "description": "전체 종목 목록을 조회합니다. PER, PBR 등 기본 재무지표와 함께 정렬된 결과를 제공합니다.",
-        "use_cases": ["종목 탐색", "시장 전체 현황", "재무지표 기반 초기 스크리닝"],
-        "parameters": ["market (KOSPI/KOSDAQ/ALL)"]
-    },
-    "get_stock_fundamentals": {
-        "description": "특정 종목의 상세 재무지표를 조회합니다.",
-        "use_cases": ["개별 종목 분석", "재무 건전성 평가", "투자 가치 분석"],
-        "parameters": ["ticker (종목코드)"]
-    },
-    "filter_stocks_by_fundamentals": {
-        "description": "재무지표 조건으로 종목을 필터링합니다.",
-        "use_cases": ["가치주 발굴", "성장주 탐색", "조건부 스크리닝"],
-        "parameters": ["tickers", "per_max", "pbr_max", "roe_min", "market_cap_min", "limit"]
-    },
-    "get_market_news": {
-        "description": "특정 종목이나 섹터의 최신 뉴스를 조회합니다.",
-        "use_cases": ["뉴스 분석", "시장 동향 파악", "리스크 요인 분석"],
-        "parameters": ["tickers", "sector", "days"]
-    },
-    "get_sector_performance": {
-        "description": "특정 섹터의 성과를 분석합니다.",
-        "use_cases": ["섹터 분석", "업종별 투자 전략", "상대적 성과 비교"],
-        "parameters": ["sector", "period"]
-    },
-    "get_foreign_investment": {
-        "description": "외국인 투자 동향을 조회합니다.",
-        "use_cases": ["외국인 자금 흐름 분석", "시장 심리 파악"],
-        "parameters": ["market"]
-    },
-    "get_market_cap": {
-        "description": "시가총액 관련 정보를 조회합니다.",
-        "use_cases": ["시장 규모 분석", "대형주/중형주/소형주 분류"],
-        "parameters": ["market"]
-    }
-}
+class NodeResultItem(BaseModel):
+    node_id: str
+    node_description: str
+    tool_used: str
+    raw_result: Dict[str, Any]
+
+class BatchAnalysisRequest(BaseModel):
+    results: List[NodeResultItem]  # 실행 순서대로
+    openai_api_key: str
 
 @router.get("/")
 async def get_workflows(
@@ -108,12 +109,174 @@ async def update_workflow(
 @router.post("/{workflow_id}/execute")
 async def execute_workflow(
     workflow_id: int,
+    request: WorkflowExecuteRequest,
+    token_data: dict = Depends(verify_token),
+    db: AsyncSession = Depends(get_db)
+):
+    """워크플로우 실행 (서버에서 DAG 병렬 실행, 실행 ID 즉시 반환)"""
+    user_id = token_data.get("user_id")
+    workflow = await workflow_engine.load_workflow(db, workflow_id, user_id)
+    if workflow is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="워크플로우를 찾을 수 없습니다")
+    
+    try:
+        execution = await workflow_engine.start(db, workflow, request.openai_api_key, request.use_cache)
+    except WorkflowGraphError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return {
+        "message": f"워크플로우 {workflow_id} 실행 시작",
+        "user_id": user_id,
+        "execution_id": execution.id,
+        "status": execution.status
+    }
+
+@router.post("/{workflow_id}/executions/{execution_id}/resume")
+async def resume_workflow_execution(
+    workflow_id: int,
+    execution_id: int,
+    request: WorkflowExecuteRequest,
+    token_data: dict = Depends(verify_token),
+    db: AsyncSession = Depends(get_db)
+):
+    """중단/실패한 실행 재개 (완료된 노드는 다시 실행하지 않음)"""
+    user_id = token_data.get("user_id")
+    workflow = await workflow_engine.load_workflow(db, workflow_id, user_id)
+    execution = await db.get(WorkflowExecution, execution_id)
+    if workflow is None or execution is None or execution.workflow_id != workflow_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="실행 기록을 찾을 수 없습니다")
+    if execution.status == "completed":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="이미 완료된 실행입니다")
+    
+    try:
+        execution = await workflow_engine.resume(db, workflow, execution, request.openai_api_key, request.use_cache)
+    except ExecutionConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except WorkflowGraphError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return {
+        "message": f"워크플로우 {workflow_id} 실행 재개",
+        "user_id": user_id,
+        "execution_id": execution.id,
+        "status": execution.status
+    }
+
+@router.post("/{workflow_id}/plan-tools")
+async def plan_workflow_tools(
+    workflow_id: int,
+    request: ToolPlanRequest,
+    token_data: dict = Depends(verify_token),
+    db: AsyncSession = Depends(get_db)
+):
+    """모든 작업 노드의 도구/매개변수를 한 번에 선택해 노드 설정에 저장"""
+    user_id = token_data.get("user_id")
+    workflow = await workflow_engine.load_workflow(db, workflow_id, user_id)
+    if workflow is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="워크플로우를 찾을 수 없습니다")
+    
+    try:
+        nodes, _, order = workflow_engine.prepare(workflow)
+    except WorkflowGraphError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    selections = await workflow_engine.plan_tools(workflow.id, nodes, order, request.openai_api_key)
+    
+    return {
+        "message": f"워크플로우 {workflow_id} 도구 선택 완료",
+        "user_id": user_id,
+        "selections": selections
+    }
+
+@router.get("/{workflow_id}/executions/{execution_id}")
+async def get_workflow_execution(
+    workflow_id: int,
+    execution_id: int,
+    token_data: dict = Depends(verify_token),
+    db: AsyncSession = Depends(get_db)
+):
+    """워크플로우 실행 상태 및 노드별 결과 조회"""
+    user_id = token_data.get("user_id")
+    stmt = select(WorkflowExecution).options(selectinload(WorkflowExecution.results)).join(Workflow).where(
+        WorkflowExecution.id == execution_id,
+        WorkflowExecution.workflow_id == workflow_id,
+        Workflow.user_id == user_id
+    )
+    execution = (await db.execute(stmt)).scalar_one_or_none()
+    if execution is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="실행 기록을 찾을 수 없습니다")
+    
+    return {
+        "execution_id": execution.id,
+        "workflow_id": execution.workflow_id,
+        "status": execution.status,
+        "running": workflow_engine.is_running(execution.id),
+        "start_time": execution.start_time,
+        "end_time": execution.end_time,
+        "error_message": execution.error_message,
+        "execution_log": execution.execution_log,
+        "results": [
+            {
+                "node_id": result.node_id,
+                "result_type": result.result_type,
+                "result_data": result.result_data,
+                "created_at": result.created_at
+            }
+            for result in execution.results
+        ]
+    }
+
+@router.get("/{workflow_id}/executions/{execution_id}/events")
+async def stream_workflow_execution(
+    workflow_id: int,
+    execution_id: int,
+    offset: int = 0,
+    last_event_id: Optional[str] = Header(default=None),
     token_data: dict = Depends(verify_token),
     db: AsyncSession = Depends(get_db)
 ):
-    """워크플로우 실행"""
+    """
+    노드별 실행 이벤트 스트리밍 (SSE)
+    offset 또는 Last-Event-ID 헤더로 끊긴 지점 다음 이벤트부터 다시 받을 수 있습니다.
+    """
     user_id = token_data.get("user_id")
-    return {"message": f"워크플로우 {workflow_id} 실행", "user_id": user_id}
+    stmt = select(WorkflowExecution).join(Workflow).where(
+        WorkflowExecution.id == execution_id,
+        WorkflowExecution.workflow_id == workflow_id,
+        Workflow.user_id == user_id
+    )
+    execution = (await db.execute(stmt)).scalar_one_or_none()
+    if execution is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="실행 기록을 찾을 수 없습니다")
+    
+    if last_event_id is not None and last_event_id.isdigit():
+        offset = max(offset, int(last_event_id) + 1)
+    
+    async def generate_events():
+        if execution_events.get(execution_id) is None:
+            # 이벤트 로그가 없으면 (재시작/보관 기간 경과) 저장된 최종 상태만 전송
+            snapshot = {
+                "type": "snapshot",
+                "status": execution.status,
+                "error": execution.error_message,
+                "execution_log": execution.execution_log
+            }
+            yield f"data: {json.dumps(snapshot, ensure_ascii=False)}\n\n"
+            return
+        
+        async for event in execution_events.subscribe(execution_id, offset, heartbeat=EVENT_HEARTBEAT_SECONDS):
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {event['offset']}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+    
+    return StreamingResponse(
+        generate_events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        }
+    )
 
 @router.post("/tool-selection")
 async def select_tool(
@@ -137,100 +300,85 @@ async def select_tool(
     }
 
 @router.post("/select-tool")
-async def select_appropriate_tool(request: ToolSelectionRequest):
+async def select_appropriate_tool(request: ToolSelectionRequest, http_request: Request):
     """
     노드 설명과 워크플로우 컨텍스트를 바탕으로 적절한 MCP 도구를 선택합니다.
     """
     try:
-        # OpenAI API 키 설정
-        openai.api_key = request.openai_api_key
-        
-        # 워크플로우 컨텍스트 분석
-        workflow_context_str = "\n".join([
-            f"- {node['label']} (상태: {node.get('status', 'pending')})"
-            for node in request.workflow_context
-        ])
-        
-        # 도구 선택을 위한 프롬프트
-        tool_selection_prompt = f"""
-당신은 투자 분석 워크플로우의 AI 어시스턴트입니다.
-현재 실행해야 할 노드와 전체 워크플로우 컨텍스트를 바탕으로 가장 적절한 MCP 도구를 선택해주세요.
-
-**현재 노드:**
-- 설명: {request.node_description}
-- 프롬프트: {request.node_prompt}
-
-**전체 워크플로우 컨텍스트:**
-{workflow_context_str}
-
-**사용 가능한 도구들:**
-{json.dumps(AVAILABLE_TOOLS, ensure_ascii=False, indent=2)}
-
-**응답 형식 (JSON):**
-{{
-    "tool_name": "선택한_도구명",
-    "reasoning": "선택 이유 설명",
-    "parameters": {{
-        "parameter1": "value1",
-        "parameter2": "value2"
-    }}
-}}
-
-주의사항:
-1. 노드의 목적에 가장 적합한 도구를 선택하세요
-2. 워크플로우의 순서와 이전 단계 결과를 고려하세요
-3. 매개변수는 노드의 컨텍스트에 맞게 설정하세요
-4. 뉴스 분석이 필요하면 get_market_news를, 재무 분석이 필요하면 get_stock_fundamentals나 filter_stocks_by_fundamentals를 사용하세요
-"""
-
-        # OpenAI 클라이언트 생성
-        client = openai.OpenAI(api_key=request.openai_api_key)
-        
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "당신은 투자 분석 전문가입니다. JSON 형식으로만 응답하세요."},
-                {"role": "user", "content": tool_selection_prompt}
-            ],
-            temperature=0.1
+        return await select_tool_step(
+            request.openai_api_key,
+            request.node_description,
+            request.node_prompt,
+            request.workflow_context,
+            request=http_request,
         )
         
-        result_text = response.choices[0].message.content.strip()
-        
-        # JSON 추출 시도
-        try:
-            # JSON 블록에서 추출
-            if "```json" in result_text:
-                json_start = result_text.find("```json") + 7
-                json_end = result_text.find("```", json_start)
-                result_text = result_text[json_start:json_end].strip()
-            
-            result = json.loads(result_text)
-            
-            # 도구명 검증
-            if result.get("tool_name") not in AVAILABLE_TOOLS:
-                logger.warning(f"Unknown tool selected: {result.get('tool_name')}")
-                # 기본 도구로 fallback
-                result["tool_name"] = "get_all_tickers"
-                result["parameters"] = {"market": "ALL"}
-                result["reasoning"] = "알 수 없는 도구가 선택되어 기본 도구로 fallback"
-            
-            logger.info(f"Selected tool: {result['tool_name']} for node: {request.node_description}")
-            return result
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON parsing failed: {e}")
-            # 기본 도구로 fallback
-            return {
-                "tool_name": "get_all_tickers",
-                "parameters": {"market": "ALL"},
-                "reasoning": "JSON 파싱 실패로 기본 도구 선택"
-            }
-        
+    except ClientDisconnected:
+        raise HTTPException(status_code=499, detail="클라이언트 연결 종료")
+    except asyncio.TimeoutError:
+        logger.error("Tool selection timed out")
+        raise HTTPException(status_code=504, detail="도구 선택 시간 초과")
     except Exception as e:
         logger.error(f"Tool selection failed: {e}")
         raise HTTPException(status_code=500, detail=f"도구 선택 실패: {str(e)}")
 
+@router.post("/select-tools")
+async def select_tools_for_workflow(request: BatchToolSelectionRequest, http_request: Request):
+    """
+    워크플로우 생성 시 모든 작업 노드의 MCP 도구를 LLM 호출 한 번으로 선택합니다.
+    선택하지 못한 노드는 결과에서 빠지며, 실행 시 /select-tool로 개별 선택합니다.
+    """
+    try:
+        selections = await select_tools_batch(request.openai_api_key, request.nodes, request=http_request)
+        return {"selections": selections}
+        
+    except ClientDisconnected:
+        raise HTTPException(status_code=499, detail="클라이언트 연결 종료")
+    except asyncio.TimeoutError:
+        logger.error("Batch tool selection timed out")
+        raise HTTPException(status_code=504, detail="도구 선택 시간 초과")
+    except Exception as e:
+        logger.error(f"Batch tool selection failed: {e}")
+        raise HTTPException(status_code=500, detail=f"도구 선택 실패: {str(e)}")
+
+@router.post("/analyze-results")
+async def analyze_tool_results(request: BatchAnalysisRequest, http_request: Request):
+    """
+    워크플로우 노드 결과를 LLM 요청 한 번으로 일괄 분석합니다 (SSE).
+    노드별 분석이 완성되는 대로 section 이벤트로 보내고, 마지막에 done 이벤트를 보냅니다.
+    """
+    results = [item.model_dump() for item in request.results]
+    
+    async def generate_sections():
+        started = asyncio.get_running_loop().time()
+        analyses = {}
+        try:
+            async for section in analyze_results_batch(request.openai_api_key, results, request=http_request):
+                analyses[section["node_id"]] = section
+                yield f"data: {json.dumps({'type': 'section', **section}, ensure_ascii=False)}\n\n"
+        except ClientDisconnected:
+            return
+        done = {
+            "type": "done",
+            "analyses": analyses,
+            "elapsed": round(asyncio.get_running_loop().time() - started, 3)
+        }
+        yield f"data: {json.dumps(done, ensure_ascii=False)}\n\n"
+    
+    return StreamingResponse(
+        generate_sections(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        }
+    )
+
+@router.get("/tool-selector/metrics")
+async def get_tool_selector_metrics():
+    """로컬 도구 선택기 처리 비율과 최근 결정/신뢰도 (임계값 조정용)"""
+    return tool_classifier.metrics()
+
 @router.post("/analysis")
 async def analyze_result(
     request: AnalysisRequest,
@@ -251,77 +399,33 @@ async def analyze_result(
     }
 
 @router.post("/analyze-result")
-async def analyze_tool_result(request: AnalysisRequest):
+async def analyze_tool_result(request: AnalysisRequest, http_request: Request):
     """
     MCP 도구 실행 결과를 AI가 분석하고 해석합니다.
     """
     try:
-        # OpenAI API 키 설정
-        openai.api_key = request.openai_api_key
-        
-        # 결과 분석을 위한 프롬프트
-        analysis_prompt = f"""
-당신은 투자 분석 전문가입니다.
-다음 MCP 도구 실행 결과를 분석하고 투자자가 이해하기 쉽게 해석해주세요.
-
-**노드 목적:** {request.node_description}
-**사용된 도구:** {request.tool_used}
-**원시 데이터:** {json.dumps(request.raw_result, ensure_ascii=False, indent=2)}
-
-**분석 요청사항:**
-1. 데이터의 핵심 인사이트 추출
-2. 투자 관점에서의 해석
-3. 주목할 만한 종목이나 패턴 식별
-4. 다음 분석 단계 제안
-
-**응답 형식:**
-명확하고 구조화된 한국어로 작성해주세요.
-- 핵심 요약 (2-3문장)
-- 주요 발견사항 (불릿 포인트)
-- 투자 시사점
-- 추천 후속 조치
-
-길이는 200-500자 정도로 간결하게 작성해주세요.
-"""
-
-        # OpenAI 클라이언트 생성
-        client = openai.OpenAI(api_key=request.openai_api_key)
-        
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "당신은 투자 분석 전문가입니다. 데이터를 명확하고 실용적으로 해석하세요."},
-                {"role": "user", "content": analysis_prompt}
-            ],
-            temperature=0.3
+        analysis = await analyze_result_step(
+            request.openai_api_key,
+            request.node_description,
+            request.tool_used,
+            request.raw_result,
+            request=http_request,
         )
         
-        analysis = response.choices[0].message.content.strip()
-        
-        logger.info(f"Analysis completed for tool: {request.tool_used}")
-        
         return {
             "analysis": analysis,
             "tool_used": request.tool_used,
             "data_summary": f"{request.tool_used} 도구로 {len(str(request.raw_result))} 바이트의 데이터 처리"
         }
         
+    except ClientDisconnected:
+        raise HTTPException(status_code=499, detail="클라이언트 연결 종료")
     except Exception as e:
         logger.error(f"Result analysis failed: {e}")
         
         # 기본 분석 제공
         return {
-            "analysis": f"""
-**{request.node_description} 분석 결과**
-
-{request.tool_used} 도구를 사용하여 데이터를 수집했습니다.
-
-• 데이터 크기: {len(str(request.raw_result))} 바이트
-• 처리 상태: 완료
-• 다음 단계: 추가 분석이나 다른 도구를 활용한 심화 분석을 권장합니다.
-
-*자동 생성된 기본 분석입니다. 상세한 분석을 위해 AI 분석을 다시 시도해보세요.*
-            """,
+            "analysis": fallback_analysis(request.node_description, request.tool_used, request.raw_result),
             "tool_used": request.tool_used,
             "data_summary": "기본 분석 모드"
         }
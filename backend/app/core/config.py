@@ -2,7 +2,7 @@
 애플리케이션 설정 관리
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
 import os
@@ -38,6 +38,54 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: Optional[str] = Field(default=None, env="OPENAI_API_KEY")
     ANTHROPIC_API_KEY: Optional[str] = Field(default=None, env="ANTHROPIC_API_KEY")
     
+    # OpenAI 클라이언트 레지스트리 (API 키별 클라이언트 재사용, 연결 풀 공유)
+    OPENAI_CLIENT_CACHE_SIZE: int = Field(default=32, env="OPENAI_CLIENT_CACHE_SIZE")
+    OPENAI_CLIENT_IDLE_TTL: float = Field(default=1800.0, env="OPENAI_CLIENT_IDLE_TTL")
+    OPENAI_MAX_CONNECTIONS: int = Field(default=100, env="OPENAI_MAX_CONNECTIONS")
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=20, env="OPENAI_MAX_KEEPALIVE_CONNECTIONS")
+    OPENAI_KEEPALIVE_EXPIRY: float = Field(default=60.0, env="OPENAI_KEEPALIVE_EXPIRY")
+    
+    # LLM 호출별 제한 시간 (초)
+    OPENAI_REQUEST_TIMEOUT: float = Field(default=60.0, env="OPENAI_REQUEST_TIMEOUT")
+    OPENAI_REPORT_TIMEOUT: float = Field(default=180.0, env="OPENAI_REPORT_TIMEOUT")
+    
+    # 워크플로우 실행 엔진 (동시에 실행하는 노드 수)
+    WORKFLOW_MAX_CONCURRENCY: int = Field(default=4, env="WORKFLOW_MAX_CONCURRENCY")
+    # 노드 결과 캐시 보관 기간 (일)
+    NODE_CACHE_RETENTION_DAYS: int = Field(default=30, env="NODE_CACHE_RETENTION_DAYS")
+    
+    # 로컬 도구 선택기 (신뢰도가 임계값 미만이면 LLM 선택)
+    TOOL_CLASSIFIER_THRESHOLD: float = Field(default=0.5, env="TOOL_CLASSIFIER_THRESHOLD")
+    TOOL_SELECTION_LOG: str = Field(default="./data/tool_selections.jsonl", env="TOOL_SELECTION_LOG")
+    
+    # LLM 응답 캐시 (TTL 초, 최대 항목 수, 디스크 저장 경로 - 비우면 메모리만 사용)
+    LLM_CACHE_TTL: float = Field(default=3600.0, env="LLM_CACHE_TTL")
+    LLM_CACHE_SIZE: int = Field(default=512, env="LLM_CACHE_SIZE")
+    LLM_CACHE_DIR: str = Field(default="", env="LLM_CACHE_DIR")
+    
+    # 구조화 출력 (플래너/도구 선택 응답을 JSON 스키마로 강제, 지원 모델 사용)
+    LLM_STRUCTURED_OUTPUTS: bool = Field(default=True, env="LLM_STRUCTURED_OUTPUTS")
+    STRUCTURED_OUTPUT_MODEL: str = Field(default="gpt-4o", env="STRUCTURED_OUTPUT_MODEL")
+    
+    # 분석 프롬프트에 넣는 도구 결과 크기 예산 (JSON 문자 수, 모델별 / 기본값)
+    RESULT_DIGEST_BUDGETS: Dict[str, int] = Field(
+        default={"gpt-4": 12000, "gpt-4o": 48000, "gpt-4o-mini": 48000}, env="RESULT_DIGEST_BUDGETS"
+    )
+    RESULT_DIGEST_DEFAULT_BUDGET: int = Field(default=12000, env="RESULT_DIGEST_DEFAULT_BUDGET")
+    
+    # 워크플로우 변환 쿼리 토큰 예산 (최근 대화 턴은 그대로, 이전 대화는 요약)
+    CHAT_HISTORY_TOKEN_BUDGET: int = Field(default=3000, env="CHAT_HISTORY_TOKEN_BUDGET")
+    CHAT_HISTORY_RECENT_TURNS: int = Field(default=4, env="CHAT_HISTORY_RECENT_TURNS")
+    CHAT_SUMMARY_MAX_TOKENS: int = Field(default=400, env="CHAT_SUMMARY_MAX_TOKENS")
+    CHAT_SUMMARY_MODEL: str = Field(default="gpt-4o-mini", env="CHAT_SUMMARY_MODEL")
+    
+    # MCP 선행 조회 (워크플로우 생성 중 첫 노드 데이터를 미리 조회, 생성 1회당 조회 수/동시 조회 수/조회 제한 시간/결과 보관 시간 초)
+    MCP_PREFETCH_ENABLED: bool = Field(default=True, env="MCP_PREFETCH_ENABLED")
+    MCP_PREFETCH_MAX_FETCHES: int = Field(default=4, env="MCP_PREFETCH_MAX_FETCHES")
+    MCP_PREFETCH_CONCURRENCY: int = Field(default=2, env="MCP_PREFETCH_CONCURRENCY")
+    MCP_PREFETCH_TIMEOUT: float = Field(default=20.0, env="MCP_PREFETCH_TIMEOUT")
+    MCP_PREFETCH_TTL: float = Field(default=300.0, env="MCP_PREFETCH_TTL")
+    
     # MCP 서버 설정
     MCP_SERVER_HOST: str = Field(default="localhost", env="MCP_SERVER_HOST")
     MCP_SERVER_PORT: int = Field(default=3001, env="MCP_SERVER_PORT")
@@ -4,7 +4,7 @@
 
 from .user import User
 from .conversation import Conversation, Message, Plan
-from .workflow import Workflow, WorkflowNode, WorkflowExecution, ExecutionResult
+from .workflow import Workflow, WorkflowNode, WorkflowExecution, ExecutionResult, NodeResultCache
 from .report import Report, DataTable, MCPModule
 
 __all__ = [
@@ -16,6 +16,7 @@ __all__ = [
     "WorkflowNode",
     "WorkflowExecution",
     "ExecutionResult",
+    "NodeResultCache",
     "Report",
     "DataTable",
     "MCPModule"
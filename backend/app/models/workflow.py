@@ -76,3 +76,14 @@ class ExecutionResult(Base):
     
     # 관계 설정
     execution = relationship("WorkflowExecution", back_populates="results")
+
+class NodeResultCache(Base):
+    """노드 결과 캐시 (입력 내용 해시를 키로 사용)"""
+    __tablename__ = "node_result_cache"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), nullable=False, unique=True, index=True)  # 입력 내용 SHA-256
+    kind = Column(String(20), nullable=False)  # node, tool
+    session_date = Column(String(8), nullable=False)  # 데이터 기준 거래일 (YYYYMMDD)
+    result_data = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,156 @@
+"""
+LLM 구조화 출력 스키마
+플래너/도구 선택 응답 형식을 pydantic 모델로 정의하고, OpenAI structured outputs
+(response_format=json_schema, strict) 에 넘길 JSON 스키마를 생성합니다.
+"""
+
+import copy
+from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+# strict 스키마에서 지원하지 않아 제거하는 키워드
+UNSUPPORTED_KEYWORDS = ("default", "title")
+
+
+# 워크플로우 변환 응답
+class WorkflowTaskOutput(BaseModel):
+    """워크플로우 작업"""
+    id: str
+    title: str
+    description: str
+    task_type: Literal["data", "analysis", "report", "general"]
+    estimated_time: str
+
+
+class WorkflowOutput(BaseModel):
+    """워크플로우 변환 응답"""
+    workflow_title: str
+    description: str
+    tasks: List[WorkflowTaskOutput]
+    expected_outcome: str
+
+
+# 플랜 생성 응답
+class PlanTaskOutput(BaseModel):
+    """플랜 작업"""
+    id: str
+    title: str
+    description: str
+    agent_allowed: List[str]
+    mcp_tools: List[str]
+    dependencies: List[str]
+    estimated_time: str
+
+
+class ClarificationQuestion(BaseModel):
+    """추가 확인 질문"""
+    question: str
+    context: str
+
+
+class PlanOutput(BaseModel):
+    """플랜 생성 응답"""
+    analysis: str
+    plan_title: str
+    tasks: List[PlanTaskOutput]
+    clarification_questions: List[ClarificationQuestion]
+    move_to_canvas: bool
+    priority: Literal["high", "medium", "low"]
+    complexity: Literal["simple", "medium", "complex"]
+
+
+# MCP 도구 선택 응답
+class FactorFilter(BaseModel):
+    """rank_stocks_by_factors 팩터 백분위 조건"""
+    factor: str
+    min_pct: Optional[float] = None
+    max_pct: Optional[float] = None
+
+
+class ToolParameters(BaseModel):
+    """MCP 도구 매개변수 (도구에 해당하지 않는 값은 null)"""
+    market: Optional[str] = None
+    ticker: Optional[str] = None
+    tickers: Optional[List[str]] = None
+    sector: Optional[str] = None
+    days: Optional[int] = None
+    period: Optional[str] = None
+    per_max: Optional[float] = None
+    pbr_max: Optional[float] = None
+    roe_min: Optional[float] = None
+    market_cap_min: Optional[float] = None
+    limit: Optional[int] = None
+    filters: Optional[List[FactorFilter]] = None
+    sort_by: Optional[str] = None
+    date: Optional[str] = None
+    kind: Optional[str] = None
+    z_threshold: Optional[float] = None
+    gap_threshold: Optional[float] = None
+    window: Optional[int] = None
+    min_corr: Optional[float] = None
+    only_cointegrated: Optional[bool] = None
+    index_name: Optional[str] = None
+    family: Optional[str] = None
+    view: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+
+
+# 결과 일괄 분석 응답
+class NodeAnalysisOutput(BaseModel):
+    """노드별 분석"""
+    node_id: str
+    analysis: str
+
+
+class BatchAnalysisOutput(BaseModel):
+    """워크플로우 노드 결과 일괄 분석"""
+    analyses: List[NodeAnalysisOutput]
+
+
+def tool_selection_models(tool_names: Iterable[str]) -> Tuple[Type[BaseModel], Type[BaseModel]]:
+    """도구명을 열거형으로 제한한 (단일 선택, 일괄 선택) 응답 모델"""
+    ToolName = Literal[tuple(tool_names)]
+
+    class ToolSelectionOutput(BaseModel):
+        """MCP 도구 선택"""
+        tool_name: ToolName
+        reasoning: str
+        parameters: ToolParameters
+
+    class NodeToolSelectionOutput(ToolSelectionOutput):
+        """노드별 MCP 도구 선택"""
+        node_id: str
+
+    class BatchToolSelectionOutput(BaseModel):
+        """워크플로우 전체 노드 도구 선택"""
+        selections: List[NodeToolSelectionOutput]
+
+    return ToolSelectionOutput, BatchToolSelectionOutput
+
+
+def _strictify(node: Any) -> Any:
+    """모든 객체에 additionalProperties=false, 모든 속성을 required로 (선택 값은 null 허용 타입)"""
+    if isinstance(node, dict):
+        for keyword in UNSUPPORTED_KEYWORDS:
+            if keyword in node and not isinstance(node[keyword], dict):
+                node.pop(keyword)
+        if node.get("type") == "object" and "properties" in node:
+            node["additionalProperties"] = False
+            node["required"] = list(node["properties"])
+        for value in node.values():
+            _strictify(value)
+    elif isinstance(node, list):
+        for item in node:
+            _strictify(item)
+    return node
+
+
+def json_schema_format(model: Type[BaseModel], name: Optional[str] = None) -> Dict[str, Any]:
+    """pydantic 모델 -> chat completion response_format (strict JSON 스키마)"""
+    schema = _strictify(copy.deepcopy(model.model_json_schema()))
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": name or model.__name__, "strict": True, "schema": schema},
+    }
@@ -5,9 +5,13 @@ AI 플래너 서비스
 
 import json
 import re
-from typing import Dict, List, Optional, Any
-from openai import AsyncOpenAI
+from typing import Dict, List, Optional, Any, Type
+from pydantic import BaseModel, ValidationError
 from app.core.config import settings
+from app.schemas.llm_output import PlanOutput, WorkflowOutput, json_schema_format
+from app.services.llm_calls import completion_stream, completion_text
+from app.services.openai_clients import get_async_client
+from app.services.stream_json import TaskStreamParser
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -19,8 +23,7 @@ class AIPlanner:
         self.api_key = api_key or settings.OPENAI_API_KEY
         self.client = None
         if self.api_key:
-            self.client = AsyncOpenAI(api_key=self.api_key)
-            logger.info(f"OpenAI 클라이언트 초기화 완료. API 키: {self.api_key[:10]}...")
+            self.client = get_async_client(self.api_key)
         else:
             logger.warning("OpenAI API 키가 설정되지 않았습니다")
         
@@ -50,8 +53,16 @@ class AIPlanner:
             else:
                 system_prompt = self._get_conversation_system_prompt()
             
-            # OpenAI API 스트리밍 호출
-            stream = await self.client.chat.completions.create(
+            # 워크플로우 모드는 구조화 출력이 켜져 있으면 JSON 스키마로 응답 형식 강제
+            output_model = WorkflowOutput if mode == "workflow" and settings.LLM_STRUCTURED_OUTPUTS else None
+            extra = {"response_format": json_schema_format(output_model)} if output_model else {}
+            
+            # OpenAI API 스트리밍 호출 (같은 요청은 캐시된 스트림 재생)
+            stream = completion_stream(
+                self.api_key,
+                timeout=settings.OPENAI_REPORT_TIMEOUT,
+                # 워크플로우 모드는 파싱 가능한 응답만 캐시
+                validate=(lambda text: self._is_parsable(text, output_model)) if mode == "workflow" else None,
                 model="gpt-4o",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -59,30 +70,37 @@ class AIPlanner:
                 ],
                 temperature=0.3,  # 일관성을 위해 낮은 온도
                 max_tokens=3000,
-                stream=True
+                **extra
             )
             
-            # 스트리밍 응답 처리
-            full_response = ""
-            async for chunk in stream:
-                if chunk.choices[0].delta.content is not None:
-                    content = chunk.choices[0].delta.content
-                    full_response += content
-                    yield {
-                        "type": "content",
-                        "content": content
-                    }
+            # 스트리밍 응답 처리 (워크플로우 모드는 작업이 완성되는 대로 task 이벤트 전달)
+            parts = []
+            task_parser = TaskStreamParser() if mode == "workflow" else None
+            async for content in stream:
+                parts.append(content)
+                yield {
+                    "type": "content",
+                    "content": content
+                }
+                if task_parser:
+                    for task in task_parser.feed(content):
+                        yield {
+                            "type": "task",
+                            "index": task_parser.count - 1,
+                            "task": self._apply_task_defaults(task, task_parser.count - 1)
+                        }
+            full_response = "".join(parts)
             
             # JSON 파싱 시도 및 검증 (워크플로우 모드에서만)
             if mode == "workflow":
                 try:
-                    parsed_response = self._parse_and_validate_response(full_response)
+                    parsed_response = self._parse_response(full_response, output_model)
                     logger.info(f"워크플로우 변환 성공: {parsed_response.get('workflow_title', 'Unknown')}")
                     yield {
                         "type": "done",
                         "full_response": json.dumps(parsed_response, ensure_ascii=False, indent=2)
                     }
-                except json.JSONDecodeError as e:
+                except (json.JSONDecodeError, ValidationError) as e:
                     # JSON 파싱 실패 시 원본 응답 로깅 후 기본 응답으로 fallback
                     logger.warning(f"JSON 파싱 실패: {str(e)}")
                     logger.warning(f"원본 응답 (처음 500자): {full_response[:500]}")
@@ -121,20 +139,27 @@ class AIPlanner:
             # 구조화된 투자 분석 전문 프롬프트
             system_prompt = self._get_structured_system_prompt()
             
+            # 구조화 출력이 켜져 있으면 JSON 스키마로 응답 형식 강제
+            output_model = PlanOutput if settings.LLM_STRUCTURED_OUTPUTS else None
+            extra = {"response_format": json_schema_format(output_model)} if output_model else {}
+            
             # OpenAI API 호출
-            response = await self.client.chat.completions.create(
+            ai_response = await completion_text(
+                self.api_key,
+                timeout=settings.OPENAI_REPORT_TIMEOUT,
+                validate=lambda text: self._is_parsable(text, output_model),
                 model="gpt-4o",
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_query}
                 ],
                 temperature=0.3,
-                max_tokens=3000
+                max_tokens=3000,
+                **extra
             )
             
             # 응답 파싱 및 검증
-            ai_response = response.choices[0].message.content
-            parsed_response = self._parse_and_validate_response(ai_response)
+            parsed_response = self._parse_response(ai_response, output_model)
             
             logger.info("AI 플랜 생성 완료")
             return parsed_response
@@ -593,6 +618,23 @@ class AIPlanner:
             "complexity": "medium"
         }
     
+    def _is_parsable(self, response: str, output_model: Optional[Type[BaseModel]] = None) -> bool:
+        """응답 캐시 저장 조건 (파싱/검증 가능한 응답)"""
+        try:
+            self._parse_response(response, output_model)
+        except (json.JSONDecodeError, ValidationError):
+            return False
+        return True
+    
+    def _parse_response(self, response: str, output_model: Optional[Type[BaseModel]] = None) -> Dict[str, Any]:
+        """응답 파싱 (구조화 출력은 스키마 검증만, 그 외는 JSON 추출 후 검증)"""
+        if output_model is None:
+            return self._parse_and_validate_response(response)
+        parsed = output_model.model_validate_json(response).model_dump()
+        if output_model is WorkflowOutput:
+            return self._validate_workflow_response(parsed)
+        return self._validate_plan_response(parsed)
+    
     def _parse_and_validate_response(self, response: str) -> Dict[str, Any]:
         """AI 응답을 파싱하고 검증"""
         try:
@@ -652,27 +694,29 @@ class AIPlanner:
         
         # 각 task 검증
         for i, task in enumerate(parsed["tasks"]):
-            if not isinstance(task, dict):
-                continue
-                
-            # task 필수 필드 검증
-            task_defaults = {
-                "id": f"task_{i+1}",
-                "title": f"작업 {i+1}",
-                "description": "작업 설명",
-                "agent_allowed": ["financial_analyst"],
-                "mcp_tools": ["stock_data_fetcher"],
-                "dependencies": [],
-                "estimated_time": "5분",
-                "output_type": "table"
-            }
-            
-            for field, default_value in task_defaults.items():
-                if field not in task:
-                    task[field] = default_value
+            if isinstance(task, dict):
+                self._apply_task_defaults(task, i)
         
         return parsed
 
+    def _apply_task_defaults(self, task: Dict[str, Any], index: int) -> Dict[str, Any]:
+        """task 필수 필드 기본값 설정"""
+        task_defaults = {
+            "id": f"task_{index+1}",
+            "title": f"작업 {index+1}",
+            "description": "작업 설명",
+            "agent_allowed": ["financial_analyst"],
+            "mcp_tools": ["stock_data_fetcher"],
+            "dependencies": [],
+            "estimated_time": "5분",
+            "output_type": "table"
+        }
+        
+        for field, default_value in task_defaults.items():
+            if field not in task:
+                task[field] = default_value
+        return task
+
     def _validate_plan_response(self, parsed: Dict[str, Any]) -> Dict[str, Any]:
         """일반 계획 응답 검증 및 기본값 설정"""
         # 필수 필드 검증 및 기본값 설정
@@ -0,0 +1,119 @@
+"""
+워크플로우 실행 이벤트 피드
+실행별 이벤트를 프로세스 내 추가 전용 로그에 쌓고, 같은 실행을 보는 여러 구독자가
+하나의 로그를 공유합니다. 각 이벤트에는 순번(offset)이 있어 연결이 끊긴 클라이언트는
+마지막으로 받은 순번 다음부터 다시 구독할 수 있습니다.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+# 종료된 실행의 이벤트 로그를 보관하는 개수 (늦게 접속한 구독자 재생용)
+RETAINED_EXECUTIONS = 64
+
+
+class ExecutionChannel:
+    """실행 하나의 이벤트 로그"""
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self.closed = False
+        self.started = time.monotonic()
+        self.condition = asyncio.Condition()
+
+    async def append(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        async with self.condition:
+            event = {
+                "offset": len(self.events),
+                **event,
+                "elapsed": round(time.monotonic() - self.started, 3),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            }
+            self.events.append(event)
+            self.condition.notify_all()
+        return event
+
+    async def close(self) -> None:
+        async with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class ExecutionEventBus:
+    """실행 ID별 이벤트 발행/구독"""
+
+    def __init__(self, retained: int = RETAINED_EXECUTIONS):
+        self.retained = retained
+        self._channels: "OrderedDict[int, ExecutionChannel]" = OrderedDict()
+
+    def open(self, execution_id: int) -> ExecutionChannel:
+        """실행 시작 시 이벤트 로그 생성 (종료된 실행을 재개하면 새 로그로 교체)"""
+        channel = self._channels.get(execution_id)
+        if channel is None or channel.closed:
+            # 닫힌 로그에는 발행할 수 없으므로 재개한 실행의 이벤트가 사라지지 않도록 새로 만듦
+            self._channels.pop(execution_id, None)
+            channel = self._channels[execution_id] = ExecutionChannel()
+        self._evict()
+        return channel
+
+    def _evict(self) -> None:
+        # 종료된 실행만 오래된 순으로 정리
+        closed = [eid for eid, channel in self._channels.items() if channel.closed]
+        for eid in closed[:max(0, len(self._channels) - self.retained)]:
+            del self._channels[eid]
+
+    def get(self, execution_id: int) -> Optional[ExecutionChannel]:
+        return self._channels.get(execution_id)
+
+    async def publish(self, execution_id: int, event_type: str, node_id: Optional[str] = None,
+                      **data: Any) -> Optional[Dict[str, Any]]:
+        """이벤트 발행 (구독자가 없어도 로그에 남음)"""
+        channel = self._channels.get(execution_id)
+        if channel is None or channel.closed:
+            return None
+        event = {"type": event_type, **data}
+        if node_id is not None:
+            event["node_id"] = node_id
+        return await channel.append(event)
+
+    async def close(self, execution_id: int) -> None:
+        """실행 종료 (구독자는 남은 이벤트를 받은 뒤 종료)"""
+        channel = self._channels.get(execution_id)
+        if channel is not None:
+            await channel.close()
+        self._evict()
+
+    async def subscribe(self, execution_id: int, offset: int = 0,
+                        heartbeat: Optional[float] = None) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """offset부터 이벤트 구독 (heartbeat 초 동안 새 이벤트가 없으면 None)"""
+        channel = self._channels.get(execution_id)
+        if channel is None:
+            return
+        offset = max(0, offset)
+
+        while True:
+            async with channel.condition:
+                ready = lambda: len(channel.events) > offset or channel.closed
+                try:
+                    await asyncio.wait_for(channel.condition.wait_for(ready), timeout=heartbeat)
+                    idle = False
+                except asyncio.TimeoutError:
+                    idle = True
+                batch = channel.events[offset:]
+                finished = channel.closed
+
+            if idle:
+                yield None
+                continue
+            for event in batch:
+                yield event
+            offset += len(batch)
+            if finished and offset >= len(channel.events):
+                return
+
+
+# 프로세스 전역 이벤트 피드
+execution_events = ExecutionEventBus()
@@ -0,0 +1,188 @@
+"""
+채팅 기록 압축
+워크플로우 변환 요청에 붙는 대화 기록을 토큰 예산 안으로 줄입니다. 최근 대화는 그대로
+두고, 그 이전 대화는 요약 하나로 합칩니다. 요약은 대화별로 보관해 다음 요청에서는
+새로 밀려난 대화만 기존 요약에 덧붙여 갱신합니다.
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.llm_calls import completion_text
+from app.services.token_counter import count_tokens, truncate_to_tokens
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 프론트엔드가 보내는 대화 형식: "사용자: ..." / "AI: ..." 를 빈 줄로 구분
+TURN_PATTERN = re.compile(r"(?:^|\n\n)(사용자|AI): ")
+
+WORKFLOW_QUERY_TEMPLATE = "다음 대화 내용을 워크플로우로 변환해주세요:\n\n{history}\n\n사용자 추가 요청: {message}"
+SUMMARY_HEADER = "[이전 대화 요약]"
+
+# 보관하는 대화 요약 수
+MAX_SUMMARIES = 256
+# 발췌 요약에서 턴마다 남기는 토큰 수
+EXTRACT_LINE_TOKENS = 40
+
+SUMMARY_PROMPT = """다음은 투자 분석 상담 대화의 요약과 그 뒤에 이어진 대화입니다.
+두 내용을 합쳐 하나의 요약으로 갱신해주세요. 사용자가 관심을 보인 종목/업종/지표,
+분석 조건(기간, 시장, 수치 기준), AI가 제안한 분석 단계를 빠짐없이 남기고
+인사말과 반복 설명은 생략하세요. {max_tokens}토큰 이내의 한국어 불릿 목록으로 작성하세요.
+
+[기존 요약]
+{summary}
+
+[이어진 대화]
+{turns}
+"""
+
+Turn = Tuple[str, str]
+
+
+def split_turns(history: str) -> List[Turn]:
+    """대화 기록 문자열 -> (화자, 내용) 목록 (형식이 다르면 전체를 한 턴으로)"""
+    matches = list(TURN_PATTERN.finditer(history))
+    if not matches:
+        return [("", history.strip())] if history.strip() else []
+    turns = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(history)
+        turns.append((match.group(1), history[match.end():end].strip()))
+    return turns
+
+
+def format_turn(turn: Turn) -> str:
+    speaker, content = turn
+    return f"{speaker}: {content}" if speaker else content
+
+
+def _turn_hash(turn: Turn) -> str:
+    return hashlib.sha256(format_turn(turn).encode("utf-8")).hexdigest()[:16]
+
+
+class HistoryPacker:
+    """토큰 예산 안으로 대화 기록 압축 (대화별 요약 캐시)"""
+
+    def __init__(self, budget: int = settings.CHAT_HISTORY_TOKEN_BUDGET,
+                 recent_turns: int = settings.CHAT_HISTORY_RECENT_TURNS,
+                 summary_tokens: int = settings.CHAT_SUMMARY_MAX_TOKENS,
+                 model: str = settings.CHAT_SUMMARY_MODEL, max_summaries: int = MAX_SUMMARIES):
+        self.budget = budget
+        self.recent_turns = recent_turns
+        self.summary_tokens = summary_tokens
+        self.model = model
+        self.max_summaries = max_summaries
+        # 대화 키 -> (요약에 반영된 턴 해시 목록, 요약)
+        self._summaries: "OrderedDict[str, Tuple[List[str], str]]" = OrderedDict()
+
+    @staticmethod
+    def conversation_key(conversation_id: Optional[int], turns: List[Turn]) -> str:
+        """대화 식별 키 (ID가 없으면 첫 턴 내용으로 식별)"""
+        if conversation_id is not None:
+            return f"id:{conversation_id}"
+        return f"first:{_turn_hash(turns[0])}" if turns else "empty"
+
+    async def build_workflow_query(self, history: str, message: str, api_key: Optional[str],
+                                   conversation_id: Optional[int] = None) -> str:
+        """워크플로우 변환 쿼리 (전체가 토큰 예산 이내)"""
+        fixed = count_tokens(WORKFLOW_QUERY_TEMPLATE.format(history="", message=message))
+        packed = await self.pack(history, self.budget - fixed, api_key, conversation_id)
+        query = WORKFLOW_QUERY_TEMPLATE.format(history=packed, message=message)
+        logger.info("워크플로우 변환 쿼리 구성", history_chars=len(history), query_chars=len(query),
+                    query_tokens=count_tokens(query), budget=self.budget)
+        return query
+
+    async def pack(self, history: str, budget: int, api_key: Optional[str],
+                   conversation_id: Optional[int] = None) -> str:
+        """대화 기록을 budget 토큰 이내로 압축"""
+        if count_tokens(history) <= budget:
+            return history
+        turns = split_turns(history)
+        if not turns:
+            return ""
+
+        # 최근 턴은 예산이 허락하는 만큼 그대로 유지 (요약 자리는 미리 확보)
+        recent_budget = budget - (self.summary_tokens + count_tokens(SUMMARY_HEADER) + 2)
+        recent: List[str] = []
+        used = 0
+        for turn in reversed(turns[-self.recent_turns:]):
+            text = format_turn(turn)
+            cost = count_tokens(text) + 1
+            if used + cost > recent_budget:
+                if not recent:
+                    # 마지막 턴 하나도 넘치면 뒷부분만 유지
+                    recent.append(truncate_to_tokens(text, recent_budget, keep="tail"))
+                break
+            recent.append(text)
+            used += cost
+        recent.reverse()
+
+        older = turns[:len(turns) - len(recent)]
+        parts = []
+        if older:
+            key = self.conversation_key(conversation_id, turns)
+            summary = await self._summarize(key, older, api_key)
+            parts.append(f"{SUMMARY_HEADER}\n{truncate_to_tokens(summary, self.summary_tokens)}")
+        parts.extend(recent)
+        return truncate_to_tokens("\n\n".join(parts), budget, keep="tail")
+
+    async def _summarize(self, key: str, older: List[Turn], api_key: Optional[str]) -> str:
+        """이전 턴 요약 (캐시된 요약이 앞부분을 덮으면 새 턴만 반영)"""
+        hashes = [_turn_hash(turn) for turn in older]
+        cached = self._summaries.get(key)
+        if cached and hashes[:len(cached[0])] == cached[0]:
+            covered, summary = cached
+            if len(covered) == len(hashes):
+                self._summaries.move_to_end(key)
+                return summary
+        else:
+            covered, summary = [], ""
+
+        new_turns = older[len(covered):]
+        updated = await self._update_summary(summary, new_turns, api_key)
+        self._summaries[key] = (hashes, updated)
+        self._summaries.move_to_end(key)
+        while len(self._summaries) > self.max_summaries:
+            self._summaries.popitem(last=False)
+        logger.info("대화 요약 갱신", conversation=key, covered=len(covered), added=len(new_turns))
+        return updated
+
+    async def _update_summary(self, summary: str, new_turns: List[Turn], api_key: Optional[str]) -> str:
+        # 요약 입력도 예산 안으로 (한 번에 밀려난 턴이 많으면 앞부분을 자름)
+        turns_text = truncate_to_tokens(
+            "\n\n".join(format_turn(turn) for turn in new_turns), self.budget, keep="tail"
+        )
+        if api_key:
+            try:
+                text = await completion_text(
+                    api_key,
+                    model=self.model,
+                    messages=[{"role": "user", "content": SUMMARY_PROMPT.format(
+                        max_tokens=self.summary_tokens, summary=summary or "(없음)", turns=turns_text
+                    )}],
+                    temperature=0.0,
+                    max_tokens=self.summary_tokens,
+                )
+                if text.strip():
+                    return text.strip()
+            except Exception as e:
+                logger.warning("대화 요약 실패, 발췌 요약 사용", error=str(e))
+        return self._extractive_summary(summary, new_turns)
+
+    def _extractive_summary(self, summary: str, new_turns: List[Turn]) -> str:
+        """LLM 없이 각 턴의 첫 줄을 발췌해 요약 (오래된 줄부터 버림)"""
+        lines = [summary] if summary else []
+        for speaker, content in new_turns:
+            first_line = content.strip().splitlines()[0] if content.strip() else ""
+            lines.append(f"- {speaker or '대화'}: {truncate_to_tokens(first_line, EXTRACT_LINE_TOKENS)}")
+        while len(lines) > 1 and count_tokens("\n".join(lines)) > self.summary_tokens:
+            lines.pop(0)
+        return truncate_to_tokens("\n".join(lines), self.summary_tokens)
+
+
+# 프로세스 전역 대화 기록 압축기
+history_packer = HistoryPacker()
@@ -0,0 +1,150 @@
+"""
+LLM 응답 캐시
+정규화한 메시지, 모델, temperature 등 호출 인자를 키로 완성 응답(스트리밍은 청크 목록)을
+보관합니다. 메모리 LRU + TTL이 기본이며, 디렉터리를 지정하면 디스크에도 저장해
+재시작 후와 여러 워커 사이에서 재사용합니다.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 키에서 제외하는 호출 인자 (응답 내용에 영향 없음)
+IGNORED_KWARGS = {"stream", "timeout"}
+
+
+def _normalize(text: Any) -> Any:
+    # 공백 차이만 있는 프롬프트는 같은 요청으로 취급
+    return " ".join(text.split()) if isinstance(text, str) else text
+
+
+def cache_key(kind: str, kwargs: Dict[str, Any]) -> str:
+    """호출 인자 -> 캐시 키 (kind: text/stream)"""
+    payload = {
+        "kind": kind,
+        "messages": [
+            {"role": m.get("role"), "content": _normalize(m.get("content"))}
+            for m in kwargs.get("messages", [])
+        ],
+        **{k: v for k, v in kwargs.items() if k != "messages" and k not in IGNORED_KWARGS},
+    }
+    text = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """TTL + 크기 제한 LLM 응답 캐시 (메모리, 선택적으로 디스크)"""
+
+    def __init__(self, max_entries: int = settings.LLM_CACHE_SIZE, ttl: float = settings.LLM_CACHE_TTL,
+                 cache_dir: Optional[str] = settings.LLM_CACHE_DIR or None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        # key -> (만료 시각, 값)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    # ------------------------------------------------------------------
+    # 디스크
+    # ------------------------------------------------------------------
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[tuple]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if entry["expires"] <= time.time():
+            self._path(key).unlink(missing_ok=True)
+            return None
+        return entry["expires"], entry["value"]
+
+    def _write_disk(self, key: str, expires: float, value: Any) -> None:
+        tmp = self._path(key).with_suffix(".tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"expires": expires, "value": value}, f, ensure_ascii=False)
+            tmp.replace(self._path(key))
+        except OSError as e:
+            logger.warning("LLM 캐시 디스크 저장 실패", error=str(e))
+
+    # ------------------------------------------------------------------
+    # 조회/저장
+    # ------------------------------------------------------------------
+    async def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= now:
+            del self._entries[key]
+            entry = None
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+        if self.cache_dir:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is not None:
+                self._store(key, entry)
+                self._stats["disk_hits"] += 1
+                return entry[1]
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        expires = time.time() + self.ttl
+        self._store(key, (expires, value))
+        if self.cache_dir:
+            await asyncio.to_thread(self._write_disk, key, expires, value)
+
+    def _store(self, key: str, entry: tuple) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        if self.cache_dir:
+            for path in self.cache_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        total = self._stats["hits"] + self._stats["disk_hits"] + self._stats["misses"]
+        hits = self._stats["hits"] + self._stats["disk_hits"]
+        return {
+            **self._stats,
+            "hit_rate": round(hits / total, 4) if total else None,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "disk": str(self.cache_dir) if self.cache_dir else None,
+        }
+
+
+# 프로세스 전역 LLM 응답 캐시
+llm_cache = LLMResponseCache()
+
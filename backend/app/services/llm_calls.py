@@ -0,0 +1,148 @@
+"""
+비동기 LLM 호출 유틸리티
+공유 레지스트리의 비동기 클라이언트로 호출하고, 호출별 제한 시간과
+클라이언트 연결 종료 시 호출 취소를 처리합니다. completion_text/completion_stream은
+같은 요청의 응답을 LLM 응답 캐시에서 재사용합니다.
+"""
+
+import asyncio
+from contextlib import suppress
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Type, TypeVar
+
+from fastapi import Request
+from pydantic import BaseModel, ValidationError
+
+from app.core.config import settings
+from app.schemas.llm_output import json_schema_format
+from app.services.llm_cache import cache_key, llm_cache
+from app.services.openai_clients import get_async_client
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+M = TypeVar("M", bound=BaseModel)
+
+# 연결 종료 확인 주기 (초)
+DISCONNECT_POLL_INTERVAL = 0.5
+
+
+class ClientDisconnected(Exception):
+    """요청한 클라이언트가 응답 전에 연결을 끊음"""
+
+
+async def cancel_on_disconnect(request: Optional[Request], awaitable: Awaitable[T],
+                               poll_interval: float = DISCONNECT_POLL_INTERVAL) -> T:
+    """클라이언트 연결이 끊기면 진행 중인 작업을 취소"""
+    task = asyncio.ensure_future(awaitable)
+    if request is None:
+        return await task
+
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+                raise ClientDisconnected()
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+
+async def chat_completion(api_key: str, *, request: Optional[Request] = None,
+                          timeout: float = settings.OPENAI_REQUEST_TIMEOUT, **kwargs: Any):
+    """비동기 chat completion 호출 (제한 시간 초과 시 asyncio.TimeoutError)"""
+    client = get_async_client(api_key)
+    call = client.chat.completions.create(timeout=timeout, **kwargs)
+    try:
+        return await asyncio.wait_for(cancel_on_disconnect(request, call), timeout=timeout)
+    except ClientDisconnected:
+        logger.info("클라이언트 연결 종료로 LLM 호출 취소", model=kwargs.get("model"))
+        raise
+
+
+async def completion_text(api_key: str, *, request: Optional[Request] = None,
+                          timeout: float = settings.OPENAI_REQUEST_TIMEOUT, use_cache: bool = True,
+                          validate: Optional[Callable[[str], bool]] = None, **kwargs: Any) -> str:
+    """chat completion 응답 본문 (캐시 우선, validate를 통과한 응답만 캐시에 저장)"""
+    key = cache_key("text", kwargs)
+    if use_cache:
+        cached = await llm_cache.get(key)
+        if cached is not None:
+            logger.debug("LLM 캐시 적중", model=kwargs.get("model"))
+            return cached
+
+    response = await chat_completion(api_key, request=request, timeout=timeout, **kwargs)
+    text = response.choices[0].message.content or ""
+    if use_cache and text and (validate is None or validate(text)):
+        await llm_cache.set(key, text)
+    return text
+
+
+async def completion_stream(api_key: str, *, request: Optional[Request] = None,
+                            timeout: float = settings.OPENAI_REQUEST_TIMEOUT, use_cache: bool = True,
+                            validate: Optional[Callable[[str], bool]] = None,
+                            **kwargs: Any) -> AsyncIterator[str]:
+    """스트리밍 chat completion 토큰
+
+    캐시 적중 시 저장된 청크를 지연 없이 그대로 재생합니다. 새로 받은 응답은 스트림이
+    끝까지 완료되고 validate를 통과한 경우에만 저장합니다. 중간에 멈추면 스트림을 닫습니다.
+    """
+    key = cache_key("stream", kwargs)
+    if use_cache:
+        cached = await llm_cache.get(key)
+        if cached is not None:
+            logger.debug("LLM 캐시 적중 (스트리밍)", model=kwargs.get("model"))
+            for chunk in cached:
+                yield chunk
+            return
+
+    stream = await chat_completion(api_key, request=request, timeout=timeout, stream=True, **kwargs)
+    chunks: List[str] = []
+    loop = asyncio.get_running_loop()
+    next_poll = loop.time() + DISCONNECT_POLL_INTERVAL
+    try:
+        async for chunk in stream:
+            token = chunk.choices[0].delta.content if chunk.choices else None
+            if token:
+                chunks.append(token)
+                yield token
+            # 스트리밍 중에도 주기적으로 연결 종료 확인
+            if request is not None and loop.time() >= next_poll:
+                next_poll = loop.time() + DISCONNECT_POLL_INTERVAL
+                if await request.is_disconnected():
+                    logger.info("클라이언트 연결 종료로 LLM 스트림 중단", model=kwargs.get("model"))
+                    raise ClientDisconnected()
+    finally:
+        # 소비자가 중간에 멈춰도 (연결 종료, 조기 종료, 마감 시간) HTTP 연결을 풀에 반환
+        await stream.close()
+
+    if use_cache and chunks and (validate is None or validate("".join(chunks))):
+        await llm_cache.set(key, chunks)
+
+
+async def structured_completion(api_key: str, output_model: Type[M], *, request: Optional[Request] = None,
+                                timeout: float = settings.OPENAI_REQUEST_TIMEOUT, use_cache: bool = True,
+                                **kwargs: Any) -> M:
+    """JSON 스키마로 응답 형식을 강제한 chat completion (pydantic 모델로 반환)
+
+    응답은 스키마에 맞게 생성되므로 JSON 추출/재시도 없이 바로 검증합니다.
+    """
+    text = await completion_text(
+        api_key, request=request, timeout=timeout, use_cache=use_cache,
+        validate=lambda body: _validates(output_model, body),
+        response_format=json_schema_format(output_model), **kwargs,
+    )
+    return output_model.model_validate_json(text)
+
+
+def _validates(output_model: Type[BaseModel], text: str) -> bool:
+    try:
+        output_model.model_validate_json(text)
+    except ValidationError:
+        return False
+    return True
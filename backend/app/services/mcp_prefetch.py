@@ -0,0 +1,173 @@
+"""
+MCP 데이터 선행 조회 (speculative prefetch)
+LLM이 워크플로우를 생성하는 동안 사용자 질의(종목코드, 섹터/시장 키워드)와 스트리밍으로
+완성된 작업을 보고, 첫 노드들이 호출할 가능성이 높은 MCP 도구를 백그라운드에서 미리 호출합니다.
+노드 실행 시 같은 (도구, 인자) 호출은 진행 중이거나 끝난 선행 조회 결과를 그대로 씁니다.
+
+작업은 로컬 도구 선택기가 확신하는 경우만 조회하므로(노드 실행 때 같은 선택/인자가 나옴)
+빗나간 조회가 적고, 세션별 조회 수/동시 조회 수/조회 시간/결과 보관 시간으로 비용을 제한합니다.
+"""
+
+import asyncio
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.node_memo import tool_key
+from app.services.tool_classifier import KEYWORD_RULES, ToolClassifier, _TICKER, _compact, default_parameters
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+Fetch = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+# 질의 키워드로 선행 조회하는 데이터 수집 도구 (질의만으로 인자가 정해지는 도구)
+QUERY_TOOLS = ("get_all_tickers", "get_market_cap", "get_sector_performance", "get_market_breadth")
+
+
+class _Entry:
+    """선행 조회 하나 (진행 중이면 task, 끝나면 결과/만료 시각)"""
+
+    __slots__ = ("task", "expires")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.expires: Optional[float] = None
+
+
+class PrefetchSession:
+    """워크플로우 생성 스트림 하나의 선행 조회 (조회 수 예산, 취소 단위)"""
+
+    def __init__(self, prefetcher: "MCPPrefetcher", fetch: Fetch, classifier: ToolClassifier):
+        self.prefetcher = prefetcher
+        self.fetch = fetch
+        self.classifier = classifier
+        self.budget = settings.MCP_PREFETCH_MAX_FETCHES
+        self._keys: List[str] = []
+
+    def observe_query(self, text: str) -> None:
+        """사용자 질의의 종목코드/키워드로 조회 예약"""
+        for ticker in list(dict.fromkeys(_TICKER.findall(text)))[:self.budget]:
+            self._schedule("get_stock_fundamentals", {"ticker": ticker})
+        compact = _compact(text)
+        for tool_name in QUERY_TOOLS:
+            if any(keyword in compact for keyword in KEYWORD_RULES[tool_name]):
+                self._schedule(tool_name, default_parameters(tool_name, text))
+
+    def observe_task(self, task: Dict[str, Any]) -> None:
+        """완성된 작업의 도구/인자가 확실하면 조회 예약 (노드 label=title, prompt=description)"""
+        decision = self.classifier.classify(task.get("title", ""), task.get("description", ""), record=False)
+        if decision["accepted"]:
+            self._schedule(decision["tool_name"], decision["parameters"])
+
+    def _schedule(self, tool_name: str, parameters: Optional[Dict[str, Any]]) -> None:
+        if parameters is None or self.budget <= 0:
+            return
+        key = self.prefetcher.schedule(tool_name, parameters, self.fetch)
+        if key is not None:
+            self.budget -= 1
+            self._keys.append(key)
+
+    def cancel(self) -> None:
+        """끝나지 않은 조회 취소 (스트림 오류/클라이언트 연결 종료)"""
+        self.prefetcher.cancel(self._keys)
+
+
+class MCPPrefetcher:
+    """(도구, 인자) 해시 -> 선행 조회 결과 (프로세스 메모리, TTL)"""
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._stats: Counter = Counter()
+
+    @staticmethod
+    def key(tool_name: str, parameters: Dict[str, Any]) -> str:
+        return tool_key(tool_name, parameters, None)
+
+    def session(self, fetch: Fetch, classifier: ToolClassifier) -> PrefetchSession:
+        return PrefetchSession(self, fetch, classifier)
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, e in self._entries.items() if e.expires is not None and e.expires <= now]:
+            del self._entries[key]
+
+    def schedule(self, tool_name: str, parameters: Dict[str, Any], fetch: Fetch) -> Optional[str]:
+        """백그라운드 조회 시작 (이미 있거나 비활성화면 None)"""
+        if not settings.MCP_PREFETCH_ENABLED:
+            return None
+        self._prune()
+        key = self.key(tool_name, parameters)
+        if key in self._entries:
+            return None
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(settings.MCP_PREFETCH_CONCURRENCY)
+        entry = _Entry(asyncio.create_task(self._run(tool_name, parameters, fetch)))
+        entry.task.add_done_callback(lambda task: self._finished(key, entry, task))
+        self._entries[key] = entry
+        self._stats["scheduled"] += 1
+        logger.info("MCP 선행 조회 시작", tool_name=tool_name, parameters=parameters)
+        return key
+
+    async def _run(self, tool_name: str, parameters: Dict[str, Any], fetch: Fetch) -> Optional[Dict[str, Any]]:
+        async with self._semaphore:
+            try:
+                return await asyncio.wait_for(fetch(tool_name, parameters), timeout=settings.MCP_PREFETCH_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning("MCP 선행 조회 시간 초과", tool_name=tool_name)
+            except Exception as e:
+                # 서버 호출 실패 결과는 저장하지 않음 (노드 실행 때 다시 호출)
+                logger.warning("MCP 선행 조회 실패", tool_name=tool_name, error=str(e))
+            return None
+
+    def _finished(self, key: str, entry: _Entry, task: asyncio.Task) -> None:
+        if self._entries.get(key) is not entry:
+            return
+        if task.cancelled() or task.result() is None:
+            del self._entries[key]
+            self._stats["cancelled" if task.cancelled() else "failed"] += 1
+        else:
+            entry.expires = time.monotonic() + settings.MCP_PREFETCH_TTL
+            self._stats["completed"] += 1
+
+    def cancel(self, keys: List[str]) -> None:
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is not None and not entry.task.done():
+                entry.task.cancel()
+
+    async def take(self, tool_name: str, parameters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """선행 조회 결과 (진행 중이면 완료까지 대기, 없거나 실패면 None)"""
+        entry = self._entries.get(self.key(tool_name, parameters))
+        if entry is None or (entry.expires is not None and entry.expires <= time.monotonic()):
+            return None
+        in_flight = not entry.task.done()
+        try:
+            # 대기 중인 호출자가 취소되어도 선행 조회는 계속
+            result = await asyncio.shield(entry.task)
+        except asyncio.CancelledError:
+            if entry.task.cancelled():
+                return None
+            raise
+        if result is not None:
+            self._stats["joined" if in_flight else "hits"] += 1
+        return result
+
+    def metrics(self) -> Dict[str, Any]:
+        self._prune()
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "in_flight": sum(1 for e in self._entries.values() if not e.task.done()),
+            "enabled": settings.MCP_PREFETCH_ENABLED,
+        }
+
+    def clear(self) -> None:
+        self.cancel(list(self._entries))
+        self._entries.clear()
+
+
+# 프로세스 전역 MCP 선행 조회 저장소
+mcp_prefetcher = MCPPrefetcher()
@@ -0,0 +1,104 @@
+"""
+워크플로우 노드 결과 메모이제이션
+노드 결과를 입력 내용(노드 프롬프트, 선행 노드 결과 해시, 데이터 기준 거래일)의 해시로,
+MCP 도구 결과를 (도구, 인자, 거래일)의 해시로 저장합니다. 다시 실행할 때 입력이 같은
+노드는 저장된 결과를 쓰고, 바뀐 노드와 그 하위 노드만 다시 계산합니다.
+"""
+
+import hashlib
+import json
+from datetime import datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import AsyncSessionLocal
+from app.models.workflow import NodeResultCache
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+KST = timezone(timedelta(hours=9))
+MARKET_OPEN = time(9, 0)
+MARKET_CLOSE = time(15, 30)
+
+# 결과 해시에 포함하는 필드 (실행 시각/소요 시간 등은 제외)
+RESULT_FIELDS = ("tool_name", "parameters", "raw_result", "analysis")
+
+
+def session_date(now: Optional[datetime] = None) -> Optional[str]:
+    """데이터 기준 거래일 (장중에는 데이터가 계속 바뀌므로 None)"""
+    now = now.astimezone(KST) if now else datetime.now(KST)
+    is_weekday = now.weekday() < 5
+    if is_weekday and MARKET_OPEN <= now.time() < MARKET_CLOSE:
+        return None
+
+    day = now.date()
+    if not is_weekday or now.time() < MARKET_OPEN:
+        # 주말/개장 전은 직전 평일 (휴장일은 구분하지 않음)
+        day -= timedelta(days=1)
+        while day.weekday() >= 5:
+            day -= timedelta(days=1)
+    return day.strftime("%Y%m%d")
+
+
+def content_hash(payload: Any) -> str:
+    """JSON 정규화 후 SHA-256"""
+    text = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def node_key(node: Dict[str, Any], upstream_hashes: List[str], session: Optional[str]) -> str:
+    """노드 결과 키 (노드 내용 + 선행 노드 결과 해시 + 거래일)"""
+    return content_hash({
+        "kind": "node",
+        "node_type": node["node_type"],
+        "title": node["title"],
+        "prompt": node["prompt"],
+        "config": node.get("config") or {},
+        "upstream": upstream_hashes,
+        "session": session,
+    })
+
+
+def tool_key(tool_name: str, parameters: Dict[str, Any], session: Optional[str]) -> str:
+    """MCP 도구 결과 키 (도구 + 인자 + 거래일)"""
+    return content_hash({"kind": "tool", "tool_name": tool_name, "parameters": parameters, "session": session})
+
+
+def result_hash(result: Dict[str, Any]) -> str:
+    """노드 결과 내용 해시 (하위 노드 키 계산용)"""
+    return content_hash({field: result.get(field) for field in RESULT_FIELDS})
+
+
+class NodeMemo:
+    """내용 해시 키 -> 결과 저장소 (node_result_cache 테이블)"""
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        async with AsyncSessionLocal() as session:
+            stmt = select(NodeResultCache.result_data).where(NodeResultCache.cache_key == key)
+            return (await session.execute(stmt)).scalar_one_or_none()
+
+    async def put(self, key: str, kind: str, session_day: str, data: Dict[str, Any]) -> None:
+        async with AsyncSessionLocal() as session:
+            session.add(NodeResultCache(cache_key=key, kind=kind, session_date=session_day, result_data=data))
+            try:
+                await session.commit()
+            except IntegrityError:
+                # 동시에 같은 키를 계산한 경우 먼저 저장된 결과 유지
+                await session.rollback()
+
+    async def prune(self, retention_days: int) -> int:
+        """보관 기간이 지난 결과 삭제"""
+        cutoff = (datetime.now(KST) - timedelta(days=retention_days)).strftime("%Y%m%d")
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(delete(NodeResultCache).where(NodeResultCache.session_date < cutoff))
+            await session.commit()
+        if result.rowcount:
+            logger.info("노드 결과 캐시 정리", deleted=result.rowcount, cutoff=cutoff)
+        return result.rowcount
+
+
+# 프로세스 전역 노드 결과 저장소
+node_memo = NodeMemo()
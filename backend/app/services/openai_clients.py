@@ -0,0 +1,156 @@
+"""
+OpenAI 클라이언트 레지스트리
+API 키 해시별로 OpenAI 클라이언트를 재사용하고, 모든 클라이언트가 크기가 제한된
+keep-alive 연결 풀 하나를 공유하도록 합니다. 오래 쓰지 않은 클라이언트는 LRU로 정리합니다.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+from app.core.config import settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def hash_api_key(api_key: str) -> str:
+    """API 키 식별용 해시 (원문 키는 보관/로그하지 않음)"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+class OpenAIClientRegistry:
+    """프로세스 전역 OpenAI 클라이언트 레지스트리"""
+
+    def __init__(
+        self,
+        max_clients: int = settings.OPENAI_CLIENT_CACHE_SIZE,
+        max_connections: int = settings.OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections: int = settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = settings.OPENAI_KEEPALIVE_EXPIRY,
+        idle_ttl: float = settings.OPENAI_CLIENT_IDLE_TTL,
+    ):
+        self.max_clients = max_clients
+        self.idle_ttl = idle_ttl
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._async_http: Optional[httpx.AsyncClient] = None
+        self._sync_http: Optional[httpx.Client] = None
+        # (kind, key_hash) -> [client, last_used]
+        self._clients: "OrderedDict[tuple, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    # ------------------------------------------------------------------
+    # 공유 연결 풀
+    # ------------------------------------------------------------------
+    def _shared_async_http(self) -> httpx.AsyncClient:
+        if self._async_http is None or self._async_http.is_closed:
+            self._async_http = DefaultAsyncHttpxClient(limits=self.limits)
+        return self._async_http
+
+    def _shared_sync_http(self) -> httpx.Client:
+        if self._sync_http is None or self._sync_http.is_closed:
+            self._sync_http = DefaultHttpxClient(limits=self.limits)
+        return self._sync_http
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def _get(self, kind: str, api_key: str):
+        key = (kind, hash_api_key(api_key))
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._clients.get(key)
+            if entry is not None:
+                entry[1] = now
+                self._clients.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[0]
+
+            if kind == "async":
+                client = AsyncOpenAI(api_key=api_key, http_client=self._shared_async_http())
+            else:
+                client = OpenAI(api_key=api_key, http_client=self._shared_sync_http())
+            self._clients[key] = [client, now]
+            self._stats["misses"] += 1
+
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+                self._stats["evictions"] += 1
+            logger.info("OpenAI 클라이언트 생성", kind=kind, key_hash=key[1], active=len(self._clients))
+            return client
+
+    def _evict_idle(self, now: float) -> None:
+        # 공유 연결 풀은 닫지 않고 클라이언트 래퍼만 제거
+        while self._clients:
+            _, last_used = next(iter(self._clients.values()))
+            if now - last_used <= self.idle_ttl:
+                break
+            self._clients.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get_async(self, api_key: str) -> AsyncOpenAI:
+        """API 키에 대한 비동기 클라이언트"""
+        return self._get("async", api_key)
+
+    def get_sync(self, api_key: str) -> OpenAI:
+        """API 키에 대한 동기 클라이언트"""
+        return self._get("sync", api_key)
+
+    # ------------------------------------------------------------------
+    # 상태/정리
+    # ------------------------------------------------------------------
+    def metrics(self) -> Dict[str, Any]:
+        """레지스트리 및 연결 풀 지표"""
+        with self._lock:
+            kinds = [kind for kind, _ in self._clients]
+            total = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / total, 4) if total else None,
+                "active_clients": len(self._clients),
+                "active_async_clients": kinds.count("async"),
+                "active_sync_clients": kinds.count("sync"),
+                "max_clients": self.max_clients,
+                "idle_ttl_seconds": self.idle_ttl,
+                "pool_limits": {
+                    "max_connections": self.limits.max_connections,
+                    "max_keepalive_connections": self.limits.max_keepalive_connections,
+                    "keepalive_expiry": self.limits.keepalive_expiry,
+                },
+            }
+
+    async def aclose(self) -> None:
+        """모든 클라이언트와 공유 연결 풀 종료"""
+        with self._lock:
+            self._clients.clear()
+        if self._async_http is not None:
+            await self._async_http.aclose()
+            self._async_http = None
+        if self._sync_http is not None:
+            self._sync_http.close()
+            self._sync_http = None
+
+
+# 프로세스 전역 레지스트리
+client_registry = OpenAIClientRegistry()
+
+
+def get_async_client(api_key: str) -> AsyncOpenAI:
+    """공유 레지스트리의 비동기 OpenAI 클라이언트"""
+    return client_registry.get_async(api_key)
+
+
+def get_sync_client(api_key: str) -> OpenAI:
+    """공유 레지스트리의 동기 OpenAI 클라이언트"""
+    return client_registry.get_sync(api_key)
@@ -0,0 +1,180 @@
+"""
+MCP 도구 결과 요약
+분석 프롬프트에 넣기 전에 큰 도구 결과(수천 행의 종목 목록 등)를 통계 요약으로 줄입니다.
+레코드 목록은 스키마, 행 수, 주요 지표별 상위/하위 K개, 분포, 이상치로 바꾸고,
+모델별 크기 예산(JSON 문자 수)에 맞을 때까지 K를 줄입니다. 예산 안에 들어가는 결과는
+그대로 둡니다.
+"""
+
+import json
+import math
+import statistics
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+# 우선 지표로 쓰는 컬럼 (앞에 있을수록 우선)
+PREFERRED_METRICS = (
+    "market_cap", "시가총액", "composite", "score", "return", "change_rate", "등락률",
+    "per", "PER", "pbr", "PBR", "roe", "ROE", "net_buying", "순매수", "volume", "거래량",
+)
+# 행을 식별하는 컬럼 (상위/하위 목록에 지표와 함께 표시)
+LABEL_COLUMNS = ("ticker", "종목코드", "code", "name", "종목명", "sector", "업종명", "date", "날짜")
+
+MAX_METRICS = 4
+MAX_CATEGORIES = 5
+MAX_STRING = 200
+# |z| 기준 이상치
+OUTLIER_Z = 3.0
+# 예산을 맞출 때 차례로 시도하는 상위/하위 개수
+TOP_K_STEPS = (10, 5, 3, 1)
+
+
+def budget_for(model: str) -> int:
+    """모델별 결과 크기 예산 (문자 수, 목록에 없으면 기본값)"""
+    return settings.RESULT_DIGEST_BUDGETS.get(model, settings.RESULT_DIGEST_DEFAULT_BUDGET)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, indent=2, default=str)
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value) if math.isfinite(value) else None
+
+
+def _round(value: float) -> float:
+    return round(value, 4) if abs(value) < 1e6 else round(value)
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    index = (len(sorted_values) - 1) * q
+    low = math.floor(index)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (index - low)
+
+
+def _is_records(value: Any) -> bool:
+    return isinstance(value, list) and len(value) > 1 and all(isinstance(row, dict) for row in value)
+
+
+def _columns(rows: List[Dict[str, Any]]) -> Tuple[Dict[str, str], List[str], List[str]]:
+    """컬럼별 타입과 수치/범주 컬럼 목록"""
+    schema: Dict[str, str] = {}
+    for row in rows:
+        for column, value in row.items():
+            if column not in schema or schema[column] == "null":
+                schema[column] = "null" if value is None else type(value).__name__
+    numeric = [c for c, t in schema.items() if t in ("int", "float")]
+    categorical = [c for c, t in schema.items() if t == "str" and c not in LABEL_COLUMNS]
+    return schema, numeric, categorical
+
+
+def _metrics(numeric: List[str]) -> List[str]:
+    preferred = [c for c in PREFERRED_METRICS if c in numeric]
+    rest = [c for c in numeric if c not in preferred and c not in LABEL_COLUMNS]
+    return (preferred + rest)[:MAX_METRICS]
+
+
+def _label(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {c: row[c] for c in LABEL_COLUMNS if c in row}
+
+
+def _distribution(values: List[float]) -> Dict[str, Any]:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "min": _round(ordered[0]),
+        "p10": _round(_percentile(ordered, 0.1)),
+        "median": _round(_percentile(ordered, 0.5)),
+        "p90": _round(_percentile(ordered, 0.9)),
+        "max": _round(ordered[-1]),
+        "mean": _round(statistics.fmean(ordered)),
+    }
+
+
+def _table_digest(rows: List[Dict[str, Any]], top_k: int) -> Dict[str, Any]:
+    """레코드 목록 -> 스키마/분포/상위·하위 K/이상치 요약"""
+    schema, numeric, categorical = _columns(rows)
+    digest: Dict[str, Any] = {"_digest": "table", "row_count": len(rows), "schema": schema}
+
+    distributions: Dict[str, Any] = {}
+    rankings: Dict[str, Any] = {}
+    outliers: Dict[str, Any] = {}
+    for column in _metrics(numeric):
+        pairs = [(v, row) for row in rows if (v := _number(row.get(column))) is not None]
+        if not pairs:
+            continue
+        values = [v for v, _ in pairs]
+        distributions[column] = _distribution(values)
+
+        ranked = sorted(pairs, key=lambda pair: pair[0], reverse=True)
+        rankings[column] = {
+            "top": [{**_label(row), column: _round(value)} for value, row in ranked[:top_k]],
+            "bottom": [{**_label(row), column: _round(value)} for value, row in ranked[-top_k:][::-1]],
+        }
+
+        if len(values) > 2:
+            mean, stdev = statistics.fmean(values), statistics.pstdev(values)
+            flagged = [
+                {**_label(row), column: _round(value), "z": round((value - mean) / stdev, 2)}
+                for value, row in pairs if stdev and abs(value - mean) / stdev > OUTLIER_Z
+            ]
+            if flagged:
+                flagged.sort(key=lambda item: abs(item["z"]), reverse=True)
+                outliers[column] = {"count": len(flagged), "items": flagged[:top_k]}
+
+    categories = {}
+    for column in categorical:
+        counts = Counter(row[column] for row in rows if isinstance(row.get(column), str))
+        if 1 < len(counts) < len(rows):
+            categories[column] = {"distinct": len(counts), "top": counts.most_common(MAX_CATEGORIES)}
+
+    digest.update(distributions=distributions, rankings=rankings, outliers=outliers, categories=categories)
+    digest["sample"] = [_shrink(row, top_k) for row in rows[:min(top_k, 3)]]
+    return digest
+
+
+def _series_digest(values: List[Any], top_k: int) -> Any:
+    numbers = [n for v in values if (n := _number(v)) is not None]
+    if len(numbers) == len(values):
+        return {"_digest": "series", **_distribution(numbers), "head": values[:top_k], "tail": values[-top_k:]}
+    return {"_digest": "list", "count": len(values), "head": [_shrink(v, top_k) for v in values[:top_k]]}
+
+
+def _shrink(value: Any, top_k: int) -> Any:
+    """재귀적으로 큰 목록/긴 문자열 축약"""
+    if isinstance(value, dict):
+        return {key: _shrink(item, top_k) for key, item in value.items()}
+    if isinstance(value, list):
+        if _is_records(value) and len(value) > top_k:
+            return _table_digest(value, top_k)
+        if len(value) > top_k * 2:
+            return _series_digest(value, top_k)
+        return [_shrink(item, top_k) for item in value]
+    if isinstance(value, str) and len(value) > MAX_STRING:
+        return value[:MAX_STRING] + f"...(+{len(value) - MAX_STRING}자)"
+    return value
+
+
+def digest_result(raw_result: Any, budget: int) -> Tuple[Any, bool]:
+    """예산(JSON 문자 수)에 맞춘 도구 결과와 요약 여부"""
+    if len(_dumps(raw_result)) <= budget:
+        return raw_result, False
+
+    for top_k in TOP_K_STEPS:
+        digest = _shrink(raw_result, top_k)
+        if len(_dumps(digest)) <= budget:
+            return digest, True
+    # 가장 작은 요약도 넘치면 문자열로 자름
+    text = _dumps(digest)
+    return text[:budget] + "\n...(예산 초과로 잘림)", True
+
+
+def result_for_prompt(raw_result: Any, model: str, share: int = 1) -> Tuple[str, bool]:
+    """분석 프롬프트에 넣을 도구 결과 문자열과 요약 여부 (share개 결과가 예산을 나눠 씀)"""
+    digest, summarized = digest_result(raw_result, budget_for(model) // max(1, share))
+    return (digest if isinstance(digest, str) else _dumps(digest)), summarized
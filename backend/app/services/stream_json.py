@@ -0,0 +1,119 @@
+"""
+스트리밍 JSON 파서
+LLM이 토큰 단위로 보내는 워크플로우 JSON을 한 글자씩 따라가며 최상위 객체의 "tasks"
+배열 원소가 닫히는 즉시 그 원소를 돌려줍니다. 응답 전체를 매번 다시 파싱하지 않고,
+진행 중인 원소의 텍스트만 보관합니다. ```json 펜스나 앞뒤 설명 문장은 무시하며, 설명 문장 속
+중괄호처럼 대상 배열 없이 닫힌 최상위 객체는 버리고 다음 객체를 기다립니다.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+
+class _Frame:
+    """열린 객체/배열 하나"""
+
+    __slots__ = ("kind", "expect_key", "key")
+
+    def __init__(self, kind: str):
+        self.kind = kind            # "{" 또는 "["
+        self.expect_key = kind == "{"
+        self.key: Optional[str] = None
+
+
+class TaskStreamParser:
+    """최상위 객체의 배열(기본 "tasks") 원소를 완성되는 대로 추출"""
+
+    def __init__(self, array_key: str = "tasks"):
+        self.array_key = array_key
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._string: List[str] = []       # 읽는 중인 키 문자열
+        self._capture_key = False
+        self._element: Optional[List[str]] = None  # 읽는 중인 배열 원소 텍스트
+        self._element_depth = 0
+        self._saw_array = False            # 현재 최상위 객체에서 대상 배열을 열었는지
+        self._done = False
+        self.count = 0
+
+    def _in_target_array(self) -> bool:
+        return (len(self._stack) == 2 and self._stack[1].kind == "["
+                and self._stack[0].kind == "{" and self._stack[0].key == self.array_key)
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """청크를 읽고 이번에 완성된 원소 목록 반환"""
+        completed: List[Dict[str, Any]] = []
+        for ch in chunk:
+            if self._done:
+                break
+            if self._element is not None:
+                self._element.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._capture_key:
+                        self._stack[-1].key = "".join(self._string)
+                        self._capture_key = False
+                elif self._capture_key:
+                    self._string.append(ch)
+                continue
+
+            if not self._stack:
+                # 최상위 객체 시작 전 텍스트는 건너뜀
+                if ch == "{":
+                    self._stack.append(_Frame("{"))
+                continue
+
+            frame = self._stack[-1]
+            if ch == '"':
+                self._in_string = True
+                if frame.kind == "{" and frame.expect_key:
+                    self._capture_key = True
+                    self._string = []
+            elif ch == ":":
+                frame.expect_key = False
+            elif ch == ",":
+                if frame.kind == "{":
+                    frame.expect_key = True
+            elif ch in "{[":
+                if ch == "[" and len(self._stack) == 1 and frame.key == self.array_key:
+                    self._saw_array = True
+                if self._element is None and ch == "{" and self._in_target_array():
+                    self._element = [ch]
+                    self._element_depth = len(self._stack) + 1
+                self._stack.append(_Frame(ch))
+            elif ch in "}]":
+                self._stack.pop()
+                if self._element is not None and len(self._stack) < self._element_depth:
+                    task = self._load("".join(self._element))
+                    self._element = None
+                    if task is not None:
+                        self.count += 1
+                        completed.append(task)
+                if not self._stack:
+                    if self._saw_array:
+                        self._done = True
+                    else:
+                        # 대상 배열이 없던 객체 (설명 문장 속 {..} 등)는 버리고 다시 탐색
+                        self._reset()
+        return completed
+
+    def _reset(self) -> None:
+        self._stack = []
+        self._capture_key = False
+        self._element = None
+        self._saw_array = False
+
+    @staticmethod
+    def _load(text: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError:
+            return None
+        return value if isinstance(value, dict) else None
@@ -0,0 +1,80 @@
+"""
+토큰 수 계산
+tiktoken이 설치되어 있으면 모델 인코딩으로 정확히 세고, 없거나 인코딩 파일을 받지 못하면
+(오프라인 등) 문자 종류별 추정치를 씁니다. 추정치는 실제보다 크게 잡아 예산을 넘지 않도록 합니다.
+"""
+
+import math
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from app.utils.logger import setup_logger
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+logger = setup_logger(__name__)
+
+# 추정치: ASCII는 약 4자당 1토큰, 한글 등 나머지는 1자당 1토큰
+ASCII_CHARS_PER_TOKEN = 4
+# 채팅 메시지 하나당 역할/구분자 토큰
+MESSAGE_OVERHEAD = 4
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str) -> Optional["tiktoken.Encoding"]:
+    """모델 인코딩 (tiktoken이 없거나 로드 실패 시 None -> 추정치, 실패도 캐시해 재다운로드 시도 안 함)"""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # 인코딩 파일은 처음 사용할 때 내려받으므로 네트워크가 없으면 실패
+        logger.warning("tiktoken 인코딩 로드 실패, 추정치 사용", model=model, error=str(e))
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    """텍스트 토큰 수"""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / ASCII_CHARS_PER_TOKEN) + (len(text) - ascii_chars)
+
+
+def count_message_tokens(messages: List[Dict[str, Any]], model: str = "gpt-4o") -> int:
+    """채팅 메시지 목록 토큰 수 (메시지별 오버헤드 포함)"""
+    return sum(count_tokens(str(m.get("content") or ""), model) + MESSAGE_OVERHEAD for m in messages)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = "gpt-4o", keep: str = "head") -> str:
+    """토큰 수 이하로 자르기 (keep="tail"이면 뒷부분 유지)"""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    encoding = _encoding(model)
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        kept = tokens[:max_tokens] if keep == "head" else tokens[-max_tokens:]
+        return encoding.decode(kept)
+
+    # 추정치는 글자 단위로 단조 증가하므로 이분 탐색
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        part = text[:mid] if keep == "head" else text[len(text) - mid:]
+        if count_tokens(part, model) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low] if keep == "head" else text[len(text) - low:]
@@ -0,0 +1,352 @@
+"""
+로컬 MCP 도구 선택기
+키워드 규칙과 TF-IDF 최근접 이웃으로 노드 설명에 맞는 도구를 고르고 신뢰도를 함께 반환합니다.
+학습 데이터는 AVAILABLE_TOOLS의 설명/use_cases와 과거 LLM 선택 기록입니다.
+신뢰도가 임계값 이상인 노드만 로컬에서 답하고, 나머지는 LLM 선택으로 넘깁니다.
+"""
+
+import asyncio
+import json
+import math
+import re
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+KST = timezone(timedelta(hours=9))
+
+# 도구별 키워드 규칙 (공백을 제거한 텍스트에서 부분 일치)
+KEYWORD_RULES = {
+    "get_market_news": ["뉴스", "기사", "언론", "헤드라인"],
+    "get_stock_fundamentals": ["재무지표조회", "재무제표", "개별종목분석", "기업분석"],
+    "filter_stocks_by_fundamentals": ["재무지표필터", "필터링", "조건검색", "조건부스크리닝"],
+    "get_all_tickers": ["전체종목", "종목목록", "전종목", "상장종목"],
+    "get_sector_performance": ["섹터", "업종별", "업종성과", "업종수익률"],
+    "get_foreign_investment": ["외국인매매", "외국인투자", "외국인순매수", "외국인동향"],
+    "get_market_cap": ["시가총액", "시총"],
+    "rank_stocks_by_factors": ["팩터", "종합점수", "저pbr", "고roe", "가치주", "퀄리티"],
+    "scan_market_anomalies": ["거래량급증", "급등", "급락", "신고가", "신저가", "갭상승", "갭하락", "이상징후"],
+    "scan_pairs": ["페어", "공적분", "차익거래", "평균회귀"],
+    "get_relative_performance": ["베타", "알파", "추적오차", "상대강도", "초과수익"],
+    "get_market_breadth": ["시장폭", "등락종목", "adl", "상승종목수", "하락종목수"],
+    "get_index_constituents": ["구성종목", "지수구성", "지수목록", "편입종목"],
+    "get_investor_flow": ["투자자별", "연기금", "수급", "기관매매", "개인투자자", "기타법인"],
+}
+
+# 규칙 하나만 일치할 때의 신뢰도
+RULE_CONFIDENCE = 0.9
+
+# 색인 크기 제한: 문서 비율이 이보다 높은 용어(낮은 IDF)는 제외하고, 용어별 게시 목록은
+# 가중치 상위 MAX_POSTINGS개만 유지 (학습 기록이 늘어도 분류 비용이 일정하도록)
+MAX_DF_RATIO = 0.3
+MAX_POSTINGS = 64
+
+# 학습 기록이 이만큼 쌓이면 백그라운드 스레드에서 색인 전체를 다시 계산 (IDF 갱신)
+REBUILD_EVERY = 200
+
+# 종목코드 (6자리)와 단어 패턴
+_TICKER = re.compile(r"(?<!\d)(\d{6})(?!\d)")
+_WORD = re.compile(r"[0-9a-zA-Z가-힣]+")
+
+
+def _tokens(text: str) -> List[str]:
+    """단어 + 음절 바이그램 (형태소 분석기 없이 한국어 조사/어미 변형을 흡수)"""
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        tokens.append(f"w:{word}")
+        tokens.extend(f"b:{word[i:i + 2]}" for i in range(len(word) - 1))
+    return tokens
+
+
+def _compact(text: str) -> str:
+    return re.sub(r"\s+", "", text.lower())
+
+
+def _market(text: str) -> Optional[str]:
+    upper = text.upper()
+    if "코스닥" in text or "KOSDAQ" in upper:
+        return "KOSDAQ"
+    if "코스피" in text or "KOSPI" in upper:
+        return "KOSPI"
+    return None
+
+
+def default_parameters(tool_name: str, text: str, today: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """노드 텍스트에서 도구 매개변수 구성 (필수 정보가 없으면 None -> LLM 선택)"""
+    today = today or datetime.now(KST)
+    end = today.strftime("%Y%m%d")
+    start = (today - timedelta(days=30)).strftime("%Y%m%d")
+    tickers = list(dict.fromkeys(_TICKER.findall(text)))
+    market = _market(text)
+    compact = _compact(text)
+
+    if tool_name == "get_all_tickers":
+        return {"market": market or "ALL"}
+    if tool_name == "get_stock_fundamentals":
+        return {"ticker": tickers[0]} if tickers else None
+    if tool_name == "filter_stocks_by_fundamentals":
+        return {"tickers": tickers} if tickers else None
+    if tool_name == "get_market_news":
+        return {}
+    if tool_name == "get_sector_performance":
+        return {"date": end, "market": market or "KOSPI"}
+    if tool_name == "get_foreign_investment":
+        params = {"start_date": start, "end_date": end, "market": market or "KOSPI"}
+        if tickers:
+            params["ticker"] = tickers[0]
+        return params
+    if tool_name == "get_market_cap":
+        return {"date": end, "market": market or "ALL"}
+    if tool_name == "rank_stocks_by_factors":
+        sort_by = "composite"
+        if "가치" in compact or "저pbr" in compact or "저per" in compact:
+            sort_by = "value"
+        elif "퀄리티" in compact or "roe" in compact:
+            sort_by = "quality"
+        elif "모멘텀" in compact:
+            sort_by = "momentum"
+        return {"sort_by": sort_by}
+    if tool_name == "scan_market_anomalies":
+        kinds = [("거래량", "volume_spike"), ("신고가", "high_52w"), ("신저가", "low_52w"),
+                 ("갭상승", "gap_up"), ("갭하락", "gap_down"), ("급등", "return_spike"), ("급락", "return_spike")]
+        kind = next((k for word, k in kinds if word in compact), "all")
+        return {"kind": kind, "market": market or "ALL"}
+    if tool_name == "scan_pairs":
+        return {"tickers": tickers} if len(tickers) >= 2 else None
+    if tool_name == "get_relative_performance":
+        return {"index_name": market or "KOSPI"}
+    if tool_name == "get_market_breadth":
+        return {"market": market or "ALL"}
+    if tool_name == "get_index_constituents":
+        return {}
+    if tool_name == "get_investor_flow":
+        views = [("연기금", "pension"), ("기타법인", "corporate"), ("기관", "institutional"),
+                 ("외국인", "foreign"), ("개인", "individual")]
+        view = next((v for word, v in views if word in compact), "summary")
+        params = {"start_date": start, "end_date": end, "market": market or "KOSPI", "view": view}
+        if tickers:
+            params["ticker"] = tickers[0]
+        return params
+    return None
+
+
+class ToolClassifier:
+    """키워드 규칙 + TF-IDF 최근접 이웃 도구 분류기"""
+
+    def __init__(self, tools: Dict[str, Dict[str, Any]], log_path: Optional[Path] = None,
+                 threshold: float = settings.TOOL_CLASSIFIER_THRESHOLD, max_examples: int = 2000):
+        self.tools = tools
+        self.threshold = threshold
+        self.log_path = Path(log_path) if log_path else None
+        self._lock = threading.Lock()
+        # 과거 선택 기록 (텍스트, 도구)
+        self._examples: deque = deque(maxlen=max_examples)
+        self._stats: Counter = Counter()
+        self._recent: deque = deque(maxlen=100)
+        # 마지막 전체 재계산 이후 학습한 기록 (재계산 결과에 다시 추가)
+        self._pending: List[Tuple[str, str]] = []
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self._load_log()
+        self._idf, self._index, self._labels, self._pruned = self._build(self._documents())
+
+    # ------------------------------------------------------------------
+    # 학습 데이터/색인
+    # ------------------------------------------------------------------
+    def _load_log(self) -> None:
+        if not self.log_path or not self.log_path.exists():
+            return
+        with open(self.log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("tool_name") in self.tools:
+                    self._examples.append((record["text"], record["tool_name"]))
+
+    def _documents(self) -> List[Tuple[str, str]]:
+        docs = []
+        for name, info in self.tools.items():
+            docs.append((info.get("description", ""), name))
+            docs.extend((use_case, name) for use_case in info.get("use_cases", []))
+        docs.extend(self._examples)
+        return docs
+
+    @staticmethod
+    def _build(documents: List[Tuple[str, str]]):
+        """문서 TF-IDF 벡터(정규화)와 역색인 구성 -> (idf, index, labels, 제외한 용어)"""
+        docs = [(Counter(_tokens(text)), tool) for text, tool in documents]
+        df = Counter(term for counts, _ in docs for term in counts)
+        n = len(docs)
+        # 대부분의 문서에 나오는 용어는 구분력이 낮아 제외 (매우 긴 게시 목록 방지)
+        idf = {
+            term: math.log((1 + n) / (1 + freq)) + 1
+            for term, freq in df.items() if freq <= max(1, n * MAX_DF_RATIO)
+        }
+        pruned = {term for term in df if term not in idf}
+
+        labels, index = [], {}
+        for doc_id, (counts, tool) in enumerate(docs):
+            weights = {term: (1 + math.log(tf)) * idf[term] for term, tf in counts.items() if term in idf}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for term, weight in weights.items():
+                index.setdefault(term, []).append((doc_id, weight / norm))
+            labels.append(tool)
+        for term, postings in index.items():
+            if len(postings) > MAX_POSTINGS:
+                index[term] = sorted(postings, key=lambda p: p[1], reverse=True)[:MAX_POSTINGS]
+        return idf, index, labels, pruned
+
+    def _add_document(self, text: str, tool: str) -> None:
+        """현재 IDF로 문서 하나를 색인에 추가 (호출자가 lock 보유)"""
+        counts = Counter(_tokens(text))
+        # 처음 보는 용어는 문서 하나에만 나온 용어의 IDF, 흔해서 제외한 용어는 다음 재계산까지 계속 제외
+        new_idf = math.log((1 + len(self._labels)) / 2) + 1
+        weights = {
+            term: (1 + math.log(tf)) * self._idf.setdefault(term, new_idf)
+            for term, tf in counts.items() if term not in self._pruned
+        }
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        doc_id = len(self._labels)
+        self._labels.append(tool)
+        for term, weight in weights.items():
+            postings = self._index.setdefault(term, [])
+            posting = (doc_id, weight / norm)
+            if len(postings) < MAX_POSTINGS:
+                postings.append(posting)
+            else:
+                weakest = min(range(len(postings)), key=lambda i: postings[i][1])
+                if posting[1] > postings[weakest][1]:
+                    postings[weakest] = posting
+
+    def _rebuild(self) -> None:
+        """색인 전체 재계산 후 교체 (계산 중 학습한 기록은 새 색인에 다시 추가)"""
+        with self._lock:
+            documents = self._documents()
+            self._pending = []
+        idf, index, labels, pruned = self._build(documents)
+        with self._lock:
+            self._idf, self._index, self._labels, self._pruned = idf, index, labels, pruned
+            for text, tool in self._pending:
+                self._add_document(text, tool)
+
+    async def _rebuild_in_background(self) -> None:
+        try:
+            await asyncio.to_thread(self._rebuild)
+        except Exception as e:
+            logger.warning("도구 선택기 색인 재계산 실패", error=str(e))
+        finally:
+            self._rebuild_task = None
+
+    def _neighbours(self, text: str) -> Dict[str, float]:
+        """도구별 최대 코사인 유사도"""
+        counts = Counter(_tokens(text))
+        weights = {t: (1 + math.log(tf)) * self._idf[t] for t, tf in counts.items() if t in self._idf}
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        if not norm:
+            return {}
+        scores: Dict[int, float] = {}
+        for term, weight in weights.items():
+            for doc_id, doc_weight in self._index.get(term, ()):
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight / norm * doc_weight
+        best: Dict[str, float] = {}
+        for doc_id, score in scores.items():
+            tool = self._labels[doc_id]
+            if score > best.get(tool, 0.0):
+                best[tool] = score
+        return best
+
+    # ------------------------------------------------------------------
+    # 분류
+    # ------------------------------------------------------------------
+    def classify(self, description: str, prompt: str = "", record: bool = True) -> Dict[str, Any]:
+        """도구 선택 결과와 신뢰도 (accepted=False면 LLM 선택 필요, record=False면 지표에 남기지 않음)"""
+        started = time.perf_counter()
+        text = f"{description} {prompt or ''}"
+        compact = _compact(text)
+        rule_hits = {
+            tool: sum(len(k) for k in keywords if k in compact)
+            for tool, keywords in KEYWORD_RULES.items() if tool in self.tools
+        }
+        rule_hits = {tool: score for tool, score in rule_hits.items() if score}
+
+        with self._lock:
+            similarity = self._neighbours(text)
+
+        if len(rule_hits) == 1:
+            tool_name = next(iter(rule_hits))
+            confidence, method = max(RULE_CONFIDENCE, similarity.get(tool_name, 0.0)), "rule"
+        else:
+            # 규칙이 여러 도구에 걸리면 그 도구들 중에서 유사도로 결정
+            candidates = {t: s for t, s in similarity.items() if not rule_hits or t in rule_hits}
+            ranked = sorted(candidates.items(), key=lambda item: item[1], reverse=True)
+            if not ranked:
+                tool_name, confidence = None, 0.0
+            else:
+                tool_name, top = ranked[0]
+                second = ranked[1][1] if len(ranked) > 1 else 0.0
+                # 1, 2위 차이가 작을수록 신뢰도를 낮춤
+                confidence = min(1.0, top * (1 + (top - second)) / 2 + (0.2 if rule_hits else 0.0))
+            method = "rule+knn" if rule_hits else "knn"
+
+        parameters = default_parameters(tool_name, text) if tool_name else None
+        accepted = tool_name is not None and parameters is not None and confidence >= self.threshold
+        decision = {
+            "tool_name": tool_name,
+            "parameters": parameters or {},
+            "confidence": round(confidence, 4),
+            "method": method,
+            "accepted": accepted,
+            "elapsed_us": round((time.perf_counter() - started) * 1e6, 1),
+        }
+        if record:
+            with self._lock:
+                self._stats["local" if accepted else "fallback"] += 1
+                self._recent.append({"text": text[:200], **decision})
+        return decision
+
+    def learn(self, description: str, prompt: str, tool_name: str) -> None:
+        """LLM 선택 결과를 학습 데이터에 추가하고 기록"""
+        if tool_name not in self.tools:
+            return
+        text = f"{description} {prompt or ''}"
+        with self._lock:
+            self._examples.append((text, tool_name))
+            self._pending.append((text, tool_name))
+            # 바로 쓸 수 있도록 현재 색인에 추가하고, IDF 갱신은 주기적으로 스레드에서 재계산
+            self._add_document(text, tool_name)
+            due = len(self._pending) >= REBUILD_EVERY and self._rebuild_task is None
+        if due:
+            try:
+                self._rebuild_task = asyncio.get_running_loop().create_task(self._rebuild_in_background())
+            except RuntimeError:
+                # 이벤트 루프 밖(스크립트)에서는 바로 재계산
+                self._rebuild()
+        if self.log_path:
+            try:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"text": text, "tool_name": tool_name}, ensure_ascii=False) + "\n")
+            except OSError as e:
+                logger.warning("도구 선택 기록 저장 실패", error=str(e))
+
+    def metrics(self) -> Dict[str, Any]:
+        """로컬 처리 비율과 최근 결정 (임계값 조정용)"""
+        with self._lock:
+            total = self._stats["local"] + self._stats["fallback"]
+            return {
+                "threshold": self.threshold,
+                "examples": len(self._examples),
+                "local": self._stats["local"],
+                "fallback": self._stats["fallback"],
+                "local_rate": round(self._stats["local"] / total, 4) if total else None,
+                "recent": list(self._recent),
+            }
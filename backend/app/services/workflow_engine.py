@@ -0,0 +1,548 @@
+"""
+워크플로우 실행 엔진
+워크플로우 노드와 캔버스 연결선으로 의존성 DAG를 구성하고, 선행 노드가 끝난 노드부터
+제한된 동시 실행 수 안에서 병렬로 실행합니다. 노드 결과는 ExecutionResult로 기록하므로
+전체 실행 시간은 노드 수가 아니라 임계 경로 길이에 비례합니다.
+
+입력이 바뀌지 않은 노드는 내용 해시로 저장된 결과를 재사용하고(node_memo),
+중단된 실행은 완료된 노드 다음부터 이어서 실행할 수 있습니다.
+"""
+
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.api.mcp import MCPUnavailableError, call_mcp_tool, get_fallback_data
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.workflow import ExecutionResult, Workflow, WorkflowExecution, WorkflowNode
+from app.services.execution_events import ExecutionEventBus, execution_events
+from app.services.node_memo import NodeMemo, node_key, node_memo, result_hash, session_date, tool_key
+from app.services.workflow_steps import (
+    AVAILABLE_TOOLS,
+    analyze_result,
+    fallback_analysis,
+    select_tool,
+    select_tools_batch,
+)
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 다음 노드 프롬프트에 넣는 선행 노드 분석 길이 (문자)
+UPSTREAM_CONTEXT_CHARS = 500
+
+
+class WorkflowGraphError(ValueError):
+    """실행할 수 없는 워크플로우 구조 (노드 없음, 순환 등)"""
+
+
+class ExecutionConflictError(RuntimeError):
+    """이미 실행 중인 실행 기록에 대한 요청"""
+
+
+def build_dag(node_ids: List[str], edges: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """노드별 선행 노드 목록 (캔버스 연결선 source -> target)"""
+    upstream: Dict[str, List[str]] = {node_id: [] for node_id in node_ids}
+    for edge in edges:
+        source, target = edge.get("source"), edge.get("target")
+        if source not in upstream or target not in upstream:
+            logger.warning("알 수 없는 노드를 잇는 연결선 무시", source=source, target=target)
+            continue
+        if source not in upstream[target]:
+            upstream[target].append(source)
+    return upstream
+
+
+def topological_order(upstream: Dict[str, List[str]]) -> List[str]:
+    """위상 정렬 순서 (순환이 있으면 WorkflowGraphError)"""
+    indegree = {node_id: len(parents) for node_id, parents in upstream.items()}
+    downstream: Dict[str, List[str]] = {node_id: [] for node_id in upstream}
+    for node_id, parents in upstream.items():
+        for parent in parents:
+            downstream[parent].append(node_id)
+
+    queue = deque(node_id for node_id, degree in indegree.items() if degree == 0)
+    order = []
+    while queue:
+        node_id = queue.popleft()
+        order.append(node_id)
+        for child in downstream[node_id]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                queue.append(child)
+
+    if len(order) != len(upstream):
+        cyclic = sorted(node_id for node_id, degree in indegree.items() if degree > 0)
+        raise WorkflowGraphError(f"워크플로우에 순환 연결이 있습니다: {', '.join(cyclic)}")
+    return order
+
+
+def planned_selection(node: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """노드 설정에 저장된 도구 선택 (없거나 알 수 없는 도구면 None)"""
+    config = node.get("config") or {}
+    if config.get("tool_name") not in AVAILABLE_TOOLS:
+        return None
+    return {
+        "tool_name": config["tool_name"],
+        "parameters": config.get("parameters") or {},
+        "reasoning": config.get("reasoning", ""),
+    }
+
+
+def critical_path(upstream: Dict[str, List[str]], timings: Dict[str, Dict[str, float]]) -> List[str]:
+    """가장 늦게 끝난 노드부터 가장 늦게 끝난 선행 노드를 따라간 경로"""
+    finished = {node_id: t["finished"] for node_id, t in timings.items() if "finished" in t}
+    if not finished:
+        return []
+    node_id = max(finished, key=finished.get)
+    path = [node_id]
+    while True:
+        parents = [p for p in upstream.get(node_id, []) if p in finished]
+        if not parents:
+            break
+        node_id = max(parents, key=finished.get)
+        path.append(node_id)
+    return path[::-1]
+
+
+class WorkflowEngine:
+    """서버 측 워크플로우 실행기 (실행 중인 작업 레지스트리 포함)"""
+
+    def __init__(self, max_concurrency: int = settings.WORKFLOW_MAX_CONCURRENCY,
+                 events: ExecutionEventBus = execution_events, memo: NodeMemo = node_memo):
+        self.max_concurrency = max_concurrency
+        self.events = events
+        self.memo = memo
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    # ------------------------------------------------------------------
+    # 실행 시작/조회
+    # ------------------------------------------------------------------
+    async def load_workflow(self, db: AsyncSession, workflow_id: int, user_id: int) -> Optional[Workflow]:
+        """사용자 소유 워크플로우와 노드 조회"""
+        stmt = select(Workflow).options(selectinload(Workflow.nodes)).where(
+            Workflow.id == workflow_id,
+            Workflow.user_id == user_id
+        )
+        result = await db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    def prepare(self, workflow: Workflow):
+        """노드 정보와 DAG 구성 (노드가 없거나 순환이 있으면 WorkflowGraphError)"""
+        if not workflow.nodes:
+            raise WorkflowGraphError("실행할 노드가 없습니다")
+
+        nodes = {
+            node.node_id: {
+                "node_id": node.node_id,
+                "node_type": node.node_type,
+                "title": node.title or node.node_id,
+                "prompt": node.prompt or "",
+                "config": node.config or {},
+            }
+            for node in workflow.nodes
+        }
+        upstream = build_dag(list(nodes), (workflow.canvas_data or {}).get("edges", []))
+        return nodes, upstream, topological_order(upstream)
+
+    def _launch(self, execution_id: int, workflow_id: int, nodes: Dict[str, Dict[str, Any]],
+                upstream: Dict[str, List[str]], order: List[str], api_key: str,
+                seeded: Dict[str, Dict[str, Any]], use_cache: bool) -> None:
+        # 실행 직후 접속한 구독자도 처음부터 받을 수 있도록 이벤트 로그를 먼저 생성
+        self.events.open(execution_id)
+        task = asyncio.create_task(
+            self._run(execution_id, workflow_id, nodes, upstream, order, api_key, seeded, use_cache)
+        )
+        self._tasks[execution_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(execution_id, None))
+
+    async def start(self, db: AsyncSession, workflow: Workflow, api_key: str,
+                    use_cache: bool = True) -> WorkflowExecution:
+        """실행 기록을 만들고 백그라운드에서 DAG 실행 시작"""
+        nodes, upstream, order = self.prepare(workflow)
+
+        execution = WorkflowExecution(
+            workflow_id=workflow.id,
+            status="running",
+            execution_log={"order": order, "max_concurrency": self.max_concurrency},
+        )
+        db.add(execution)
+        workflow.status = "running"
+        await db.commit()
+        await db.refresh(execution)
+
+        self._launch(execution.id, workflow.id, nodes, upstream, order, api_key, {}, use_cache)
+        logger.info("워크플로우 실행 시작", workflow_id=workflow.id, execution_id=execution.id, nodes=len(nodes))
+        return execution
+
+    async def resume(self, db: AsyncSession, workflow: Workflow, execution: WorkflowExecution,
+                     api_key: str, use_cache: bool = True) -> WorkflowExecution:
+        """중단/실패한 실행을 이어서 실행 (입력이 그대로인 완료 노드는 다시 실행하지 않음)"""
+        if self.is_running(execution.id):
+            raise ExecutionConflictError("이미 실행 중입니다")
+        nodes, upstream, order = self.prepare(workflow)
+
+        rows = (await db.execute(
+            select(ExecutionResult).where(ExecutionResult.execution_id == execution.id)
+        )).scalars().all()
+        seeded = {
+            row.node_id: row.result_data for row in rows
+            if row.result_type != "error" and row.node_id in nodes and row.result_data.get("cache_key")
+        }
+        # 완료되지 않은 노드 결과는 다시 기록
+        await db.execute(delete(ExecutionResult).where(
+            ExecutionResult.execution_id == execution.id,
+            ExecutionResult.node_id.notin_(list(seeded))
+        ))
+
+        execution.status = "running"
+        execution.end_time = None
+        execution.error_message = None
+        execution.execution_log = {**(execution.execution_log or {}), "order": order,
+                                   "resumed_from": sorted(seeded)}
+        workflow.status = "running"
+        await db.commit()
+
+        self._launch(execution.id, workflow.id, nodes, upstream, order, api_key, seeded, use_cache)
+        logger.info("워크플로우 실행 재개", workflow_id=workflow.id, execution_id=execution.id,
+                    completed=len(seeded), nodes=len(nodes))
+        return execution
+
+    async def plan_tools(self, workflow_id: int, nodes: Dict[str, Dict[str, Any]], order: List[str],
+                         api_key: str) -> Dict[str, Dict[str, Any]]:
+        """도구가 정해지지 않은 작업 노드의 도구/매개변수를 LLM 호출 한 번으로 선택해
+        WorkflowNode.config에 저장 (실패 시 빈 결과, 실행 중 노드별 선택으로 대체)"""
+        pending = [
+            nodes[node_id] for node_id in order
+            if nodes[node_id]["node_type"] == "task" and planned_selection(nodes[node_id]) is None
+        ]
+        if not pending:
+            return {}
+
+        try:
+            selections = await select_tools_batch(
+                api_key, [{"id": n["node_id"], "label": n["title"], "prompt": n["prompt"]} for n in pending]
+            )
+        except Exception as e:
+            logger.warning("일괄 도구 선택 실패, 노드별 선택으로 진행", workflow_id=workflow_id, error=str(e))
+            return {}
+
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(select(WorkflowNode).where(
+                WorkflowNode.workflow_id == workflow_id,
+                WorkflowNode.node_id.in_(list(selections))
+            ))).scalars().all()
+            for row in rows:
+                row.config = {**(row.config or {}), **selections[row.node_id], "planned": True}
+                nodes[row.node_id]["config"] = row.config
+            await session.commit()
+        return selections
+
+    async def recover_interrupted(self) -> int:
+        """서버 재시작 시 실행 중으로 남은 기록을 interrupted로 표시 (resume 대상)"""
+        async with AsyncSessionLocal() as session:
+            running = (await session.execute(
+                select(WorkflowExecution).where(WorkflowExecution.status == "running")
+            )).scalars().all()
+            for execution in running:
+                execution.status = "interrupted"
+                execution.error_message = "서버 재시작으로 실행이 중단되었습니다"
+            await session.commit()
+        if running:
+            logger.info("중단된 워크플로우 실행 표시", count=len(running))
+        return len(running)
+
+    def is_running(self, execution_id: int) -> bool:
+        return execution_id in self._tasks
+
+    async def shutdown(self) -> None:
+        """실행 중인 작업 취소 (애플리케이션 종료 시)"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # ------------------------------------------------------------------
+    # DAG 실행
+    # ------------------------------------------------------------------
+    async def _run(self, execution_id: int, workflow_id: int, nodes: Dict[str, Dict[str, Any]],
+                   upstream: Dict[str, List[str]], order: List[str], api_key: str,
+                   seeded: Dict[str, Dict[str, Any]], use_cache: bool) -> None:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        statuses = {node_id: "pending" for node_id in order}
+        timings: Dict[str, Dict[str, float]] = {node_id: {} for node_id in order}
+        started = time.monotonic()
+        # 한 번의 실행은 같은 거래일 기준으로 캐시 조회 (장중이면 캐시 사용 안 함)
+        session = session_date()
+        memo_session = session if use_cache else None
+
+        await self.events.publish(execution_id, "execution_started", order=order,
+                                  max_concurrency=self.max_concurrency, session_date=session)
+        for node_id in order:
+            await self.events.publish(execution_id, "queued", node_id, title=nodes[node_id]["title"],
+                                      upstream=upstream[node_id])
+
+        async def run_node(node_id: str) -> Dict[str, Any]:
+            parents = [await tasks[parent] for parent in upstream[node_id]]
+            node = nodes[node_id]
+            source = "executed"
+
+            if any(parent["status"] != "completed" for parent in parents):
+                result = {"status": "skipped", "error": "선행 노드 실패로 건너뜀"}
+            else:
+                key = node_key(node, [parent["result_hash"] for parent in parents], session)
+                stored = seeded.get(node_id)
+                if stored is not None and stored.get("cache_key") == key:
+                    result, source = dict(stored), "resumed"
+                elif memo_session and node["node_type"] == "task" and (hit := await self._memo_get(key)):
+                    result, source = dict(hit), "cached"
+                else:
+                    async with semaphore:
+                        statuses[node_id] = "running"
+                        timings[node_id]["started"] = time.monotonic() - started
+                        await self.events.publish(execution_id, "running", node_id)
+                        try:
+                            result = await self._execute_node(execution_id, node, parents, nodes, statuses,
+                                                              api_key, memo_session)
+                        except Exception as e:
+                            logger.error("노드 실행 실패", execution_id=execution_id, node_id=node_id, error=str(e))
+                            result = {"status": "failed", "error": str(e)}
+                        timings[node_id]["finished"] = time.monotonic() - started
+
+                    # 기본 데이터로 대체된 결과는 저장하지 않음
+                    if (result["status"] == "completed" and memo_session and node["node_type"] == "task"
+                            and not result.get("fallback")):
+                        await self._memo_put(key, "node", memo_session, result)
+
+                if result["status"] == "completed":
+                    result.update(cache_key=key, result_hash=result_hash(result))
+
+            if "started" not in timings[node_id]:
+                timings[node_id]["started"] = timings[node_id]["finished"] = time.monotonic() - started
+            result.update(node_id=node_id, title=node["title"], source=source)
+            statuses[node_id] = result["status"]
+            if source != "resumed":
+                try:
+                    await self._record_result(execution_id, node, result)
+                except Exception as e:
+                    # 기록하지 못한 노드만 실패 처리 (하위 노드는 건너뜀)
+                    logger.error("노드 결과 기록 실패", execution_id=execution_id, node_id=node_id, error=str(e))
+                    result = {**result, "status": "failed", "error": f"결과 기록 실패: {e}"}
+                    statuses[node_id] = "failed"
+
+            if result["status"] == "completed":
+                await self.events.publish(execution_id, "done", node_id, tool_name=result.get("tool_name"),
+                                          timings=result.get("timings"), source=source,
+                                          duration=round(timings[node_id]["finished"] - timings[node_id]["started"], 3))
+            else:
+                await self.events.publish(execution_id, result["status"], node_id, error=result["error"])
+            return result
+
+        tasks: Dict[str, asyncio.Task] = {}
+        try:
+            # 도구가 정해지지 않은 노드는 실행 전에 한 번에 선택
+            planned = await self.plan_tools(workflow_id, nodes, order, api_key)
+            if planned:
+                await self.events.publish(execution_id, "tools_planned", selections=planned)
+
+            # 위상 정렬 순서로 만들면 선행 노드 작업이 항상 먼저 존재
+            for node_id in order:
+                tasks[node_id] = asyncio.create_task(run_node(node_id))
+            results = await asyncio.gather(*tasks.values())
+        except asyncio.CancelledError:
+            await self._cancel_tasks(tasks)
+            await self._finish(execution_id, workflow_id, "cancelled", statuses, timings, upstream,
+                               started, "실행이 취소되었습니다")
+            raise
+        except Exception as e:
+            # 노드 밖에서 난 오류도 실행 기록을 끝내고 이벤트 구독자에게 종료를 알림
+            logger.error("워크플로우 실행 오류", execution_id=execution_id, error=str(e))
+            await self._cancel_tasks(tasks)
+            await self._finish(execution_id, workflow_id, "failed", statuses, timings, upstream,
+                               started, f"실행 오류: {e}")
+            return
+
+        failed = [r["node_id"] for r in results if r["status"] != "completed"]
+        status = "failed" if failed else "completed"
+        error = f"실패/건너뛴 노드: {', '.join(failed)}" if failed else None
+        await self._finish(execution_id, workflow_id, status, statuses, timings, upstream, started, error)
+
+    @staticmethod
+    async def _cancel_tasks(tasks: Dict[str, asyncio.Task]) -> None:
+        """끝나지 않은 노드 작업 취소 후 정리될 때까지 대기"""
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    async def _memo_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """저장된 결과 조회 (저장소 오류는 캐시 미스로 처리)"""
+        try:
+            return await self.memo.get(key)
+        except Exception as e:
+            logger.warning("결과 캐시 조회 실패", error=str(e))
+            return None
+
+    async def _memo_put(self, key: str, kind: str, session_day: str, data: Dict[str, Any]) -> None:
+        """결과 저장 (실패해도 실행은 계속)"""
+        try:
+            await self.memo.put(key, kind, session_day, data)
+        except Exception as e:
+            logger.warning("결과 캐시 저장 실패", error=str(e))
+
+    async def _call_tool(self, tool_name: str, parameters: Dict[str, Any],
+                         memo_session: Optional[str]):
+        """MCP 도구 호출 (같은 거래일의 같은 호출은 저장된 결과 사용)"""
+        key = tool_key(tool_name, parameters, memo_session)
+        if memo_session:
+            hit = await self._memo_get(key)
+            if hit is not None:
+                return hit["raw_result"], "cached"
+
+        try:
+            raw_result = await call_mcp_tool(tool_name, parameters, allow_fallback=False)
+        except MCPUnavailableError:
+            return await get_fallback_data(tool_name, parameters), "fallback"
+
+        if memo_session:
+            await self._memo_put(key, "tool", memo_session, {"raw_result": raw_result})
+        return raw_result, "mcp"
+
+    async def _execute_node(self, execution_id: int, node: Dict[str, Any], parents: List[Dict[str, Any]],
+                            nodes: Dict[str, Dict[str, Any]], statuses: Dict[str, str],
+                            api_key: str, memo_session: Optional[str] = None) -> Dict[str, Any]:
+        """노드 유형별 실행 (task: 도구 선택 -> MCP 호출 -> 결과 분석)"""
+        node_id = node["node_id"]
+        if node["node_type"] == "start":
+            return {"status": "completed", "analysis": node["prompt"] or node["title"]}
+
+        if node["node_type"] == "result":
+            sections = [f"## {parent['title']}\n{parent.get('analysis', '')}" for parent in parents]
+            return {"status": "completed", "analysis": "\n\n".join(sections)}
+
+        # 선행 노드 분석 결과를 LLM 프롬프트에 포함
+        upstream_context = ""
+        context = [p for p in parents if p.get("analysis")]
+        if context:
+            upstream_context = "\n\n**이전 단계 결과:**\n" + "\n".join(
+                f"- {p['title']}: {p['analysis'][:UPSTREAM_CONTEXT_CHARS]}" for p in context
+            )
+        workflow_context = [
+            {"label": other["title"], "status": statuses.get(other_id, "pending")}
+            for other_id, other in nodes.items()
+        ]
+
+        step_started = time.monotonic()
+        selection = planned_selection(node)
+        if selection is None:
+            selection = await select_tool(api_key, node["title"], node["prompt"], workflow_context,
+                                          upstream_context=upstream_context)
+        tool_name = selection["tool_name"]
+        parameters = selection.get("parameters") or {}
+        selected = time.monotonic()
+        await self.events.publish(execution_id, "tool_selected", node_id, tool_name=tool_name,
+                                  parameters=parameters, planned=bool(node["config"].get("planned")),
+                                  selector=selection.get("selector"), confidence=selection.get("confidence"),
+                                  latency=round(selected - step_started, 3))
+
+        raw_result, data_source = await self._call_tool(tool_name, parameters, memo_session)
+        called = time.monotonic()
+        await self.events.publish(execution_id, "tool_called", node_id, tool_name=tool_name, source=data_source,
+                                  latency=round(called - selected, 3), size=len(str(raw_result)))
+
+        async def on_token(token: str) -> None:
+            await self.events.publish(execution_id, "analysis_token", node_id, token=token)
+
+        try:
+            analysis = await analyze_result(api_key, node["title"], tool_name, raw_result, on_token=on_token)
+        except Exception as e:
+            logger.error(f"Result analysis failed: {e}")
+            analysis = fallback_analysis(node["title"], tool_name, raw_result)
+        analyzed = time.monotonic()
+
+        return {
+            "status": "completed",
+            "tool_name": tool_name,
+            "parameters": parameters,
+            "reasoning": selection.get("reasoning"),
+            "raw_result": raw_result,
+            "fallback": data_source == "fallback",
+            "analysis": analysis,
+            "timings": {
+                "select_tool": round(selected - step_started, 3),
+                "call_tool": round(called - selected, 3),
+                "analyze": round(analyzed - called, 3),
+            },
+        }
+
+    # ------------------------------------------------------------------
+    # 기록
+    # ------------------------------------------------------------------
+    async def _record_result(self, execution_id: int, node: Dict[str, Any], result: Dict[str, Any]) -> None:
+        if result["status"] != "completed":
+            result_type = "error"
+        elif node["node_type"] == "task":
+            result_type = "table"
+        else:
+            result_type = "report"
+
+        async with AsyncSessionLocal() as session:
+            # 재개 시 입력이 바뀐 노드는 이전 결과를 교체
+            await session.execute(delete(ExecutionResult).where(
+                ExecutionResult.execution_id == execution_id,
+                ExecutionResult.node_id == node["node_id"]
+            ))
+            session.add(ExecutionResult(
+                execution_id=execution_id,
+                node_id=node["node_id"],
+                result_type=result_type,
+                result_data=result,
+            ))
+            await session.commit()
+
+    async def _finish(self, execution_id: int, workflow_id: int, status: str, statuses: Dict[str, str],
+                      timings: Dict[str, Dict[str, float]], upstream: Dict[str, List[str]],
+                      started: float, error: Optional[str]) -> None:
+        elapsed = time.monotonic() - started
+        path = critical_path(upstream, timings)
+
+        try:
+            async with AsyncSessionLocal() as session:
+                execution = await session.get(WorkflowExecution, execution_id)
+                workflow = await session.get(Workflow, workflow_id)
+                execution.status = status
+                execution.end_time = datetime.now(timezone.utc)
+                execution.error_message = error
+                execution.execution_log = {
+                    **(execution.execution_log or {}),
+                    "nodes": {
+                        node_id: {"status": statuses[node_id], **{k: round(v, 3) for k, v in timings[node_id].items()}}
+                        for node_id in statuses
+                    },
+                    "elapsed_seconds": round(elapsed, 3),
+                    "critical_path": path,
+                }
+                if workflow is not None:
+                    workflow.status = "completed" if status == "completed" else "failed"
+                await session.commit()
+        except Exception as e:
+            # 기록에 실패해도 구독자가 기다리지 않도록 종료 이벤트는 항상 발행
+            logger.error("실행 결과 기록 실패", execution_id=execution_id, error=str(e))
+            status, error = "failed", error or f"실행 결과 기록 실패: {e}"
+        finally:
+            await self.events.publish(execution_id, "execution_finished", status=status, error=error,
+                                      elapsed_seconds=round(elapsed, 3), critical_path=path)
+            await self.events.close(execution_id)
+
+        logger.info("워크플로우 실행 종료", execution_id=execution_id, status=status,
+                    elapsed=round(elapsed, 3), critical_path=path)
+
+
+# 프로세스 전역 실행 엔진
+workflow_engine = WorkflowEngine()
@@ -0,0 +1,524 @@
+"""
+워크플로우 노드 실행 단계
+도구 선택과 결과 분석 프롬프트/파싱을 API 엔드포인트와 서버 실행 엔진이 함께 사용합니다.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import Request
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.schemas.llm_output import BatchAnalysisOutput, json_schema_format, tool_selection_models
+from app.services.llm_calls import ClientDisconnected, completion_stream, completion_text, structured_completion
+from app.services.result_digest import result_for_prompt
+from app.services.stream_json import TaskStreamParser
+from app.services.tool_classifier import ToolClassifier
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 사용 가능한 MCP 도구 목록과 설명
+AVAILABLE_TOOLS = {
+    "get_all_tickers": {
+        "description": "전체 종목 목록을 조회합니다. PER, PBR 등 기본 재무지표와 함께 정렬된 결과를 제공합니다.",
+        "use_cases": ["종목 탐색", "시장 전체 현황", "재무지표 기반 초기 스크리닝"],
+        "parameters": ["market (KOSPI/KOSDAQ/ALL)"]
+    },
+    "get_stock_fundamentals": {
+        "description": "특정 종목의 상세 재무지표를 조회합니다.",
+        "use_cases": ["개별 종목 분석", "재무 건전성 평가", "투자 가치 분석"],
+        "parameters": ["ticker (종목코드)"]
+    },
+    "filter_stocks_by_fundamentals": {
+        "description": "재무지표 조건으로 종목을 필터링합니다.",
+        "use_cases": ["가치주 발굴", "성장주 탐색", "조건부 스크리닝"],
+        "parameters": ["tickers", "per_max", "pbr_max", "roe_min", "market_cap_min", "limit"]
+    },
+    "get_market_news": {
+        "description": "특정 종목이나 섹터의 최신 뉴스를 조회합니다.",
+        "use_cases": ["뉴스 분석", "시장 동향 파악", "리스크 요인 분석"],
+        "parameters": ["tickers", "sector", "days"]
+    },
+    "get_sector_performance": {
+        "description": "특정 섹터의 성과를 분석합니다.",
+        "use_cases": ["섹터 분석", "업종별 투자 전략", "상대적 성과 비교"],
+        "parameters": ["sector", "period"]
+    },
+    "get_foreign_investment": {
+        "description": "외국인 투자 동향을 조회합니다.",
+        "use_cases": ["외국인 자금 흐름 분석", "시장 심리 파악"],
+        "parameters": ["market"]
+    },
+    "get_market_cap": {
+        "description": "시가총액 관련 정보를 조회합니다.",
+        "use_cases": ["시장 규모 분석", "대형주/중형주/소형주 분류"],
+        "parameters": ["market"]
+    },
+    "rank_stocks_by_factors": {
+        "description": "사전 계산된 팩터 백분위와 가치/퀄리티/모멘텀 종합 점수로 전체 종목 순위를 조회합니다.",
+        "use_cases": ["저PBR 고ROE 스크리닝", "팩터 기반 종목 순위", "업종 중립 가치주 발굴"],
+        "parameters": ["filters ([{factor, min_pct, max_pct}])", "sort_by (value/quality/momentum/composite)", "limit", "date"]
+    },
+    "scan_market_anomalies": {
+        "description": "전체 시장에서 거래량 급증, 급등락, 갭 상승/하락, 52주 신고가/신저가 종목을 한 번에 스캔합니다.",
+        "use_cases": ["거래량 급증 종목 탐색", "신고가 돌파 종목", "시장 이상 징후 파악"],
+        "parameters": ["kind (volume_spike/return_spike/gap_up/gap_down/high_52w/low_52w/all)", "market", "z_threshold", "gap_threshold", "limit", "date"]
+    },
+    "scan_pairs": {
+        "description": "업종이나 종목 바스켓 내 모든 종목 쌍의 상관계수, 공적분, 평균회귀 반감기를 계산해 페어 트레이딩 후보를 찾습니다.",
+        "use_cases": ["페어 트레이딩", "공적분 종목 쌍 탐색", "차익거래 후보 발굴"],
+        "parameters": ["sector 또는 tickers", "window", "min_corr", "only_cointegrated", "limit"]
+    },
+    "get_relative_performance": {
+        "description": "KOSPI/KOSDAQ/KOSPI200 대비 구성 종목 전체의 롤링 베타, 알파, 추적오차, 상대강도를 조회합니다.",
+        "use_cases": ["지수 대비 초과수익 종목", "베타/변동성 분석", "업종 상대강도 비교"],
+        "parameters": ["index_name (KOSPI/KOSDAQ/KOSPI200)", "window", "sector", "tickers", "sort_by", "limit"]
+    },
+    "get_market_breadth": {
+        "description": "상승/하락 종목 수, ADL, 신고가/신저가, 이동평균 상회 비율 등 시장 폭 지표 시계열을 조회합니다.",
+        "use_cases": ["시장 전반 상승 여부 판단", "시장 과열/침체 진단", "지수와 시장 폭 괴리 분석"],
+        "parameters": ["market (ALL/KOSPI/KOSDAQ)", "start_date", "end_date", "days"]
+    },
+    "get_index_constituents": {
+        "description": "KRX 전 지수군의 지수 목록과 지수별 구성 종목, 시가총액 비중을 조회합니다.",
+        "use_cases": ["지수 구성 종목 확인", "지수 내 비중 상위 종목 파악", "테마/업종 지수 목록 조회"],
+        "parameters": ["index_name (선택)", "family (KOSPI/KOSDAQ/KRX/테마)", "date", "limit"]
+    },
+    "get_investor_flow": {
+        "description": "외국인/기관/개인/연기금/기타법인의 일별 매수·매도·순매수와 기간 합계를 한 번에 조회합니다.",
+        "use_cases": ["투자자별 수급 비교", "연기금 매매 동향 분석", "개인 vs 외국인 순매수 비교"],
+        "parameters": ["ticker (선택)", "market", "view (foreign/institutional/individual/pension/corporate/summary)", "start_date", "end_date"]
+    }
+}
+
+# 구조화 출력 도구 선택 응답 모델 (도구명은 AVAILABLE_TOOLS로 제한)
+ToolSelectionOutput, BatchToolSelectionOutput = tool_selection_models(AVAILABLE_TOOLS)
+
+# 결과 분석 모델 (결과 요약 예산도 이 모델 기준)
+ANALYSIS_MODEL = "gpt-4"
+
+# 도구 선택 실패 시 기본 도구
+DEFAULT_TOOL = "get_all_tickers"
+DEFAULT_PARAMETERS = {"market": "ALL"}
+
+# 규칙/TF-IDF 로컬 선택기 (LLM 선택 결과를 계속 학습)
+tool_classifier = ToolClassifier(AVAILABLE_TOOLS, settings.TOOL_SELECTION_LOG)
+
+
+def build_tool_selection_prompt(node_description: str, node_prompt: str = "",
+                                workflow_context: Optional[List[Dict[str, Any]]] = None) -> str:
+    """도구 선택 프롬프트"""
+    # 워크플로우 컨텍스트 분석
+    workflow_context_str = "\n".join([
+        f"- {node['label']} (상태: {node.get('status', 'pending')})"
+        for node in workflow_context or []
+    ])
+
+    return f"""
+당신은 투자 분석 워크플로우의 AI 어시스턴트입니다.
+현재 실행해야 할 노드와 전체 워크플로우 컨텍스트를 바탕으로 가장 적절한 MCP 도구를 선택해주세요.
+
+**현재 노드:**
+- 설명: {node_description}
+- 프롬프트: {node_prompt}
+
+**전체 워크플로우 컨텍스트:**
+{workflow_context_str}
+
+**사용 가능한 도구들:**
+{json.dumps(AVAILABLE_TOOLS, ensure_ascii=False, indent=2)}
+
+**응답 형식 (JSON):**
+{{
+    "tool_name": "선택한_도구명",
+    "reasoning": "선택 이유 설명",
+    "parameters": {{
+        "parameter1": "value1",
+        "parameter2": "value2"
+    }}
+}}
+
+주의사항:
+1. 노드의 목적에 가장 적합한 도구를 선택하세요
+2. 워크플로우의 순서와 이전 단계 결과를 고려하세요
+3. 매개변수는 노드의 컨텍스트에 맞게 설정하세요
+4. 뉴스 분석이 필요하면 get_market_news를, 재무 분석이 필요하면 get_stock_fundamentals나 filter_stocks_by_fundamentals를 사용하세요
+"""
+
+
+def parse_tool_selection(result_text: str, node_description: str = "") -> Dict[str, Any]:
+    """LLM 응답에서 도구 선택 결과 추출 (실패 시 기본 도구)"""
+    try:
+        # JSON 블록에서 추출
+        if "```json" in result_text:
+            json_start = result_text.find("```json") + 7
+            json_end = result_text.find("```", json_start)
+            result_text = result_text[json_start:json_end].strip()
+
+        result = json.loads(result_text)
+
+        # 도구명 검증
+        if result.get("tool_name") not in AVAILABLE_TOOLS:
+            logger.warning(f"Unknown tool selected: {result.get('tool_name')}")
+            # 기본 도구로 fallback
+            result["tool_name"] = DEFAULT_TOOL
+            result["parameters"] = dict(DEFAULT_PARAMETERS)
+            result["reasoning"] = "알 수 없는 도구가 선택되어 기본 도구로 fallback"
+            result["fallback"] = True
+
+        logger.info(f"Selected tool: {result['tool_name']} for node: {node_description}")
+        return result
+
+    except json.JSONDecodeError as e:
+        logger.error(f"JSON parsing failed: {e}")
+        # 기본 도구로 fallback
+        return {
+            "tool_name": DEFAULT_TOOL,
+            "parameters": dict(DEFAULT_PARAMETERS),
+            "reasoning": "JSON 파싱 실패로 기본 도구 선택",
+            "fallback": True
+        }
+
+
+def structured_selection(output: BaseModel) -> Dict[str, Any]:
+    """구조화 출력 도구 선택 -> 선택 결과 (해당 없는 매개변수 제외)"""
+    return {
+        "tool_name": output.tool_name,
+        "parameters": output.parameters.model_dump(exclude_none=True),
+        "reasoning": output.reasoning,
+    }
+
+
+def local_selection(decision: Dict[str, Any]) -> Dict[str, Any]:
+    """로컬 선택기 결정을 도구 선택 결과 형식으로"""
+    return {
+        "tool_name": decision["tool_name"],
+        "parameters": decision["parameters"],
+        "reasoning": f"로컬 선택기 ({decision['method']}, 신뢰도 {decision['confidence']})",
+        "selector": "local",
+        "confidence": decision["confidence"],
+    }
+
+
+async def select_tool(api_key: str, node_description: str, node_prompt: str = "",
+                      workflow_context: Optional[List[Dict[str, Any]]] = None,
+                      request: Optional[Request] = None, upstream_context: str = "") -> Dict[str, Any]:
+    """노드 설명과 워크플로우 컨텍스트로 MCP 도구 선택
+
+    로컬 선택기가 충분히 확신하면 LLM을 호출하지 않습니다. upstream_context(선행 노드 결과)는
+    LLM 프롬프트에만 포함합니다.
+    """
+    decision = tool_classifier.classify(node_description, node_prompt)
+    if decision["accepted"]:
+        logger.info(f"Selected tool locally: {decision['tool_name']} for node: {node_description}",
+                    confidence=decision["confidence"], method=decision["method"])
+        return local_selection(decision)
+
+    messages = [
+        {"role": "system", "content": "당신은 투자 분석 전문가입니다. JSON 형식으로만 응답하세요."},
+        {"role": "user", "content": build_tool_selection_prompt(
+            node_description, (node_prompt or "") + upstream_context, workflow_context
+        )}
+    ]
+    if settings.LLM_STRUCTURED_OUTPUTS:
+        output = await structured_completion(api_key, ToolSelectionOutput, request=request,
+                                             model=settings.STRUCTURED_OUTPUT_MODEL,
+                                             messages=messages, temperature=0.1)
+        result = structured_selection(output)
+        logger.info(f"Selected tool: {result['tool_name']} for node: {node_description}")
+    else:
+        result_text = await completion_text(
+            api_key,
+            request=request,
+            validate=lambda text: not parse_tool_selection(text.strip()).get("fallback"),
+            model="gpt-4",
+            messages=messages,
+            temperature=0.1
+        )
+        result = parse_tool_selection(result_text.strip(), node_description)
+    if not result.get("fallback"):
+        tool_classifier.learn(node_description, node_prompt, result["tool_name"])
+    result.update(selector="llm", confidence=decision["confidence"])
+    return result
+
+
+def build_batch_selection_prompt(nodes: List[Dict[str, Any]]) -> str:
+    """워크플로우 전체 노드의 도구를 한 번에 선택하는 프롬프트"""
+    node_lines = "\n".join(
+        f"{i}. id={node['id']} | 설명: {node['label']} | 프롬프트: {node.get('prompt') or ''}"
+        for i, node in enumerate(nodes, 1)
+    )
+
+    return f"""
+당신은 투자 분석 워크플로우의 AI 어시스턴트입니다.
+워크플로우의 모든 작업 노드에 대해 실행할 MCP 도구와 매개변수를 한 번에 선택해주세요.
+노드는 실행 순서대로 나열되어 있으며, 앞 단계 결과를 뒤 단계가 이어받습니다.
+
+**작업 노드 (실행 순서):**
+{node_lines}
+
+**사용 가능한 도구들:**
+{json.dumps(AVAILABLE_TOOLS, ensure_ascii=False, indent=2)}
+
+**응답 형식 (JSON 객체):**
+{{
+    "selections": [
+        {{
+            "node_id": "노드 id",
+            "tool_name": "선택한_도구명",
+            "reasoning": "선택 이유 설명",
+            "parameters": {{"parameter1": "value1"}}
+        }}
+    ]
+}}
+
+주의사항:
+1. 모든 노드에 대해 정확히 하나씩 선택하세요 (node_id는 위 목록의 id 그대로)
+2. 노드의 목적과 워크플로우 흐름에 맞게 도구와 매개변수를 정하세요
+3. 뉴스 분석이 필요하면 get_market_news를, 재무 분석이 필요하면 get_stock_fundamentals나 filter_stocks_by_fundamentals를 사용하세요
+"""
+
+
+def _is_json(text: str) -> bool:
+    try:
+        json.loads(text)
+    except json.JSONDecodeError:
+        return False
+    return True
+
+
+def parse_batch_selection(result_text: str, node_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """일괄 선택 응답 -> 노드 id별 선택 결과 (누락/알 수 없는 도구는 제외)"""
+    selections = json.loads(result_text).get("selections", [])
+    result: Dict[str, Dict[str, Any]] = {}
+    for item in selections:
+        if not isinstance(item, dict) or item.get("node_id") not in node_ids:
+            continue
+        if item.get("tool_name") not in AVAILABLE_TOOLS:
+            logger.warning(f"Unknown tool selected: {item.get('tool_name')}")
+            continue
+        result[item["node_id"]] = {
+            "tool_name": item["tool_name"],
+            "parameters": item.get("parameters") or {},
+            "reasoning": item.get("reasoning", ""),
+        }
+    return result
+
+
+async def select_tools_batch(api_key: str, nodes: List[Dict[str, Any]],
+                             request: Optional[Request] = None) -> Dict[str, Dict[str, Any]]:
+    """모든 노드의 도구를 LLM 호출 한 번으로 선택 (선택하지 못한 노드는 결과에서 빠짐)
+
+    로컬 선택기가 확신하는 노드는 LLM 요청에서 제외합니다.
+    """
+    result: Dict[str, Dict[str, Any]] = {}
+    remaining = []
+    for node in nodes:
+        decision = tool_classifier.classify(node["label"], node.get("prompt") or "")
+        if decision["accepted"]:
+            result[node["id"]] = local_selection(decision)
+        else:
+            remaining.append(node)
+    if not remaining:
+        return result
+
+    messages = [
+        {"role": "system", "content": "당신은 투자 분석 전문가입니다. JSON 형식으로만 응답하세요."},
+        {"role": "user", "content": build_batch_selection_prompt(remaining)}
+    ]
+    node_ids = [node["id"] for node in remaining]
+    if settings.LLM_STRUCTURED_OUTPUTS:
+        output = await structured_completion(api_key, BatchToolSelectionOutput, request=request,
+                                             model=settings.STRUCTURED_OUTPUT_MODEL,
+                                             messages=messages, temperature=0.1)
+        selected = {
+            item.node_id: structured_selection(item) for item in output.selections if item.node_id in node_ids
+        }
+    else:
+        result_text = await completion_text(
+            api_key,
+            request=request,
+            validate=_is_json,
+            model=settings.STRUCTURED_OUTPUT_MODEL,
+            messages=messages,
+            temperature=0.1,
+            response_format={"type": "json_object"}
+        )
+        selected = parse_batch_selection(result_text, node_ids)
+    for node in remaining:
+        if node["id"] in selected:
+            tool_classifier.learn(node["label"], node.get("prompt") or "", selected[node["id"]]["tool_name"])
+            selected[node["id"]]["selector"] = "llm"
+    result.update(selected)
+    logger.info(f"Batch tool selection: {len(result)}/{len(nodes)} nodes "
+                f"({len(nodes) - len(remaining)} local)")
+    return result
+
+
+def build_analysis_prompt(node_description: str, tool_used: str, raw_result: Any,
+                          model: str = ANALYSIS_MODEL) -> str:
+    """결과 분석 프롬프트 (큰 결과는 모델별 예산에 맞춘 통계 요약으로 대체)"""
+    data, summarized = result_for_prompt(raw_result, model)
+    data_label = "원시 데이터 요약 (전체 행 대신 행 수/분포/상위·하위 종목/이상치)" if summarized else "원시 데이터"
+    return f"""
+당신은 투자 분석 전문가입니다.
+다음 MCP 도구 실행 결과를 분석하고 투자자가 이해하기 쉽게 해석해주세요.
+
+**노드 목적:** {node_description}
+**사용된 도구:** {tool_used}
+**{data_label}:** {data}
+
+**분석 요청사항:**
+1. 데이터의 핵심 인사이트 추출
+2. 투자 관점에서의 해석
+3. 주목할 만한 종목이나 패턴 식별
+4. 다음 분석 단계 제안
+
+**응답 형식:**
+명확하고 구조화된 한국어로 작성해주세요.
+- 핵심 요약 (2-3문장)
+- 주요 발견사항 (불릿 포인트)
+- 투자 시사점
+- 추천 후속 조치
+
+길이는 200-500자 정도로 간결하게 작성해주세요.
+"""
+
+
+async def analyze_result(api_key: str, node_description: str, tool_used: str, raw_result: Any,
+                         request: Optional[Request] = None,
+                         on_token: Optional[Callable[[str], Awaitable[None]]] = None) -> str:
+    """MCP 도구 실행 결과 분석 (on_token이 있으면 스트리밍으로 받아 토큰마다 전달)"""
+    messages = [
+        {"role": "system", "content": "당신은 투자 분석 전문가입니다. 데이터를 명확하고 실용적으로 해석하세요."},
+        {"role": "user", "content": build_analysis_prompt(node_description, tool_used, raw_result, ANALYSIS_MODEL)}
+    ]
+    if on_token is None:
+        analysis = (await completion_text(api_key, request=request, model=ANALYSIS_MODEL,
+                                          messages=messages, temperature=0.3)).strip()
+    else:
+        async def collect() -> str:
+            parts = []
+            async for token in completion_stream(api_key, request=request, model=ANALYSIS_MODEL,
+                                                 messages=messages, temperature=0.3):
+                parts.append(token)
+                await on_token(token)
+            return "".join(parts).strip()
+
+        analysis = await asyncio.wait_for(collect(), timeout=settings.OPENAI_REQUEST_TIMEOUT)
+
+    logger.info(f"Analysis completed for tool: {tool_used}")
+    return analysis
+
+
+def build_batch_analysis_prompt(results: List[Dict[str, Any]], model: str) -> str:
+    """여러 노드 결과를 한 번에 분석하는 프롬프트 (결과 요약 예산을 노드 수로 나눔)"""
+    sections = []
+    for i, item in enumerate(results, 1):
+        data, summarized = result_for_prompt(item["raw_result"], model, share=len(results))
+        data_label = "원시 데이터 요약" if summarized else "원시 데이터"
+        sections.append(
+            f"### {i}. node_id={item['node_id']}\n"
+            f"**노드 목적:** {item['node_description']}\n"
+            f"**사용된 도구:** {item['tool_used']}\n"
+            f"**{data_label}:** {data}"
+        )
+    node_sections = "\n\n".join(sections)
+
+    return f"""
+당신은 투자 분석 전문가입니다.
+워크플로우의 각 노드가 실행한 MCP 도구 결과를 노드별로 분석하고 투자자가 이해하기 쉽게 해석해주세요.
+노드는 실행 순서대로 나열되어 있으며, 앞 노드의 결과와 연결되는 점이 있으면 함께 언급하세요.
+
+{node_sections}
+
+**노드별 분석 요청사항:**
+1. 데이터의 핵심 인사이트 추출
+2. 투자 관점에서의 해석
+3. 주목할 만한 종목이나 패턴 식별
+4. 다음 분석 단계 제안
+
+**응답 형식 (JSON 객체):**
+{{"analyses": [{{"node_id": "노드 id", "analysis": "분석 내용"}}]}}
+
+- 위 노드 순서대로 모든 노드에 대해 하나씩 작성하세요 (node_id는 목록의 id 그대로)
+- analysis는 명확하고 구조화된 한국어로 핵심 요약(2-3문장), 주요 발견사항(불릿 포인트),
+  투자 시사점, 추천 후속 조치를 200-500자 정도로 작성하세요
+"""
+
+
+async def analyze_results_batch(api_key: str, results: List[Dict[str, Any]],
+                                request: Optional[Request] = None) -> AsyncIterator[Dict[str, Any]]:
+    """여러 노드 결과를 LLM 요청 한 번으로 분석 (노드별 분석이 완성되는 대로 반환)
+
+    results: [{node_id, node_description, tool_used, raw_result}]. 응답에서 빠진 노드나
+    호출 실패/OPENAI_REPORT_TIMEOUT 초과 시 남은 노드는 기본 분석으로 채웁니다.
+    """
+    model = settings.STRUCTURED_OUTPUT_MODEL
+    pending = {item["node_id"]: item for item in results}
+    response_format = (json_schema_format(BatchAnalysisOutput) if settings.LLM_STRUCTURED_OUTPUTS
+                       else {"type": "json_object"})
+    parser = TaskStreamParser(array_key="analyses")
+    stream = completion_stream(
+        api_key,
+        request=request,
+        validate=_is_json,
+        model=model,
+        messages=[
+            {"role": "system", "content": "당신은 투자 분석 전문가입니다. 데이터를 명확하고 실용적으로 해석하세요."},
+            {"role": "user", "content": build_batch_analysis_prompt(results, model)}
+        ],
+        temperature=0.3,
+        response_format=response_format
+    )
+    # 스트림 전체에 마감 시간 적용 (토큰 단위로 기다리므로 yield 중인 호출자는 취소되지 않음)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.OPENAI_REPORT_TIMEOUT
+
+    try:
+        while True:
+            try:
+                token = await asyncio.wait_for(stream.__anext__(), timeout=max(deadline - loop.time(), 0))
+            except StopAsyncIteration:
+                break
+            for section in parser.feed(token):
+                if not isinstance(section.get("analysis"), str):
+                    continue
+                item = pending.pop(section.get("node_id"), None)
+                if item is not None:
+                    yield {"node_id": item["node_id"], "tool_used": item["tool_used"],
+                           "analysis": section["analysis"].strip(), "fallback": False}
+    except ClientDisconnected:
+        raise
+    except asyncio.TimeoutError:
+        logger.warning(f"Batch analysis timed out after {settings.OPENAI_REPORT_TIMEOUT}s")
+    except Exception as e:
+        logger.error(f"Batch analysis failed: {e}")
+    finally:
+        await stream.aclose()
+
+    if pending:
+        logger.warning(f"Batch analysis missing {len(pending)}/{len(results)} nodes, using fallback")
+    for item in pending.values():
+        yield {"node_id": item["node_id"], "tool_used": item["tool_used"],
+               "analysis": fallback_analysis(item["node_description"], item["tool_used"], item["raw_result"]),
+               "fallback": True}
+    logger.info(f"Batch analysis completed for {len(results)} nodes")
+
+
+def fallback_analysis(node_description: str, tool_used: str, raw_result: Any) -> str:
+    """AI 분석 실패 시 기본 분석"""
+    return f"""
+**{node_description} 분석 결과**
+
+{tool_used} 도구를 사용하여 데이터를 수집했습니다.
+
+• 데이터 크기: {len(str(raw_result))} 바이트
+• 처리 상태: 완료
+• 다음 단계: 추가 분석이나 다른 도구를 활용한 심화 분석을 권장합니다.
+
+*자동 생성된 기본 분석입니다. 상세한 분석을 위해 AI 분석을 다시 시도해보세요.*
+            """
@@ -14,6 +14,9 @@ from app.core.database import engine, Base
 from app.core.security import verify_token
 from app.api import auth, planning, workflow, results, mcp, users, reports
 from app.api import settings as settings_api
+from app.services.openai_clients import client_registry
+from app.services.node_memo import node_memo
+from app.services.workflow_engine import workflow_engine
 from app.utils.logger import setup_logger
 
 # 로거 설정
@@ -62,12 +65,22 @@ async def startup_event():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
+    # 재시작 전 실행 중이던 워크플로우는 재개 가능 상태로 표시, 오래된 노드 결과 캐시 정리
+    await workflow_engine.recover_interrupted()
+    await node_memo.prune(settings.NODE_CACHE_RETENTION_DAYS)
+    
     logger.info("✅ 데이터베이스 초기화 완료")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """애플리케이션 종료 시 정리"""
     logger.info("🛑 AI Agent Workflow Platform 종료")
+    
+    # 실행 중인 워크플로우 취소
+    await workflow_engine.shutdown()
+    
+    # 공유 OpenAI 연결 풀 정리
+    await client_registry.aclose()
 
 @app.get("/")
 async def root():
@@ -0,0 +1,15 @@
+"""
+백엔드 테스트 공통 설정
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# backend 디렉터리를 import 경로에 추가 (app 패키지)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# 개발용 DB 대신 임시 SQLite 파일 사용 (app 모듈 import 전에 설정)
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("DEBUG", "false")
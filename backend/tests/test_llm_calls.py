@@ -0,0 +1,69 @@
+"""
+스트리밍 LLM 호출 테스트
+소비자가 중간에 멈추거나 스트리밍 중 클라이언트 연결이 끊겨도 응답 스트림을 닫아
+공유 연결 풀의 연결을 돌려주는지 확인합니다.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import llm_calls
+from app.services.llm_calls import ClientDisconnected, completion_stream
+
+
+class FakeStream:
+    """토큰 청크를 내보내고 close() 호출 여부를 기록하는 AsyncStream 대역"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.closed = False
+
+    async def __aiter__(self):
+        for token in self.tokens:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeRequest:
+    def __init__(self, disconnect_after: int):
+        self.polls = 0
+        self.disconnect_after = disconnect_after
+
+    async def is_disconnected(self):
+        self.polls += 1
+        return self.polls >= self.disconnect_after
+
+
+@pytest.fixture
+def fake_stream(monkeypatch):
+    stream = FakeStream(["삼성", "전자", " 분석", " 완료"])
+
+    async def fake_chat_completion(api_key, **kwargs):
+        return stream
+
+    monkeypatch.setattr(llm_calls, "chat_completion", fake_chat_completion)
+    return stream
+
+
+@pytest.mark.asyncio
+async def test_stream_is_closed_when_consumer_stops_early(fake_stream):
+    tokens = completion_stream("sk-test", use_cache=False, model="gpt-4o", messages=[])
+    assert await tokens.__anext__() == "삼성"
+    await tokens.aclose()
+    assert fake_stream.closed
+
+
+@pytest.mark.asyncio
+async def test_disconnect_during_streaming_stops_and_closes(fake_stream, monkeypatch):
+    monkeypatch.setattr(llm_calls, "DISCONNECT_POLL_INTERVAL", 0)
+    request = FakeRequest(disconnect_after=2)
+    received = []
+    with pytest.raises(ClientDisconnected):
+        async for token in completion_stream("sk-test", request=request, use_cache=False,
+                                             model="gpt-4o", messages=[]):
+            received.append(token)
+    assert received == ["삼성", "전자"]
+    assert fake_stream.closed
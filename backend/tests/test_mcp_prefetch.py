@@ -0,0 +1,83 @@
+"""
+MCP 선행 조회 테스트
+워크플로우 생성 중 질의/작업으로 예약한 조회가 예산 안에서만 실행되고, 노드 실행 시
+진행 중이거나 끝난 결과를 그대로 쓰며, 스트림이 끊기면 취소되는지 확인합니다.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.mcp_prefetch import MCPPrefetcher
+from app.services.workflow_steps import tool_classifier
+
+
+class FakeServer:
+    """호출 기록 + 응답 지연/실패를 흉내 내는 MCP 서버"""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.calls = []
+        self.delay = delay
+        self.fail = fail
+
+    async def fetch(self, tool_name, parameters):
+        self.calls.append((tool_name, parameters))
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("MCP 서버 호출 실패")
+        return {"tool_name": tool_name, "parameters": parameters}
+
+
+@pytest.fixture
+def prefetcher(monkeypatch):
+    monkeypatch.setattr(settings, "MCP_PREFETCH_ENABLED", True)
+    monkeypatch.setattr(settings, "MCP_PREFETCH_MAX_FETCHES", 2)
+    prefetcher = MCPPrefetcher()
+    yield prefetcher
+    prefetcher.clear()
+
+
+@pytest.mark.asyncio
+async def test_query_tickers_are_prefetched_within_budget(prefetcher):
+    server = FakeServer(delay=0.05)
+    session = prefetcher.session(server.fetch, tool_classifier)
+    session.observe_query("005930, 000660, 035420 세 종목 비교 분석")
+
+    # 진행 중인 조회에 합류 (서버 호출은 한 번)
+    result = await prefetcher.take("get_stock_fundamentals", {"ticker": "005930"})
+    assert result == {"tool_name": "get_stock_fundamentals", "parameters": {"ticker": "005930"}}
+    await asyncio.sleep(0.1)
+    assert [params["ticker"] for _, params in server.calls] == ["005930", "000660"]
+    assert await prefetcher.take("get_stock_fundamentals", {"ticker": "035420"}) is None
+    metrics = prefetcher.metrics()
+    assert metrics["scheduled"] == 2 and metrics["joined"] == 1
+
+
+@pytest.mark.asyncio
+async def test_task_with_confident_local_selection_is_prefetched(prefetcher):
+    server = FakeServer()
+    session = prefetcher.session(server.fetch, tool_classifier)
+    task = {"title": "삼성전자 뉴스 수집", "description": "최근 뉴스 헤드라인 수집"}
+    session.observe_task(task)
+
+    decision = tool_classifier.classify(task["title"], task["description"], record=False)
+    assert decision["accepted"]
+    result = await prefetcher.take(decision["tool_name"], decision["parameters"])
+    assert result["tool_name"] == decision["tool_name"]
+    assert len(server.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_and_cancelled_fetches_are_not_served(prefetcher):
+    failing = prefetcher.session(FakeServer(fail=True).fetch, tool_classifier)
+    failing.observe_query("005930 분석")
+    assert await prefetcher.take("get_stock_fundamentals", {"ticker": "005930"}) is None
+
+    slow = prefetcher.session(FakeServer(delay=10).fetch, tool_classifier)
+    slow.observe_query("000660 분석")
+    waiter = asyncio.create_task(prefetcher.take("get_stock_fundamentals", {"ticker": "000660"}))
+    await asyncio.sleep(0.01)
+    slow.cancel()
+    assert await waiter is None
+    assert prefetcher.metrics()["entries"] == 0
@@ -0,0 +1,134 @@
+"""
+워크플로우 노드 메모이제이션/재개 테스트
+입력이 그대로인 재실행은 저장된 결과를 쓰고, 프롬프트가 바뀐 노드는 그 노드와 하위 노드만
+다시 계산하며, 재개는 실패/건너뛴 노드만 다시 실행하는지 확인합니다.
+"""
+
+import asyncio
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal, Base, engine
+from app.models import Workflow, WorkflowExecution, WorkflowNode
+from app.services import workflow_engine as engine_module
+from app.services.execution_events import ExecutionEventBus
+from app.services.workflow_engine import WorkflowEngine
+
+# start -> a -> c, start -> b
+EDGES = [{"source": "start", "target": "a"}, {"source": "start", "target": "b"}, {"source": "a", "target": "c"}]
+
+
+@pytest_asyncio.fixture
+async def workflow_id():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    # 테스트마다 다른 프롬프트를 써서 앞선 테스트의 저장 결과와 겹치지 않도록 함
+    tag = uuid.uuid4().hex
+    async with AsyncSessionLocal() as session:
+        workflow = Workflow(user_id=1, name="메모 테스트", canvas_data={"edges": EDGES}, status="draft")
+        session.add(workflow)
+        await session.flush()
+        for i, (node_id, node_type) in enumerate([("start", "start"), ("a", "task"), ("b", "task"), ("c", "task")]):
+            session.add(WorkflowNode(workflow_id=workflow.id, node_id=node_id, node_type=node_type,
+                                     title=f"작업 {node_id}", prompt=f"{node_id} {tag}",
+                                     position_x=i * 100.0, position_y=0.0, config={}))
+        await session.commit()
+        return workflow.id
+
+
+@pytest.fixture
+def workflow_engine(monkeypatch):
+    workflow_engine = WorkflowEngine(events=ExecutionEventBus())
+    workflow_engine.executed = []
+    workflow_engine.failing = set()
+
+    async def no_planning(*args):
+        return {}
+
+    async def execute_node(execution_id, node, *args):
+        workflow_engine.executed.append(node["node_id"])
+        if node["node_id"] in workflow_engine.failing:
+            raise RuntimeError("MCP 서버 응답 없음")
+        # 결과가 프롬프트에 따라 달라져야 하위 노드 키도 바뀜
+        return {"status": "completed", "tool_name": "get_market_news", "parameters": {},
+                "raw_result": {}, "analysis": f"{node['title']}: {node['prompt']}"}
+
+    monkeypatch.setattr(workflow_engine, "plan_tools", no_planning)
+    monkeypatch.setattr(workflow_engine, "_execute_node", execute_node)
+    # 장중에는 캐시를 쓰지 않으므로 거래일 고정
+    monkeypatch.setattr(engine_module, "session_date", lambda: "20240614")
+    return workflow_engine
+
+
+async def run(workflow_engine, workflow_id, resume_execution_id=None, use_cache=True):
+    """실행(또는 재개)을 끝까지 기다린 뒤 (실행 기록, 노드별 결과 출처, 실제 실행한 노드)"""
+    workflow_engine.executed = []
+    async with AsyncSessionLocal() as db:
+        workflow = await workflow_engine.load_workflow(db, workflow_id, user_id=1)
+        if resume_execution_id is None:
+            execution = await workflow_engine.start(db, workflow, "sk-test", use_cache=use_cache)
+        else:
+            previous = await db.get(WorkflowExecution, resume_execution_id)
+            execution = await workflow_engine.resume(db, workflow, previous, "sk-test", use_cache=use_cache)
+        execution_id = execution.id
+    await asyncio.wait_for(workflow_engine._tasks[execution_id], timeout=5)
+
+    events = workflow_engine.events.get(execution_id).events
+    sources = {e["node_id"]: e.get("source", e["type"]) for e in events
+               if e["type"] in ("done", "failed", "skipped")}
+    async with AsyncSessionLocal() as db:
+        execution = await db.get(WorkflowExecution, execution_id)
+    return execution, sources, sorted(workflow_engine.executed)
+
+
+async def set_prompt(workflow_id, node_id, prompt):
+    async with AsyncSessionLocal() as db:
+        node = (await db.execute(select(WorkflowNode).where(
+            WorkflowNode.workflow_id == workflow_id, WorkflowNode.node_id == node_id
+        ))).scalar_one()
+        node.prompt = prompt
+        await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_unchanged_rerun_uses_stored_results(workflow_engine, workflow_id):
+    execution, sources, executed = await run(workflow_engine, workflow_id)
+    assert execution.status == "completed"
+    assert executed == ["a", "b", "c", "start"]
+
+    execution, sources, executed = await run(workflow_engine, workflow_id)
+    assert execution.status == "completed"
+    # 시작 노드는 저장 대상이 아니라 다시 실행 (작업 노드는 모두 저장된 결과)
+    assert executed == ["start"]
+    assert {node_id: sources[node_id] for node_id in "abc"} == {"a": "cached", "b": "cached", "c": "cached"}
+
+
+@pytest.mark.asyncio
+async def test_changed_prompt_recomputes_node_and_descendants(workflow_engine, workflow_id):
+    await run(workflow_engine, workflow_id)
+    await set_prompt(workflow_id, "a", "a 프롬프트 수정")
+
+    execution, sources, executed = await run(workflow_engine, workflow_id)
+    assert execution.status == "completed"
+    assert executed == ["a", "c", "start"]
+    assert (sources["a"], sources["b"], sources["c"]) == ("executed", "cached", "executed")
+
+
+@pytest.mark.asyncio
+async def test_resume_reruns_only_failed_and_skipped_nodes(workflow_engine, workflow_id):
+    workflow_engine.failing = {"a"}
+    execution, sources, _ = await run(workflow_engine, workflow_id, use_cache=False)
+    assert execution.status == "failed"
+    assert (sources["a"], sources["b"], sources["c"]) == ("failed", "executed", "skipped")
+
+    workflow_engine.failing = set()
+    execution, sources, executed = await run(workflow_engine, workflow_id, resume_execution_id=execution.id,
+                                             use_cache=False)
+    assert execution.status == "completed"
+    assert execution.execution_log["resumed_from"] == ["b", "start"]
+    assert executed == ["a", "c"]
+    assert (sources["start"], sources["a"], sources["b"], sources["c"]) == (
+        "resumed", "executed", "resumed", "executed")
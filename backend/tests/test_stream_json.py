@@ -0,0 +1,36 @@
+"""
+스트리밍 JSON 파서 테스트
+토큰 경계와 무관하게 tasks 원소가 완성되는 대로 나오고, 앞 설명 문장 속 중괄호에
+걸려 실제 JSON을 놓치지 않는지 확인합니다.
+"""
+
+import json
+
+from app.services.stream_json import TaskStreamParser
+
+TASKS = [
+    {"id": "task_1", "title": "재무지표 수집", "description": "PER {및} PBR"},
+    {"id": "task_2", "title": "뉴스 수집", "description": "최근 \"뉴스\" 수집"},
+]
+
+
+def feed_in_chunks(parser: TaskStreamParser, text: str, size: int = 5):
+    tasks = []
+    for i in range(0, len(text), size):
+        tasks.extend(parser.feed(text[i:i + size]))
+    return tasks
+
+
+def test_tasks_are_extracted_across_chunk_boundaries():
+    text = "```json\n" + json.dumps({"workflow_title": "분석", "tasks": TASKS}, ensure_ascii=False) + "\n```"
+    parser = TaskStreamParser()
+    assert feed_in_chunks(parser, text) == TASKS
+    assert parser.count == 2
+
+
+def test_braces_in_leading_prose_are_skipped():
+    body = json.dumps({"tasks": TASKS}, ensure_ascii=False)
+    text = "Here is it {maybe} with {\"tasks\": 3}\n```json\n" + body + "\n```\n{after}"
+    parser = TaskStreamParser()
+    assert feed_in_chunks(parser, text) == TASKS
+    assert parser.count == 2
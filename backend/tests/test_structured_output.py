@@ -0,0 +1,269 @@
+"""
+구조화 출력(JSON 스키마) 모드 테스트
+OpenAI 호환 스텁 서버를 띄워 플래너/도구 선택이 response_format=json_schema(strict)로
+요청하고, 응답을 JSON 추출·재시도·기본값 fallback 없이 한 번에 처리하는지 확인합니다.
+"""
+
+import asyncio
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.llm_output import ToolParameters
+from app.services import workflow_steps
+from app.services.ai_planner import AIPlanner
+from app.services.llm_cache import llm_cache
+
+# 스키마 이름별 스텁 응답
+WORKFLOW = {
+    "workflow_title": "삼성전자 가치 분석",
+    "description": "재무지표와 뉴스로 삼성전자를 분석합니다",
+    "tasks": [
+        {"id": "task_1", "title": "재무지표 수집", "description": "PER/PBR/ROE 수집",
+         "task_type": "data", "estimated_time": "5분"},
+        {"id": "task_2", "title": "뉴스 수집", "description": "최근 뉴스 수집",
+         "task_type": "data", "estimated_time": "5분"},
+        {"id": "task_3", "title": "종합 분석", "description": "수집 데이터 종합",
+         "task_type": "analysis", "estimated_time": "10분"},
+    ],
+    "expected_outcome": "투자 의견 보고서",
+}
+PLAN = {
+    "analysis": "삼성전자 가치 평가 요청",
+    "plan_title": "삼성전자 분석 계획",
+    "tasks": [
+        {"id": "t1", "title": "데이터 수집", "description": "재무 데이터 수집",
+         "agent_allowed": ["data_collector"], "mcp_tools": ["stock_data_fetcher"],
+         "dependencies": [], "estimated_time": "5분"},
+    ],
+    "clarification_questions": [],
+    "move_to_canvas": True,
+    "priority": "medium",
+    "complexity": "simple",
+}
+NULL_PARAMETERS = {field: None for field in ToolParameters.model_fields}
+TOOL_SELECTION = {
+    "tool_name": "get_stock_fundamentals",
+    "reasoning": "개별 종목 재무지표가 필요",
+    "parameters": {**NULL_PARAMETERS, "ticker": "005930"},
+}
+BATCH_SELECTION = {
+    "selections": [
+        {**TOOL_SELECTION, "node_id": "n1"},
+        {"node_id": "n2", "tool_name": "get_market_news", "reasoning": "뉴스 필요",
+         "parameters": {**NULL_PARAMETERS, "tickers": ["005930"], "days": 7}},
+    ]
+}
+BATCH_ANALYSIS = {
+    "analyses": [
+        {"node_id": "n1", "analysis": "PER 10배로 저평가 구간입니다."},
+        {"node_id": "n2", "analysis": "최근 뉴스는 중립적입니다."},
+    ]
+}
+RESPONSES = {
+    "WorkflowOutput": WORKFLOW,
+    "PlanOutput": PLAN,
+    "ToolSelectionOutput": TOOL_SELECTION,
+    "BatchToolSelectionOutput": BATCH_SELECTION,
+    "BatchAnalysisOutput": BATCH_ANALYSIS,
+}
+
+
+class StubOpenAIHandler(BaseHTTPRequestHandler):
+    """/v1/chat/completions 스텁 (json_schema 이름에 맞는 응답, stream 지원)"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(body)
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") != "json_schema":
+            self.send_error(400, "json_schema response_format required")
+            return
+        content = json.dumps(RESPONSES[response_format["json_schema"]["name"]], ensure_ascii=False)
+
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            # 토큰 경계가 JSON 구조와 맞지 않도록 7자씩 전송
+            for i in range(0, len(content), 7):
+                self._write_event(self._chunk({"content": content[i:i + 7]}, None))
+            self._write_event(self._chunk({}, "stop"))
+            self.wfile.write(b"data: [DONE]\n\n")
+            return
+
+        payload = json.dumps({
+            "id": "chatcmpl-stub", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    @staticmethod
+    def _chunk(delta, finish_reason):
+        return {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": 0, "model": "stub",
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+    def _write_event(self, event):
+        self.wfile.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOpenAIHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.setattr(settings, "LLM_STRUCTURED_OUTPUTS", True)
+    llm_cache.clear()
+    yield server
+    server.shutdown()
+    llm_cache.clear()
+
+
+@pytest.fixture
+def no_fallbacks(monkeypatch):
+    """JSON 추출/재시도/기본값 경로가 호출되면 실패"""
+    def forbidden(name):
+        def fail(*args, **kwargs):
+            raise AssertionError(f"{name} 호출됨 (구조화 출력에서는 사용하지 않아야 함)")
+        return fail
+
+    monkeypatch.setattr(AIPlanner, "_parse_and_validate_response", forbidden("_parse_and_validate_response"))
+    monkeypatch.setattr(AIPlanner, "_create_smart_default_workflow", forbidden("_create_smart_default_workflow"))
+    monkeypatch.setattr(AIPlanner, "_get_default_plan_response", forbidden("_get_default_plan_response"))
+    monkeypatch.setattr(workflow_steps, "parse_tool_selection", forbidden("parse_tool_selection"))
+    monkeypatch.setattr(workflow_steps, "parse_batch_selection", forbidden("parse_batch_selection"))
+    # 로컬 선택기를 건너뛰고 항상 LLM으로 선택
+    monkeypatch.setattr(workflow_steps.tool_classifier, "classify",
+                        lambda *args: {"accepted": False, "confidence": 0.0})
+    monkeypatch.setattr(workflow_steps.tool_classifier, "learn", lambda *args: None)
+
+
+def api_key() -> str:
+    # 키별로 클라이언트를 새로 만들어 스텁 서버 주소(OPENAI_BASE_URL)를 쓰게 함
+    return f"sk-test-{uuid.uuid4().hex}"
+
+
+def assert_strict_schema(request, name):
+    response_format = request["response_format"]
+    assert response_format["type"] == "json_schema"
+    assert response_format["json_schema"]["name"] == name
+    assert response_format["json_schema"]["strict"] is True
+    schema = response_format["json_schema"]["schema"]
+    assert schema["additionalProperties"] is False
+    assert set(schema["required"]) == set(schema["properties"])
+
+
+@pytest.mark.asyncio
+async def test_workflow_stream_uses_schema_without_parse_fallback(stub_server, no_fallbacks):
+    planner = AIPlanner(api_key=api_key())
+    events = [event async for event in planner.generate_plan_stream("삼성전자 분석 워크플로우", mode="workflow")]
+
+    assert len(stub_server.requests) == 1
+    assert_strict_schema(stub_server.requests[0], "WorkflowOutput")
+    assert [e["type"] for e in events if e["type"] not in ("content", "task")] == ["done"]
+    assert [e["task"]["id"] for e in events if e["type"] == "task"] == ["task_1", "task_2", "task_3"]
+    done = json.loads(events[-1]["full_response"])
+    assert done["workflow_title"] == WORKFLOW["workflow_title"]
+    assert [task["title"] for task in done["tasks"]] == [task["title"] for task in WORKFLOW["tasks"]]
+
+
+@pytest.mark.asyncio
+async def test_plan_uses_schema_without_parse_fallback(stub_server, no_fallbacks):
+    plan = await AIPlanner(api_key=api_key()).generate_plan("삼성전자 가치 평가")
+
+    assert len(stub_server.requests) == 1
+    assert_strict_schema(stub_server.requests[0], "PlanOutput")
+    assert plan["plan_title"] == PLAN["plan_title"]
+    assert plan["tasks"][0]["mcp_tools"] == ["stock_data_fetcher"]
+
+
+@pytest.mark.asyncio
+async def test_tool_selection_uses_schema_without_parse_fallback(stub_server, no_fallbacks):
+    result = await workflow_steps.select_tool(api_key(), "삼성전자 재무지표 확인", "PER/PBR 조회")
+
+    assert len(stub_server.requests) == 1
+    request = stub_server.requests[0]
+    assert_strict_schema(request, "ToolSelectionOutput")
+    assert request["model"] == settings.STRUCTURED_OUTPUT_MODEL
+    assert result["tool_name"] == "get_stock_fundamentals"
+    assert result["parameters"] == {"ticker": "005930"}
+    assert not result.get("fallback")
+
+
+@pytest.mark.asyncio
+async def test_batch_tool_selection_uses_schema_without_parse_fallback(stub_server, no_fallbacks):
+    nodes = [
+        {"id": "n1", "label": "삼성전자 재무지표", "prompt": ""},
+        {"id": "n2", "label": "삼성전자 뉴스", "prompt": ""},
+    ]
+    result = await workflow_steps.select_tools_batch(api_key(), nodes)
+
+    assert len(stub_server.requests) == 1
+    assert_strict_schema(stub_server.requests[0], "BatchToolSelectionOutput")
+    assert result["n1"]["parameters"] == {"ticker": "005930"}
+    assert result["n2"] == {"tool_name": "get_market_news", "reasoning": "뉴스 필요",
+                            "parameters": {"tickers": ["005930"], "days": 7}, "selector": "llm"}
+
+
+@pytest.mark.asyncio
+async def test_batch_analysis_streams_sections_in_one_request(stub_server):
+    results = [
+        {"node_id": "n1", "node_description": "삼성전자 재무지표", "tool_used": "get_stock_fundamentals",
+         "raw_result": {"ticker": "005930", "per": 10.0}},
+        {"node_id": "n2", "node_description": "삼성전자 뉴스", "tool_used": "get_market_news",
+         "raw_result": {"news": []}},
+        {"node_id": "n3", "node_description": "응답에 없는 노드", "tool_used": "get_market_news",
+         "raw_result": {"news": []}},
+    ]
+    sections = [s async for s in workflow_steps.analyze_results_batch(api_key(), results)]
+
+    assert len(stub_server.requests) == 1
+    assert stub_server.requests[0]["stream"] is True
+    assert_strict_schema(stub_server.requests[0], "BatchAnalysisOutput")
+    assert [s["node_id"] for s in sections] == ["n1", "n2", "n3"]
+    assert sections[0]["analysis"] == BATCH_ANALYSIS["analyses"][0]["analysis"]
+    assert [s["fallback"] for s in sections] == [False, False, True]
+
+
+@pytest.mark.asyncio
+async def test_batch_analysis_falls_back_when_stream_stalls(monkeypatch):
+    first = json.dumps(BATCH_ANALYSIS["analyses"][0], ensure_ascii=False)
+
+    async def stalled_stream(*args, **kwargs):
+        # 첫 노드 분석까지만 보내고 응답이 멈춘 스트림
+        yield '{"analyses": [' + first + ","
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(workflow_steps, "completion_stream", stalled_stream)
+    monkeypatch.setattr(settings, "OPENAI_REPORT_TIMEOUT", 0.2)
+    results = [
+        {"node_id": "n1", "node_description": "삼성전자 재무지표", "tool_used": "get_stock_fundamentals",
+         "raw_result": {"ticker": "005930", "per": 10.0}},
+        {"node_id": "n2", "node_description": "삼성전자 뉴스", "tool_used": "get_market_news",
+         "raw_result": {"news": []}},
+    ]
+    sections = await asyncio.wait_for(
+        _collect(workflow_steps.analyze_results_batch(api_key(), results)), timeout=5)
+
+    assert [s["node_id"] for s in sections] == ["n1", "n2"]
+    assert [s["fallback"] for s in sections] == [False, True]
+
+
+async def _collect(stream):
+    return [item async for item in stream]
@@ -0,0 +1,31 @@
+"""
+토큰 수 계산 테스트
+tiktoken 인코딩 파일을 받지 못해도(오프라인) 예외 없이 추정치로 세는지 확인합니다.
+"""
+
+import pytest
+
+from app.services import token_counter
+
+
+@pytest.fixture
+def offline_tiktoken(monkeypatch):
+    class OfflineTiktoken:
+        @staticmethod
+        def encoding_for_model(model):
+            raise ConnectionError("Failed to download o200k_base.tiktoken")
+
+        get_encoding = encoding_for_model
+
+    monkeypatch.setattr(token_counter, "TIKTOKEN_AVAILABLE", True)
+    monkeypatch.setattr(token_counter, "tiktoken", OfflineTiktoken, raising=False)
+    token_counter._encoding.cache_clear()
+    yield
+    token_counter._encoding.cache_clear()
+
+
+def test_encoding_load_failure_falls_back_to_estimate(offline_tiktoken):
+    text = "삼성전자 PER 10배"
+    assert token_counter.count_tokens(text) == 5 + 2  # 한글 5자 + ASCII 7자(2토큰)
+    truncated = token_counter.truncate_to_tokens("가" * 100, 10)
+    assert truncated == "가" * 10
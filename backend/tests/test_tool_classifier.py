@@ -0,0 +1,55 @@
+"""
+로컬 도구 선택기 학습 테스트
+learn()이 색인을 동기 재계산하지 않고 바로 추가하고, 주기적인 전체 재계산은 스레드에서
+수행되어 그 사이 학습한 기록도 잃지 않으며, 흔해서 제외한 용어가 학습으로 가중치를 얻지
+않는지 확인합니다.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services import tool_classifier as classifier_module
+from app.services.tool_classifier import MAX_POSTINGS, ToolClassifier
+from app.services.workflow_steps import AVAILABLE_TOOLS
+
+EXAMPLE = "반도체 장비 밸류체인 점검"
+
+
+def test_learned_example_is_used_without_full_rebuild(monkeypatch):
+    classifier = ToolClassifier(AVAILABLE_TOOLS)
+    monkeypatch.setattr(classifier, "_build", lambda *args: pytest.fail("learn()이 색인 전체를 재계산함"))
+
+    classifier.learn(EXAMPLE, "", "get_index_constituents")
+    decision = classifier.classify(EXAMPLE, record=False)
+    assert decision["tool_name"] == "get_index_constituents"
+
+
+@pytest.mark.asyncio
+async def test_periodic_rebuild_runs_in_background(monkeypatch):
+    monkeypatch.setattr(classifier_module, "REBUILD_EVERY", 50)
+    classifier = ToolClassifier(AVAILABLE_TOOLS)
+    for i in range(50):
+        classifier.learn(f"{EXAMPLE} {i}", "", "get_index_constituents")
+    task = classifier._rebuild_task
+    assert task is not None
+    # 재계산 중 학습한 기록도 새 색인에 남아야 함
+    classifier.learn("2차전지 소재 공급망 점검", "", "get_sector_performance")
+    await asyncio.wait_for(task, timeout=5)
+
+    assert classifier._rebuild_task is None
+    assert len(classifier._labels) == len(classifier._documents())
+    assert classifier.classify("2차전지 소재 공급망", record=False)["tool_name"] == "get_sector_performance"
+    assert max(len(postings) for postings in classifier._index.values()) <= MAX_POSTINGS
+
+
+def test_learning_common_term_does_not_shift_unrelated_decisions():
+    classifier = ToolClassifier(AVAILABLE_TOOLS)
+    query = "삼성전자 종목 재무 분석"
+    before = classifier.classify(query, record=False)["tool_name"]
+    assert "b:종목" not in classifier._idf
+
+    # 흔해서 색인에서 제외한 용어가 학습 한 번으로 최대 IDF를 얻으면 안 됨
+    classifier.learn("종목 비교", "", "get_market_news")
+    assert "b:종목" not in classifier._idf
+    assert classifier.classify(query, record=False)["tool_name"] == before
@@ -0,0 +1,104 @@
+"""
+워크플로우 실행 엔진 오류 처리 테스트
+노드 결과 기록이나 실행 준비 단계에서 예외가 나도 실행 기록이 running으로 남지 않고,
+이벤트 구독자가 execution_finished를 받은 뒤 종료되는지 확인합니다.
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from app.core.database import AsyncSessionLocal, Base, engine
+from app.models import Workflow, WorkflowExecution
+from app.services.execution_events import ExecutionEventBus
+from app.services.workflow_engine import WorkflowEngine
+
+NODES = {
+    "start": {"node_id": "start", "node_type": "start", "title": "시작", "prompt": "", "config": {}},
+    "a": {"node_id": "a", "node_type": "task", "title": "작업 A", "prompt": "", "config": {}},
+    "b": {"node_id": "b", "node_type": "task", "title": "작업 B", "prompt": "", "config": {}},
+    "c": {"node_id": "c", "node_type": "task", "title": "작업 C", "prompt": "", "config": {}},
+}
+UPSTREAM = {"start": [], "a": ["start"], "b": ["start"], "c": ["a"]}
+ORDER = ["start", "a", "b", "c"]
+
+
+@pytest_asyncio.fixture
+async def execution_ids():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as session:
+        workflow = Workflow(user_id=1, name="테스트", canvas_data={}, status="running")
+        session.add(workflow)
+        await session.flush()
+        execution = WorkflowExecution(workflow_id=workflow.id, status="running")
+        session.add(execution)
+        await session.commit()
+        return execution.id, workflow.id
+
+
+@pytest.fixture
+def workflow_engine(monkeypatch):
+    workflow_engine = WorkflowEngine(events=ExecutionEventBus())
+
+    async def no_planning(*args):
+        return {}
+
+    async def execute_node(execution_id, node, *args):
+        return {"status": "completed", "tool_name": "get_market_news", "parameters": {},
+                "raw_result": {}, "analysis": node["title"]}
+
+    monkeypatch.setattr(workflow_engine, "plan_tools", no_planning)
+    monkeypatch.setattr(workflow_engine, "_execute_node", execute_node)
+    return workflow_engine
+
+
+async def run(workflow_engine, execution_id, workflow_id):
+    workflow_engine.events.open(execution_id)
+    events = []
+
+    async def collect():
+        async for event in workflow_engine.events.subscribe(execution_id):
+            events.append(event)
+
+    subscriber = asyncio.create_task(collect())
+    await asyncio.wait_for(workflow_engine._run(execution_id, workflow_id, NODES, UPSTREAM, ORDER,
+                                                "sk-test", {}, use_cache=False), timeout=5)
+    await asyncio.wait_for(subscriber, timeout=5)
+
+    async with AsyncSessionLocal() as session:
+        execution = await session.get(WorkflowExecution, execution_id)
+        workflow = await session.get(Workflow, workflow_id)
+        return events, execution, workflow
+
+
+@pytest.mark.asyncio
+async def test_record_failure_fails_only_that_node(workflow_engine, execution_ids, monkeypatch):
+    record_result = workflow_engine._record_result
+
+    async def flaky_record(execution_id, node, result):
+        if node["node_id"] == "a":
+            raise RuntimeError("database is locked")
+        await record_result(execution_id, node, result)
+
+    monkeypatch.setattr(workflow_engine, "_record_result", flaky_record)
+    events, execution, workflow = await run(workflow_engine, *execution_ids)
+
+    assert execution.status == "failed" and workflow.status == "failed"
+    nodes = execution.execution_log["nodes"]
+    assert (nodes["a"]["status"], nodes["b"]["status"], nodes["c"]["status"]) == ("failed", "completed", "skipped")
+    assert events[-1]["type"] == "execution_finished"
+
+
+@pytest.mark.asyncio
+async def test_unexpected_error_finishes_execution(workflow_engine, execution_ids, monkeypatch):
+    async def broken_planning(*args):
+        raise RuntimeError("planning storage unavailable")
+
+    monkeypatch.setattr(workflow_engine, "plan_tools", broken_planning)
+    events, execution, workflow = await run(workflow_engine, *execution_ids)
+
+    assert execution.status == "failed" and workflow.status == "failed"
+    assert "planning storage unavailable" in execution.error_message
+    assert events[-1]["type"] == "execution_finished" and events[-1]["status"] == "failed"
@@ -46,6 +46,8 @@ export interface Node {
     raw_data?: any
     mcp_result?: any
     analysis_result?: any
+    planned_tool?: { tool_name: string; parameters: Record<string, any>; reasoning?: string }
+    analysis_pending?: boolean
   }
 }
 
@@ -189,7 +191,8 @@ interface AppState {
   generateReport: (workflowResults: any[]) => Promise<void>
   
   // 워크플로우 실행 액션
-  executeWorkflowNode: (nodeId: string, toolName?: string, params?: Record<string, any>) => Promise<void>
+  executeWorkflowNode: (nodeId: string, toolName?: string, params?: Record<string, any>, deferAnalysis?: boolean) => Promise<void>
+  analyzeWorkflowResults: () => Promise<void>
   executeEntireWorkflow: () => Promise<void>
   
   // 워크플로우 생성 액션
@@ -312,7 +315,7 @@ export const useAppStore = create<AppState>((set, get) => ({
   },
   
   // 워크플로우 노드 실행 - 동적 도구 선택
-  executeWorkflowNode: async (nodeId: string, toolName?: string, params?: Record<string, any>) => {
+  executeWorkflowNode: async (nodeId: string, toolName?: string, params?: Record<string, any>, deferAnalysis?: boolean) => {
     console.log(`Executing node ${nodeId}`)
     
     const state = get()
@@ -339,31 +342,37 @@ export const useAppStore = create<AppState>((set, get) => ({
         throw new Error('OpenAI API 키가 설정되지 않았습니다.')
       }
 
-      // 1단계: AI가 현재 노드에 적합한 MCP 도구를 선택하도록 요청
-      console.log(`Step 1: Selecting appropriate tool for node: ${node.data.label}`)
+      // 1단계: 워크플로우 생성 시 미리 선택된 도구가 없으면 AI가 현재 노드에 적합한 MCP 도구를 선택하도록 요청
+      let toolSelection = get().nodes.find(n => n.id === nodeId)?.data.planned_tool
       
-      const toolSelectionResponse = await fetch('http://localhost:8000/api/workflow/select-tool', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          node_description: node.data.label,
-          node_prompt: node.data.prompt || '',
-          workflow_context: state.nodes.map(n => ({ id: n.id, label: n.data.label, status: n.data.status })),
-          openai_api_key: openaiApiKey
+      if (toolSelection) {
+        console.log(`Step 1: Using planned tool for node: ${node.data.label}`, toolSelection)
+      } else {
+        console.log(`Step 1: Selecting appropriate tool for node: ${node.data.label}`)
+        
+        const toolSelectionResponse = await fetch('http://localhost:8000/api/workflow/select-tool', {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+          },
+          body: JSON.stringify({
+            node_description: node.data.label,
+            node_prompt: node.data.prompt || '',
+            workflow_context: state.nodes.map(n => ({ id: n.id, label: n.data.label, status: n.data.status })),
+            openai_api_key: openaiApiKey
+          })
         })
-      })
 
-      console.log('Tool selection response status:', toolSelectionResponse.status)
-      if (!toolSelectionResponse.ok) {
-        const errorText = await toolSelectionResponse.text()
-        console.error('Tool selection API error:', errorText)
-        throw new Error(`도구 선택 API 호출 실패: ${toolSelectionResponse.status} - ${errorText}`)
-      }
+        console.log('Tool selection response status:', toolSelectionResponse.status)
+        if (!toolSelectionResponse.ok) {
+          const errorText = await toolSelectionResponse.text()
+          console.error('Tool selection API error:', errorText)
+          throw new Error(`도구 선택 API 호출 실패: ${toolSelectionResponse.status} - ${errorText}`)
+        }
 
-      const toolSelection = await toolSelectionResponse.json()
-      console.log('Selected tool:', toolSelection)
+        toolSelection = await toolSelectionResponse.json()
+        console.log('Selected tool:', toolSelection)
+      }
 
       // 2단계: 선택된 도구로 실제 작업 실행
       const selectedTool = toolSelection.tool_name
@@ -401,6 +410,29 @@ export const useAppStore = create<AppState>((set, get) => ({
       console.log('전체 결과:', JSON.stringify(mcpResult, null, 2))
       console.log('========================')
 
+      // 전체 실행 중에는 분석을 미루고 모든 노드 결과를 한 번에 분석 (analyzeWorkflowResults)
+      if (deferAnalysis) {
+        set((state) => ({
+          nodes: state.nodes.map(node => 
+            node.id === nodeId 
+              ? { 
+                  ...node, 
+                  data: { 
+                    ...node.data, 
+                    tool_used: selectedTool,
+                    parameters_used: selectedParams,
+                    raw_data: mcpResult,
+                    mcp_result: mcpResult,
+                    analysis_pending: true
+                  } 
+                }
+              : node
+          )
+        }))
+        console.log(`Node ${nodeId} tool executed, analysis deferred`)
+        return
+      }
+
       // 3단계: AI가 결과를 분석하고 해석
       console.log('Step 3: Analyzing results with AI')
       
@@ -479,6 +511,110 @@ export const useAppStore = create<AppState>((set, get) => ({
     }
   },
 
+  // 분석을 미룬 노드 결과를 한 번의 요청으로 분석 (노드별 분석이 도착하는 대로 반영)
+  analyzeWorkflowResults: async () => {
+    const pendingNodes = get().nodes.filter(n => n.data.analysis_pending)
+    if (pendingNodes.length === 0) return
+    
+    const openaiApiKey = localStorage.getItem('openai_api_key')
+    const completeNode = (nodeId: string, analysis: string, toolUsed: string, dataSummary: string) => {
+      set((state) => ({
+        nodes: state.nodes.map(node => 
+          node.id === nodeId 
+            ? { 
+                ...node, 
+                data: { 
+                  ...node.data, 
+                  status: 'completed',
+                  result: analysis,
+                  analysis_pending: false,
+                  analysis_result: { analysis, tool_used: toolUsed, data_summary: dataSummary }
+                } 
+              }
+            : node
+        )
+      }))
+    }
+    
+    console.log(`Analyzing ${pendingNodes.length} node results in one request`)
+    
+    try {
+      const response = await fetch('http://localhost:8000/api/workflow/analyze-results', {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+          results: pendingNodes.map(n => ({
+            node_id: n.id,
+            node_description: n.data.label,
+            tool_used: n.data.tool_used,
+            raw_result: n.data.mcp_result
+          })),
+          openai_api_key: openaiApiKey
+        })
+      })
+      
+      if (!response.ok) {
+        throw new Error(`결과 분석 API 호출 실패: ${response.status}`)
+      }
+      
+      const reader = response.body?.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+      
+      if (reader) {
+        try {
+          while (true) {
+            const { done, value } = await reader.read()
+            if (done) break
+            
+            // 이벤트가 청크 경계에서 잘릴 수 있으므로 빈 줄 단위로 처리
+            buffer += decoder.decode(value, { stream: true })
+            const events = buffer.split('\n\n')
+            buffer = events.pop() || ''
+            
+            for (const event of events) {
+              if (!event.startsWith('data: ')) continue
+              const data = JSON.parse(event.slice(6))
+              if (data.type === 'section') {
+                completeNode(
+                  data.node_id,
+                  data.analysis,
+                  data.tool_used,
+                  data.fallback ? '기본 분석 모드' : `${data.tool_used} 도구 결과 일괄 분석`
+                )
+              } else if (data.type === 'done') {
+                console.log(`Batch analysis completed in ${data.elapsed}s`)
+              }
+            }
+          }
+        } finally {
+          reader.releaseLock()
+        }
+      }
+    } catch (error) {
+      console.error('Batch analysis failed:', error)
+    }
+    
+    // 분석을 받지 못한 노드는 오류로 표시
+    set((state) => ({
+      nodes: state.nodes.map(node => 
+        node.data.analysis_pending
+          ? { 
+              ...node, 
+              data: { 
+                ...node.data, 
+                status: 'error',
+                analysis_pending: false,
+                error: '결과 분석에 실패했습니다.'
+              } 
+            }
+          : node
+      )
+    }))
+  },
+
   // 자동 워크플로우 실행
   executeEntireWorkflow: async () => {
     console.log('Executing entire workflow...')
@@ -500,6 +636,9 @@ export const useAppStore = create<AppState>((set, get) => ({
         
         // 결과 노드인 경우 특별 처리
         if (node.type === 'result') {
+          // 앞선 작업 노드 결과를 한 번에 분석한 뒤 종합
+          await get().analyzeWorkflowResults()
+          
           // 최신 상태에서 이전 노드들의 결과를 종합해서 최종 결과 생성
           const currentState = get()
           const taskNodes = currentState.nodes.filter(n => n.type === 'task' && n.data.status === 'completed')
@@ -530,9 +669,9 @@ export const useAppStore = create<AppState>((set, get) => ({
             )
           }))
         } else {
-          // 일반 노드 실행 (자동 도구 선택)
+          // 일반 노드 실행 (자동 도구 선택, 결과 분석은 일괄 처리)
           console.log(`Executing node ${node.id}...`)
-          await get().executeWorkflowNode(node.id)
+          await get().executeWorkflowNode(node.id, undefined, undefined, true)
           console.log(`Node ${node.id} execution completed`)
         }
         
@@ -540,6 +679,9 @@ export const useAppStore = create<AppState>((set, get) => ({
         await new Promise(resolve => setTimeout(resolve, 500))
       }
       
+      // 결과 노드가 없는 워크플로우도 남은 분석 처리
+      await get().analyzeWorkflowResults()
+      
       set({ executionStatus: 'completed' })
       console.log('Entire workflow execution completed!')
       
@@ -732,6 +874,32 @@ export const useAppStore = create<AppState>((set, get) => ({
                   
                   if (data.type === 'content') {
                     fullResponse += data.content
+                  } else if (data.type === 'task' && data.task) {
+                    // 작업이 완성되는 대로 캔버스에 노드 추가 (최종 응답을 받으면 다시 구성)
+                    const task = data.task
+                    const index: number = data.index
+                    const nodeId = task.id || `task-${index + 1}`
+                    set((state) => {
+                      const nodes: Node[] = index === 0
+                        ? [{ id: 'start', type: 'start', position: { x: 100, y: 200 }, data: { label: '워크플로우 시작' } }]
+                        : state.nodes
+                      const edges: Edge[] = index === 0 ? [] : state.edges
+                      const prevNodeId = nodes[nodes.length - 1]?.id || 'start'
+                      return {
+                        nodes: [...nodes, {
+                          id: nodeId,
+                          type: 'task',
+                          position: { x: 350 + (index * 250), y: 100 + (index % 2) * 200 },
+                          data: {
+                            label: task.title || `작업 ${index + 1}`,
+                            prompt: task.description || '',
+                            type: task.task_type || 'general',
+                            status: 'pending'
+                          }
+                        }],
+                        edges: [...edges, { id: `edge-${index}`, source: prevNodeId, target: nodeId, type: 'default' }]
+                      }
+                    })
                   } else if (data.type === 'done' && data.full_response) {
                     fullResponse = data.full_response
                     break
@@ -903,6 +1071,36 @@ export const useAppStore = create<AppState>((set, get) => ({
         workflowGenerating: false // 로딩 종료
       })
       
+      // 모든 작업 노드의 도구를 한 번에 미리 선택 (실행 시 노드별 도구 선택 호출 생략)
+      const planApiKey = localStorage.getItem('openai_api_key')
+      if (planApiKey) {
+        fetch('http://localhost:8000/api/workflow/select-tools', {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+          },
+          body: JSON.stringify({
+            nodes: newNodes
+              .filter(n => n.type === 'task')
+              .map(n => ({ id: n.id, label: n.data.label, prompt: n.data.prompt || '' })),
+            openai_api_key: planApiKey
+          })
+        })
+          .then(response => response.ok ? response.json() : null)
+          .then(data => {
+            if (!data?.selections) return
+            console.log('Planned tools:', data.selections)
+            set((state) => ({
+              nodes: state.nodes.map(n => 
+                data.selections[n.id]
+                  ? { ...n, data: { ...n.data, planned_tool: data.selections[n.id] } }
+                  : n
+              )
+            }))
+          })
+          .catch(error => console.error('Batch tool selection failed:', error))
+      }
+      
       // 워크플로우 생성 완료 후 탭 변경 (로딩 상태를 충분히 보여주기 위해 지연)
       setTimeout(() => {
         set({ currentTab: 'workflow' })
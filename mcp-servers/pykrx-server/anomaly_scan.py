@@ -0,0 +1,140 @@
+"""
+전체 시장 이상 징후 스캐너
+날짜 x 종목 OHLCV 행렬에서 거래량/수익률 z-score, 갭 상승/하락,
+52주 신고가/신저가를 한 번의 벡터 연산으로 계산합니다.
+"""
+
+import warnings
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from market_store import MarketStore
+
+
+# z-score 계산 기간 (당일 제외 직전 거래일 수)
+ZSCORE_WINDOW = 20
+# 52주 = 약 252 거래일
+BREAKOUT_WINDOW = 252
+# 신고가/신저가 판정에 필요한 기간 내 유효 거래일 비율 (거래 정지일 허용)
+BREAKOUT_MIN_COVERAGE = 0.9
+
+ANOMALY_KINDS = ["volume_spike", "return_spike", "gap_up", "gap_down", "high_52w", "low_52w"]
+
+PANEL_FIELDS = ["시가", "고가", "저가", "종가", "거래량"]
+
+
+def _trailing_zscore(matrix: np.ndarray, window: int) -> np.ndarray:
+    """마지막 행을 직전 window 행의 평균/표준편차로 표준화"""
+    history = matrix[-window - 1:-1]
+    mean = np.nanmean(history, axis=0)
+    std = np.nanstd(history, axis=0, ddof=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (matrix[-1] - mean) / np.where(std > 0, std, np.nan)
+    return z
+
+
+def compute_anomalies(panels: Dict[str, pd.DataFrame], window: int = ZSCORE_WINDOW,
+                      breakout_window: int = BREAKOUT_WINDOW) -> pd.DataFrame:
+    """패널의 마지막 거래일에 대한 종목별 이상 징후 지표 계산"""
+    close = panels["종가"]
+    tickers = close.columns
+    columns = ["volume_z", "return_pct", "return_z", "gap_pct",
+               "high_52w", "low_52w", "high_52w_flag", "low_52w_flag"]
+    if len(close) < 2:
+        return pd.DataFrame(index=tickers, columns=columns, dtype="float64")
+
+    o = panels["시가"].to_numpy(dtype="float64", copy=True)
+    h = panels["고가"].to_numpy(dtype="float64", copy=True)
+    l = panels["저가"].to_numpy(dtype="float64", copy=True)
+    c = close.to_numpy(dtype="float64", copy=True)
+    v = panels["거래량"].to_numpy(dtype="float64", copy=True)
+
+    # 거래 정지(0) 종목은 결측 처리
+    c[c <= 0] = np.nan
+    o[o <= 0] = np.nan
+    h[h <= 0] = np.nan
+    l[l <= 0] = np.nan
+
+    # 신규 상장 등으로 전 구간이 결측인 종목의 경고는 무시
+    with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        returns = c[1:] / c[:-1] - 1
+        log_volume = np.log1p(v)
+        gap = o[-1] / c[-2] - 1
+
+        # 직전 기간 신고가/신저가 (당일 제외). 이력이 기간 시작일 이전부터 있고 기간 내 거래일이
+        # 충분한 종목만 돌파로 판정 (저장소를 채우는 중이거나 신규 상장 종목의 몇 주 고가를
+        # 52주 신고가로 보지 않되, 며칠간의 거래 정지로 1년간 판정에서 빠지지 않도록)
+        prior_h = h[-breakout_window - 1:-1]
+        prior_l = l[-breakout_window - 1:-1]
+        prior_high = np.nanmax(prior_h, axis=0)
+        prior_low = np.nanmin(prior_l, axis=0)
+        valid = ~np.isnan(h) & ~np.isnan(l)
+        start = len(h) - breakout_window - 1
+        listed = valid[:start + 1].any(axis=0) if start >= 0 else np.zeros(len(tickers), dtype=bool)
+        coverage = np.count_nonzero(valid[-breakout_window - 1:-1], axis=0)
+        full_window = listed & (coverage >= BREAKOUT_MIN_COVERAGE * breakout_window)
+
+        frame = pd.DataFrame({
+            "volume_z": _trailing_zscore(log_volume, window),
+            "return_pct": returns[-1] * 100,
+            "return_z": _trailing_zscore(returns, window) if len(returns) > 2 else np.nan,
+            "gap_pct": gap * 100,
+            "high_52w": prior_high,
+            "low_52w": prior_low,
+            "high_52w_flag": full_window & (c[-1] > prior_high),
+            "low_52w_flag": full_window & (c[-1] < prior_low),
+        }, index=tickers)
+    return frame[columns]
+
+
+def compute_and_store(store: MarketStore, date: str, snapshot: pd.DataFrame) -> None:
+    """마감 후 훅: 당일 이상 징후 지표만 계산해 저장 (증분 처리)"""
+    # 기간 시작일에 거래 정지였던 종목도 상장 여부를 알 수 있도록 z-score 기간만큼 더 읽음
+    lookback = BREAKOUT_WINDOW + ZSCORE_WINDOW + 1
+    panels = {field: store.load_panel(field, end_date=date, lookback=lookback)
+              for field in PANEL_FIELDS}
+    frame = compute_anomalies(panels)
+    frame.to_pickle(store.artifact_path(date, "anomalies", "pkl"))
+
+
+def register(store: MarketStore) -> None:
+    """저장소에 이상 징후 계산 훅 등록"""
+    store.register_post_close(compute_and_store)
+
+
+def load_anomalies(store: MarketStore, date: str) -> pd.DataFrame:
+    """저장된 이상 징후 지표 로드 (없으면 계산)"""
+    path = store.artifact_path(date, "anomalies", "pkl")
+    if not path.exists():
+        compute_and_store(store, date, store.get_snapshot(date))
+    return pd.read_pickle(path)
+
+
+def scan(frame: pd.DataFrame, kind: str, z_threshold: float = 3.0,
+         gap_threshold: float = 3.0, tickers: Optional[List[str]] = None) -> pd.DataFrame:
+    """이상 징후 유형별 종목 선별 (강도 내림차순)"""
+    if tickers is not None:
+        frame = frame[frame.index.isin(tickers)]
+
+    if kind == "volume_spike":
+        hits = frame[frame["volume_z"] >= z_threshold]
+        return hits.sort_values("volume_z", ascending=False)
+    if kind == "return_spike":
+        hits = frame[frame["return_z"].abs() >= z_threshold]
+        return hits.reindex(hits["return_z"].abs().sort_values(ascending=False).index)
+    if kind == "gap_up":
+        hits = frame[frame["gap_pct"] >= gap_threshold]
+        return hits.sort_values("gap_pct", ascending=False)
+    if kind == "gap_down":
+        hits = frame[frame["gap_pct"] <= -gap_threshold]
+        return hits.sort_values("gap_pct")
+    if kind == "high_52w":
+        hits = frame[frame["high_52w_flag"].astype(bool)]
+        return hits.sort_values("return_pct", ascending=False)
+    if kind == "low_52w":
+        hits = frame[frame["low_52w_flag"].astype(bool)]
+        return hits.sort_values("return_pct")
+    raise ValueError(f"알 수 없는 이상 징후 유형: {kind}")
@@ -0,0 +1,200 @@
+"""
+메모리 절약형 시장 스냅샷
+종목코드는 종목 마스터의 int32 ID로, 가격/거래량은 int32(범위 초과 시 int64),
+비율 지표는 float32, 금액/주식수는 float64, 시장/업종은 범주형으로 보관합니다.
+몇 년치 일별 스냅샷을 서버 메모리에 올려도 DataFrame 대비 수 배 작습니다.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# 정수로 보관하는 컬럼 (int32 범위를 넘으면 int64)
+INT_COLUMNS = ["시가", "고가", "저가", "종가", "거래량"]
+# float32로 보관하는 컬럼 (비율/배수라 유효숫자 7자리로 충분)
+FLOAT_COLUMNS = ["등락률", "PER", "PBR", "DIV"]
+# float64로 보관하는 컬럼 (도구가 그대로 반환하는 금액/주식수: float32면 시가총액이 수천만 원
+# 단위로 반올림됨, 결측은 NaN 유지)
+AMOUNT_COLUMNS = ["거래대금", "시가총액", "상장주식수", "BPS", "EPS", "DPS"]
+# 범주형으로 보관하는 컬럼
+CATEGORY_COLUMNS = ["시장", "업종명"]
+
+INT32_MAX = np.iinfo(np.int32).max
+
+
+class TickerMaster:
+    """종목코드 <-> int32 ID 매핑 (ID는 한 번 부여되면 바뀌지 않음)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._tickers: List[str] = []
+        self._names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self._tickers, self._names = data["tickers"], data["names"]
+            self._ids = {t: i for i, t in enumerate(self._tickers)}
+        self._array: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._tickers)
+
+    @property
+    def tickers(self) -> np.ndarray:
+        """ID 순서의 종목코드 배열 (벡터 조회용)"""
+        if self._array is None or len(self._array) != len(self._tickers):
+            self._array = np.array(self._tickers, dtype=object)
+        return self._array
+
+    def ids(self, tickers: Iterable[str], names: Optional[Iterable[str]] = None) -> np.ndarray:
+        """종목코드 -> ID 배열 (처음 보는 종목은 새 ID 부여)"""
+        names = list(names) if names is not None else None
+        out = []
+        changed = False
+        for k, ticker in enumerate(tickers):
+            idx = self._ids.get(ticker)
+            name = names[k] if names is not None and isinstance(names[k], str) else None
+            if idx is None:
+                idx = len(self._tickers)
+                self._ids[ticker] = idx
+                self._tickers.append(ticker)
+                self._names.append(name or "")
+                changed = True
+            elif name and self._names[idx] != name:
+                self._names[idx] = name
+                changed = True
+            out.append(idx)
+        if changed:
+            self.save()
+        return np.asarray(out, dtype=np.int32)
+
+    def id_of(self, ticker: str) -> Optional[int]:
+        return self._ids.get(ticker)
+
+    def ticker(self, idx: int) -> str:
+        return self._tickers[idx]
+
+    def name(self, idx: int) -> str:
+        return self._names[idx]
+
+    def names(self, ids: np.ndarray) -> np.ndarray:
+        return np.asarray(self._names, dtype=object)[ids]
+
+    def save(self) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"tickers": self._tickers, "names": self._names}, f, ensure_ascii=False)
+        tmp.replace(self.path)
+
+
+class SnapshotRow:
+    """스냅샷 한 종목의 읽기 전용 뷰"""
+
+    __slots__ = ("_snapshot", "_pos")
+
+    def __init__(self, snapshot: "CompactSnapshot", pos: int):
+        self._snapshot = snapshot
+        self._pos = pos
+
+    @property
+    def ticker(self) -> str:
+        return self._snapshot.master.ticker(int(self._snapshot.ids[self._pos]))
+
+    @property
+    def name(self) -> str:
+        return self._snapshot.master.name(int(self._snapshot.ids[self._pos]))
+
+    def __getitem__(self, column: str):
+        value = self._snapshot.columns[column][self._pos]
+        return value.item() if hasattr(value, "item") else value
+
+    def to_dict(self) -> Dict:
+        row = {"티커": self.ticker, "종목명": self.name}
+        row.update({col: self[col] for col in self._snapshot.columns})
+        return row
+
+    def __repr__(self) -> str:
+        return f"SnapshotRow({self.ticker} {self.name})"
+
+
+class CompactSnapshot:
+    """ID 배열 + 컬럼별 압축 배열로 구성된 일별 스냅샷"""
+
+    __slots__ = ("master", "ids", "columns", "_positions")
+
+    def __init__(self, master: TickerMaster, ids: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.master = master
+        self.ids = ids
+        self.columns = columns
+        self._positions: Optional[Dict[int, int]] = None
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, master: TickerMaster) -> "CompactSnapshot":
+        """스냅샷 DataFrame을 압축 (종목명은 종목 마스터에 보관)"""
+        names = frame["종목명"] if "종목명" in frame.columns else None
+        ids = master.ids(frame.index, names)
+
+        columns: Dict[str, np.ndarray] = {}
+        for col in frame.columns:
+            if col == "종목명":
+                continue
+            values = frame[col]
+            if col in INT_COLUMNS:
+                filled = values.fillna(0).to_numpy(dtype="int64")
+                fits = len(filled) == 0 or np.abs(filled).max() <= INT32_MAX
+                columns[col] = filled.astype(np.int32) if fits else filled
+            elif col in CATEGORY_COLUMNS:
+                columns[col] = pd.Categorical(values)
+            elif col in FLOAT_COLUMNS:
+                columns[col] = values.to_numpy(dtype=np.float32, na_value=np.nan)
+            else:
+                columns[col] = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        return cls(master, ids, columns)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """배열 메모리 사용량 (바이트)"""
+        total = self.ids.nbytes
+        for values in self.columns.values():
+            if isinstance(values, pd.Categorical):
+                total += values.codes.nbytes
+            else:
+                total += values.nbytes
+        return total
+
+    @property
+    def tickers(self) -> np.ndarray:
+        return self.master.tickers[self.ids]
+
+    def position(self, ticker: str) -> Optional[int]:
+        """종목코드의 스냅샷 내 위치"""
+        if self._positions is None:
+            self._positions = {int(i): pos for pos, i in enumerate(self.ids)}
+        idx = self.master.id_of(ticker)
+        return self._positions.get(idx) if idx is not None else None
+
+    def row(self, ticker: str) -> Optional[SnapshotRow]:
+        pos = self.position(ticker)
+        return SnapshotRow(self, pos) if pos is not None else None
+
+    def rows(self) -> Iterable[SnapshotRow]:
+        return (SnapshotRow(self, pos) for pos in range(len(self.ids)))
+
+    def column(self, name: str) -> pd.Series:
+        """컬럼 하나를 종목코드 인덱스 Series로 (패널 구성용)"""
+        return pd.Series(self.columns[name], index=pd.Index(self.tickers, name="티커"), name=name)
+
+    def to_frame(self) -> pd.DataFrame:
+        """기존 스냅샷 DataFrame 형태로 복원"""
+        data = {"종목명": self.master.names(self.ids)}
+        data.update(self.columns)
+        frame = pd.DataFrame(data, index=pd.Index(self.tickers, name="티커"))
+        return frame
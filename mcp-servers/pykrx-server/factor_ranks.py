@@ -0,0 +1,174 @@
+"""
+횡단면 팩터 순위 사전 계산
+장 마감 후 전체 종목의 백분위 순위, 업종 중립 z-score,
+가치/퀄리티/모멘텀 종합 점수를 계산해 스냅샷 옆에 저장합니다.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from market_store import MarketStore
+
+
+# 원시 지표 (백분위는 값이 작을수록 0, 클수록 1)
+RAW_METRICS = ["PER", "PBR", "ROE", "DIV", "EPS", "시가총액", "MOM"]
+
+# 종합 점수 구성 (지표, 방향): 방향 +1 이면 클수록 좋음
+SCORE_COMPONENTS = {
+    "value": [("EY", 1), ("BP", 1), ("DIV", 1)],
+    "quality": [("ROE", 1)],
+    "momentum": [("MOM", 1)],
+}
+SCORES = ["value", "quality", "momentum", "composite"]
+
+# 모멘텀: 12개월 수익률에서 최근 1개월 제외
+MOMENTUM_LOOKBACK = 252
+MOMENTUM_SKIP = 21
+
+Z_CLIP = 3.0
+
+
+def _momentum(store: MarketStore, date: str, tickers: pd.Index) -> pd.Series:
+    """저장된 종가 패널로 모멘텀 계산 (이력이 부족하면 가능한 구간만 사용)"""
+    closes = store.load_panel("종가", end_date=date, lookback=MOMENTUM_LOOKBACK + 1)
+    if len(closes) < 2:
+        return pd.Series(np.nan, index=tickers)
+    skip = MOMENTUM_SKIP if len(closes) > MOMENTUM_SKIP + 1 else 0
+    end = closes.iloc[-1 - skip]
+    start = closes.iloc[0]
+    return (end / start.where(start > 0) - 1).reindex(tickers)
+
+
+def _sector_zscore(values: pd.Series, sectors: pd.Series) -> pd.Series:
+    """업종 내 z-score (업종 표준편차가 0이거나 종목이 하나면 0)"""
+    grouped = values.groupby(sectors)
+    mean = grouped.transform("mean")
+    std = grouped.transform("std")
+    z = (values - mean) / std.where(std > 0)
+    z = z.where(values.isna() | z.notna(), 0.0)
+    return z.clip(-Z_CLIP, Z_CLIP)
+
+
+def compute_factor_table(snapshot: pd.DataFrame, momentum: Optional[pd.Series] = None) -> Dict[str, np.ndarray]:
+    """스냅샷 한 장에 대한 팩터 배열 계산"""
+    tickers = snapshot.index
+    sectors = snapshot["업종명"].fillna("기타")
+
+    per = snapshot["PER"].where(snapshot["PER"] > 0)
+    pbr = snapshot["PBR"].where(snapshot["PBR"] > 0)
+    bps = snapshot["BPS"].where(snapshot["BPS"] > 0)
+
+    metrics = pd.DataFrame({
+        "PER": per,
+        "PBR": pbr,
+        "ROE": snapshot["EPS"] / bps * 100,
+        "DIV": snapshot["DIV"],
+        "EPS": snapshot["EPS"],
+        "시가총액": snapshot["시가총액"],
+        "MOM": momentum if momentum is not None else np.nan,
+        # 가치 지표는 역수로 변환해 클수록 저평가가 되도록 함
+        "EY": 1 / per,
+        "BP": 1 / pbr,
+    }, index=tickers).astype("float64")
+
+    arrays: Dict[str, np.ndarray] = {
+        "tickers": np.asarray(tickers, dtype="U12"),
+    }
+
+    for metric in RAW_METRICS:
+        arrays[f"raw_{metric}"] = metrics[metric].to_numpy(dtype="float32")
+        arrays[f"pct_{metric}"] = metrics[metric].rank(pct=True).to_numpy(dtype="float32")
+
+    zscores = {}
+    for name in {m for comps in SCORE_COMPONENTS.values() for m, _ in comps}:
+        zscores[name] = _sector_zscore(metrics[name], sectors)
+        arrays[f"z_{name}"] = zscores[name].to_numpy(dtype="float32")
+
+    scores = {}
+    for score, components in SCORE_COMPONENTS.items():
+        parts = pd.concat([zscores[m] * sign for m, sign in components], axis=1)
+        scores[score] = parts.mean(axis=1, skipna=True)
+    scores["composite"] = pd.concat([scores[s] for s in SCORE_COMPONENTS], axis=1).mean(axis=1, skipna=True)
+
+    for score in SCORES:
+        values = scores[score]
+        arrays[f"score_{score}"] = values.to_numpy(dtype="float32")
+        arrays[f"pct_score_{score}"] = values.rank(pct=True).to_numpy(dtype="float32")
+        # 점수 내림차순 정렬 인덱스 (NaN은 뒤로)
+        arrays[f"order_{score}"] = np.argsort(
+            -values.fillna(-np.inf).to_numpy(), kind="stable"
+        ).astype("int32")
+
+    return arrays
+
+
+def compute_and_store(store: MarketStore, date: str, snapshot: pd.DataFrame) -> None:
+    """마감 후 훅: 팩터 배열을 계산해 스냅샷 옆에 저장"""
+    momentum = _momentum(store, date, snapshot.index)
+    arrays = compute_factor_table(snapshot, momentum)
+    np.savez(store.artifact_path(date, "factors"), **arrays)
+
+
+def register(store: MarketStore) -> None:
+    """저장소에 팩터 계산 훅 등록"""
+    store.register_post_close(compute_and_store)
+
+
+class FactorTable:
+    """저장된 팩터 배열 조회"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.arrays = arrays
+        self.tickers = arrays["tickers"]
+
+    @classmethod
+    def load(cls, store: MarketStore, date: str) -> "FactorTable":
+        path = store.artifact_path(date, "factors")
+        if not path.exists():
+            compute_and_store(store, date, store.get_snapshot(date))
+        with np.load(path, allow_pickle=False) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def mask(self, filters: List[Dict]) -> np.ndarray:
+        """백분위 필터 마스크
+
+        filters 예: [{"factor": "PBR", "max_pct": 10}, {"factor": "ROE", "min_pct": 75}]
+        factor에는 원시 지표(PER, PBR, ...) 또는 점수(value, quality, ...)를 사용합니다.
+        """
+        mask = np.ones(len(self.tickers), dtype=bool)
+        for f in filters:
+            factor = f["factor"]
+            key = f"pct_score_{factor}" if factor in SCORES else f"pct_{factor}"
+            if key not in self.arrays:
+                raise KeyError(f"알 수 없는 팩터: {factor}")
+            pct = self.arrays[key] * 100
+            if f.get("min_pct") is not None:
+                mask &= pct >= f["min_pct"]
+            if f.get("max_pct") is not None:
+                mask &= pct <= f["max_pct"]
+        return mask
+
+    def top(self, sort_by: str = "composite", filters: Optional[List[Dict]] = None,
+            limit: int = 20) -> List[int]:
+        """사전 정렬 인덱스를 따라 조건을 만족하는 상위 종목 인덱스 반환"""
+        order = self.arrays[f"order_{sort_by}"]
+        mask = self.mask(filters or [])
+        selected = order[mask[order]]
+        scores = self.arrays[f"score_{sort_by}"][selected]
+        return selected[~np.isnan(scores)][:limit].tolist()
+
+    def row(self, idx: int) -> Dict:
+        """종목 하나의 팩터 값"""
+        row = {}
+        for metric in RAW_METRICS:
+            row[metric] = _round(self.arrays[f"raw_{metric}"][idx])
+            row[f"{metric}_pct"] = _round(self.arrays[f"pct_{metric}"][idx] * 100)
+        for score in SCORES:
+            row[f"{score}_score"] = _round(self.arrays[f"score_{score}"][idx])
+        return row
+
+
+def _round(value, digits: int = 2):
+    return None if np.isnan(value) else round(float(value), digits)
@@ -0,0 +1,170 @@
+"""
+지수 디렉터리 및 구성 종목 캐시
+KRX 전 지수군(KOSPI, KOSDAQ, KRX, 테마)의 지수 코드/이름과 구성 종목,
+시가총액 비중을 로컬에 저장하고 하루 한 번만 갱신합니다. 갱신이 실패하면 기존 디렉터리를
+유지하고 REFRESH_RETRY_SECONDS 동안은 다시 조회하지 않습니다.
+"""
+
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from market_store import DEFAULT_DATA_DIR, MarketStore
+
+try:
+    import pykrx.stock as stock
+    PYKRX_AVAILABLE = True
+except ImportError:
+    PYKRX_AVAILABLE = False
+
+
+INDEX_FAMILIES = ["KOSPI", "KOSDAQ", "KRX", "테마"]
+
+# 갱신 실패 후 재시도까지 대기 시간 (초)
+REFRESH_RETRY_SECONDS = 600
+
+# 자주 쓰는 영문/약칭 별칭 (정식 지수명은 디렉터리에서 조회)
+ALIASES = {
+    "KOSPI": "1001",
+    "코스피": "1001",
+    "KOSPI200": "1028",
+    "코스피200": "1028",
+    "KOSPI100": "1034",
+    "KOSPI50": "1035",
+    "KOSDAQ": "2001",
+    "코스닥": "2001",
+    "KOSDAQ150": "2203",
+    "코스닥150": "2203",
+    "KRX100": "5042",
+    "KRX300": "5300",
+}
+
+
+class IndexDirectory:
+    """지수 코드/이름/구성 종목 디렉터리"""
+
+    def __init__(self, data_dir: Optional[Path] = None, store: Optional[MarketStore] = None):
+        self.store = store
+        base = Path(data_dir) if data_dir else (store.data_dir if store else DEFAULT_DATA_DIR)
+        base.mkdir(parents=True, exist_ok=True)
+        self.path = base / "index_directory.json"
+        self._data: Optional[Dict] = None
+        self._failed_at: Optional[float] = None  # 마지막 갱신 실패 시각 (time.monotonic)
+
+    # ------------------------------------------------------------------
+    # 로드/갱신
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _today() -> str:
+        return datetime.now().strftime("%Y%m%d")
+
+    def _load(self) -> Dict:
+        if self._data is None and self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                self._data = json.load(f)
+        if self._data is None or self._data.get("built") != self._today():
+            if self._failed_at is None or time.monotonic() - self._failed_at >= REFRESH_RETRY_SECONDS:
+                self.refresh()
+        if self._data is None:
+            # 첫 갱신이 실패했고 저장된 디렉터리도 없음 (저장하지 않고 재시도 대기)
+            self._data = {"built": None, "indices": {}, "constituents": {}}
+        return self._data
+
+    def _save(self) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, ensure_ascii=False)
+        tmp.replace(self.path)
+
+    def refresh(self) -> None:
+        """전 지수군 지수 목록 재구성 (구성 종목 캐시는 초기화)"""
+        previous = self._data
+        indices: Dict[str, Dict] = {}
+        if PYKRX_AVAILABLE:
+            for family in INDEX_FAMILIES:
+                try:
+                    codes = stock.get_index_ticker_list(market=family)
+                except Exception as e:
+                    # 도구 호출 중 실행되므로 stdout(JSON-RPC)이 아닌 stderr로 출력
+                    print(f"Failed to list {family} indices: {e}", file=sys.stderr)
+                    continue
+                for code in codes:
+                    try:
+                        name = stock.get_index_ticker_name(code)
+                    except Exception:
+                        name = code
+                    indices[code] = {"code": code, "name": name, "family": family}
+
+        if not indices:
+            # 조회 실패 시 기존 디렉터리를 유지 (빈 디렉터리를 오늘 날짜로 저장하지 않음)
+            print(f"Index directory refresh failed, retrying in {REFRESH_RETRY_SECONDS}s", file=sys.stderr)
+            self._failed_at = time.monotonic()
+            self._data = previous
+            return
+
+        self._failed_at = None
+        self._data = {"built": self._today(), "indices": indices, "constituents": {}}
+        self._save()
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def list_indices(self, family: Optional[str] = None) -> List[Dict]:
+        """지수 목록"""
+        indices = self._load()["indices"].values()
+        return [i for i in indices if family is None or i["family"] == family]
+
+    def name(self, code: str) -> str:
+        """지수 코드 -> 지수명"""
+        entry = self._load()["indices"].get(code)
+        return entry["name"] if entry else f"지수{code}"
+
+    def resolve(self, query: str) -> Optional[str]:
+        """지수 코드, 지수명, 별칭으로 지수 코드 찾기"""
+        query = query.strip()
+        indices = self._load()["indices"]
+        if query in indices:
+            return query
+
+        # 정식 지수명 > 별칭 > 부분 일치 순으로 찾기
+        normalized = query.replace(" ", "").replace("-", "").upper()
+        partial = None
+        for code, entry in indices.items():
+            name = entry["name"].replace(" ", "").upper()
+            if name == normalized:
+                return code
+            if partial is None and normalized in name:
+                partial = code
+
+        alias = ALIASES.get(normalized) or ALIASES.get(query)
+        return alias or partial
+
+    def constituents(self, code: str) -> List[str]:
+        """지수 구성 종목 (하루 한 번만 조회)"""
+        data = self._load()
+        cached = data["constituents"].get(code)
+        if cached is not None:
+            return cached
+        if not PYKRX_AVAILABLE:
+            raise RuntimeError("pykrx is not installed")
+
+        tickers = list(stock.get_index_portfolio_deposit_file(code))
+        data["constituents"][code] = tickers
+        self._save()
+        return tickers
+
+    def weights(self, code: str, date: Optional[str] = None) -> Dict[str, float]:
+        """구성 종목 시가총액 비중 (스냅샷 기준, 합계 1)"""
+        tickers = self.constituents(code)
+        if self.store is None or not tickers:
+            return {t: 1 / len(tickers) for t in tickers} if tickers else {}
+
+        snapshot = self.store.get_snapshot(date)
+        caps = snapshot["시가총액"].reindex(tickers).fillna(0).astype("float64")
+        total = caps.sum()
+        if total <= 0:
+            return {t: 1 / len(tickers) for t in tickers}
+        return (caps / total).to_dict()
@@ -0,0 +1,92 @@
+"""
+투자자별 매매 동향 데이터 계층
+종목/시장별 투자자 세부 매수·매도 금액을 한 번 조회해 로컬에 캐시하고,
+외국인/기관/개인/연기금 등 투자자 구분별 조회와 기간 합계는 캐시에서 계산합니다.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from market_store import DEFAULT_DATA_DIR
+from range_cache import RangeCache
+
+try:
+    import pykrx.stock as stock
+    PYKRX_AVAILABLE = True
+except ImportError:
+    PYKRX_AVAILABLE = False
+
+
+# get_market_trading_value_by_date(detail=True) 투자자 컬럼
+INSTITUTION_COLUMNS = ["금융투자", "보험", "투신", "사모", "은행", "기타금융", "연기금"]
+FOREIGN_COLUMNS = ["외국인", "기타외국인"]
+
+# 조회 구분 -> 투자자 컬럼
+VIEWS: Dict[str, List[str]] = {
+    "foreign": FOREIGN_COLUMNS,
+    "institutional": INSTITUTION_COLUMNS,
+    "individual": ["개인"],
+    "pension": ["연기금"],
+    "corporate": ["기타법인"],
+}
+
+VIEW_LABELS = {
+    "foreign": "외국인",
+    "institutional": "기관",
+    "individual": "개인",
+    "pension": "연기금",
+    "corporate": "기타법인",
+}
+
+SIDES = ["매수", "매도", "순매수"]
+
+
+class InvestorFlow:
+    """종목/시장별 투자자 매매 금액 캐시"""
+
+    def __init__(self, data_dir: Optional[Path] = None):
+        self.cache = RangeCache(Path(data_dir or DEFAULT_DATA_DIR) / "flows", self._fetch)
+
+    @staticmethod
+    def _fetch(target: str, start: str, end: str) -> Dict[str, pd.DataFrame]:
+        """투자자 세부 매수/매도 금액 조회 (순매수는 로컬에서 계산)"""
+        if not PYKRX_AVAILABLE:
+            raise RuntimeError("pykrx is not installed")
+        return {
+            "매수": stock.get_market_trading_value_by_date(start, end, target, on="매수", detail=True),
+            "매도": stock.get_market_trading_value_by_date(start, end, target, on="매도", detail=True),
+        }
+
+    def load(self, target: str, start: str, end: str) -> Dict[str, pd.DataFrame]:
+        """기간 투자자별 매수/매도/순매수 (날짜 x 투자자, 캐시 밖의 날짜만 조회)"""
+        frames = self.cache.load(target, start, end)
+        buy, sell = frames["매수"], frames["매도"]
+        return {"매수": buy, "매도": sell, "순매수": buy - sell}
+
+    # ------------------------------------------------------------------
+    # 조회 구분
+    # ------------------------------------------------------------------
+    def view(self, target: str, start: str, end: str, view: str) -> pd.DataFrame:
+        """투자자 구분별 일별 매수/매도/순매수 (컬럼: (구분, 투자자) + 합계)"""
+        if view not in VIEWS:
+            raise ValueError(f"지원하지 않는 투자자 구분: {view}")
+        columns = VIEWS[view]
+        frames = {}
+        for side, frame in self.load(target, start, end).items():
+            part = frame.reindex(columns=columns).fillna(0)
+            if len(columns) > 1:
+                part[f"{VIEW_LABELS[view]}합계"] = part.sum(axis=1)
+            frames[side] = part
+        return pd.concat(frames, axis=1)
+
+    def summary(self, target: str, start: str, end: str) -> pd.DataFrame:
+        """기간 합계 (행: 투자자 구분, 컬럼: 매수/매도/순매수)"""
+        sums = {side: frame.sum() for side, frame in self.load(target, start, end).items()}
+        rows = {}
+        for view, columns in VIEWS.items():
+            rows[VIEW_LABELS[view]] = {
+                side: float(sums[side].reindex(columns).fillna(0).sum()) for side in SIDES
+            }
+        return pd.DataFrame.from_dict(rows, orient="index")[SIDES]
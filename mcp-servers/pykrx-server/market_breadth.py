@@ -0,0 +1,162 @@
+"""
+시장 폭(breadth) 지표
+저장된 일별 전체 시장 스냅샷으로 상승/하락 종목 수, ADL, 52주 신고가/신저가,
+이동평균 상회 비율, 상승 거래량 비율을 계산합니다.
+장 마감마다 당일 한 행만 증분 계산해 누적 시계열에 추가합니다.
+"""
+
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from anomaly_scan import BREAKOUT_MIN_COVERAGE
+from market_store import MarketStore, SNAPSHOT_MARKETS
+
+
+BREADTH_MARKETS = ["ALL"] + SNAPSHOT_MARKETS
+HIGH_LOW_WINDOW = 252
+MA_WINDOWS = [50, 200]
+# 기간 시작일에 거래 정지였던 종목도 상장 여부를 알 수 있도록 더 읽는 거래일 수
+LISTING_MARGIN = 20
+
+BREADTH_COLUMNS = [
+    "advances", "declines", "unchanged", "net_advances", "ad_line", "ad_ratio",
+    "new_highs", "new_lows", "high_low_eligible", "pct_above_ma50", "pct_above_ma200", "up_volume_ratio",
+]
+
+
+def _breadth_path(store: MarketStore):
+    return store.data_dir / "breadth.pkl"
+
+
+def _eligible(frame: pd.DataFrame, window: int) -> pd.Series:
+    """기간 시작일 이전부터 이력이 있고 기간 내 유효 거래일이 충분한 종목 (거래 정지일 허용)"""
+    if len(frame) < window:
+        return pd.Series(False, index=frame.columns)
+    start = len(frame) - window
+    listed = frame.iloc[:start + 1].notna().any()
+    return listed & (frame.iloc[start:].count() >= BREAKOUT_MIN_COVERAGE * window)
+
+
+def compute_breadth_row(snapshot: pd.DataFrame, closes: pd.DataFrame,
+                        highs: pd.DataFrame, lows: pd.DataFrame) -> dict:
+    """한 거래일/시장에 대한 시장 폭 지표 (ADL 제외)"""
+    change = snapshot["등락률"]
+    volume = snapshot["거래량"].astype("float64")
+    traded = volume > 0
+
+    advances = int(((change > 0) & traded).sum())
+    declines = int(((change < 0) & traded).sum())
+    unchanged = int(((change == 0) & traded).sum())
+    total_volume = volume[traded].sum()
+    up_volume = volume[(change > 0) & traded].sum()
+
+    row = {
+        "advances": advances,
+        "declines": declines,
+        "unchanged": unchanged,
+        "net_advances": advances - declines,
+        "ad_ratio": advances / declines if declines else np.nan,
+        "up_volume_ratio": up_volume / total_volume if total_volume else np.nan,
+        "new_highs": 0,
+        "new_lows": 0,
+        "high_low_eligible": 0,
+    }
+
+    if len(closes) >= 2:
+        last = closes.iloc[-1]
+        prior_highs = highs.iloc[:-1].where(highs.iloc[:-1] > 0)
+        prior_lows = lows.iloc[:-1].where(lows.iloc[:-1] > 0)
+        # 이력이 기간을 덮는 종목만 집계 (저장소를 채우는 중에 신고가/신저가가 부풀지 않도록)
+        eligible = (_eligible(prior_highs, HIGH_LOW_WINDOW) & _eligible(prior_lows, HIGH_LOW_WINDOW)
+                    ).reindex(last.index, fill_value=False)
+        row["new_highs"] = int(((last > prior_highs.max()) & eligible).sum())
+        row["new_lows"] = int(((last < prior_lows.min()) & eligible).sum())
+        row["high_low_eligible"] = int(eligible.sum())
+
+    for window in MA_WINDOWS:
+        key = f"pct_above_ma{window}"
+        if len(closes) < window:
+            row[key] = np.nan
+            continue
+        # 이동평균 기간을 덮는 종목만 (며칠 전 상장한 종목의 평균을 MA200으로 보지 않도록)
+        ma = closes.iloc[-window:].mean()
+        has_ma = _eligible(closes, window) & ma.notna() & closes.iloc[-1].notna()
+        row[key] = (closes.iloc[-1][has_ma] > ma[has_ma]).mean() * 100 if has_ma.any() else np.nan
+
+    return row
+
+
+def load_breadth(store: MarketStore) -> pd.DataFrame:
+    """누적 시장 폭 시계열 로드 (인덱스: 날짜, 컬럼: market + 지표)"""
+    path = _breadth_path(store)
+    empty = pd.DataFrame(columns=["market"] + BREADTH_COLUMNS, index=pd.DatetimeIndex([]))
+    if not path.exists():
+        return empty
+    series = pd.read_pickle(path)
+    # 지표가 추가되기 전에 저장된 시계열은 전체 재계산 (ensure_breadth)
+    return series if set(BREADTH_COLUMNS) <= set(series.columns) else empty
+
+
+def compute_and_store(store: MarketStore, date: str, snapshot: pd.DataFrame) -> None:
+    """마감 후 훅: 당일 시장 폭 지표를 계산해 누적 시계열에 추가
+
+    이미 저장된 날짜를 다시 계산하거나 중간 날짜를 채우면 이후 날짜의 ADL도 순증감 차이만큼
+    함께 고칩니다.
+    """
+    lookback = max(HIGH_LOW_WINDOW, max(MA_WINDOWS)) + LISTING_MARGIN + 1
+    closes = store.load_panel("종가", end_date=date, lookback=lookback)
+    highs = store.load_panel("고가", end_date=date, lookback=HIGH_LOW_WINDOW + LISTING_MARGIN + 1)
+    lows = store.load_panel("저가", end_date=date, lookback=HIGH_LOW_WINDOW + LISTING_MARGIN + 1)
+    closes = closes.where(closes > 0)
+
+    series = load_breadth(store)
+    timestamp = pd.Timestamp(date)
+    replaced = series[series.index == timestamp]
+    series = series[series.index != timestamp].copy()
+
+    rows = []
+    for market in BREADTH_MARKETS:
+        tickers = snapshot.index if market == "ALL" else snapshot.index[snapshot["시장"] == market]
+        cols = closes.columns.intersection(tickers)
+        row = compute_breadth_row(snapshot.loc[tickers], closes[cols],
+                                  highs.reindex(columns=cols), lows.reindex(columns=cols))
+
+        previous = series[(series["market"] == market) & (series.index < timestamp)]
+        prev_ad = previous["ad_line"].iloc[-1] if len(previous) else 0
+        row["ad_line"] = prev_ad + row["net_advances"]
+        row["market"] = market
+        rows.append(row)
+
+        # 이후 날짜의 누적 ADL을 순증감 변화만큼 이동
+        old = replaced[replaced["market"] == market]
+        delta = row["net_advances"] - (old["net_advances"].iloc[-1] if len(old) else 0)
+        later = ((series["market"] == market) & (series.index > timestamp)).to_numpy()
+        if delta and later.any():
+            series.loc[later, "ad_line"] += delta
+
+    new_rows = pd.DataFrame(rows, index=[timestamp] * len(rows))[["market"] + BREADTH_COLUMNS]
+    series = pd.concat([series, new_rows]) if len(series) else new_rows
+    series = series.sort_index(kind="stable")
+    series.to_pickle(_breadth_path(store))
+
+
+def register(store: MarketStore) -> None:
+    """저장소에 시장 폭 계산 훅 등록"""
+    store.register_post_close(compute_and_store)
+
+
+def ensure_breadth(store: MarketStore, end_date: Optional[str] = None) -> pd.DataFrame:
+    """계산되지 않은 저장 스냅샷이 있으면 날짜순으로 증분 계산 후 반환"""
+    series = load_breadth(store)
+    done = set(series.index.strftime("%Y%m%d")) if len(series) else set()
+    missing: List[str] = [d for d in store.available_dates()
+                          if d not in done and (end_date is None or d <= end_date)]
+
+    # 이후 날짜의 ADL은 compute_and_store가 함께 고치므로 누락일만 계산
+    if missing:
+        for date in missing:
+            compute_and_store(store, date, store.load_snapshot(date))
+        series = load_breadth(store)
+    return series
@@ -0,0 +1,332 @@
+"""
+시장 스냅샷 로컬 저장소
+장 마감 후 전체 종목 일별 스냅샷을 한 번에 수집해 로컬에 보관하고,
+마감 후 처리(팩터 계산 등) 훅을 실행합니다.
+"""
+
+import os
+import sys
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from compact_snapshot import CATEGORY_COLUMNS, CompactSnapshot, TickerMaster
+
+try:
+    import pykrx.stock as stock
+    PYKRX_AVAILABLE = True
+except ImportError:
+    PYKRX_AVAILABLE = False
+
+
+# 로컬 데이터 저장 경로 (환경 변수로 변경 가능)
+DEFAULT_DATA_DIR = Path(os.environ.get(
+    "PYKRX_DATA_DIR",
+    Path(__file__).parent / "data"
+))
+
+# 스냅샷을 수집하는 시장
+SNAPSHOT_MARKETS = ["KOSPI", "KOSDAQ"]
+
+# 스냅샷 컬럼 순서
+SNAPSHOT_COLUMNS = [
+    "종목명", "시장", "업종명",
+    "시가", "고가", "저가", "종가", "거래량", "거래대금", "등락률",
+    "시가총액", "상장주식수",
+    "BPS", "PER", "PBR", "EPS", "DIV", "DPS"
+]
+
+# 스냅샷과 함께 수집하는 벤치마크 지수 (이름 -> 지수 코드)
+BENCHMARK_INDICES = {
+    "KOSPI": "1001",
+    "KOSDAQ": "2001",
+    "KOSPI200": "1028",
+}
+
+INDEX_COLUMNS = ["지수명", "시가", "고가", "저가", "종가", "거래량", "거래대금"]
+
+# DataFrame으로 복원해 두는 최근 스냅샷 수 (나머지는 압축 형태로만 보관)
+FRAME_CACHE_SIZE = 4
+
+# 마감 후 처리 훅: (store, date, snapshot) -> None
+PostCloseHook = Callable[["MarketStore", str, pd.DataFrame], None]
+
+
+class MarketStore:
+    """일별 전체 시장 스냅샷 저장소"""
+
+    def __init__(self, data_dir: Optional[Path] = None):
+        self.data_dir = Path(data_dir) if data_dir else DEFAULT_DATA_DIR
+        self.snapshot_dir = self.data_dir / "snapshots"
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        self.index_dir = self.data_dir / "indices"
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self._hooks: List[PostCloseHook] = []
+        self.master = TickerMaster(self.data_dir / "ticker_master.json")
+        self._cache: Dict[str, CompactSnapshot] = {}
+        self._frames: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        # 공유 스냅샷 읽기 연결 (shared_snapshot.attach, 최신 거래일을 pickle 대신 mmap에서 로드)
+        self._shared = None
+
+    # ------------------------------------------------------------------
+    # 경로
+    # ------------------------------------------------------------------
+    def snapshot_path(self, date: str) -> Path:
+        """스냅샷 파일 경로"""
+        return self.snapshot_dir / f"{date}.pkl"
+
+    def index_snapshot_path(self, date: str) -> Path:
+        """지수 스냅샷 파일 경로"""
+        return self.index_dir / f"{date}.pkl"
+
+    def artifact_path(self, date: str, name: str, suffix: str = "npz") -> Path:
+        """스냅샷 옆에 저장되는 파생 데이터 경로 (예: 20240102.factors.npz)"""
+        return self.snapshot_dir / f"{date}.{name}.{suffix}"
+
+    # ------------------------------------------------------------------
+    # 훅
+    # ------------------------------------------------------------------
+    def register_post_close(self, hook: PostCloseHook) -> None:
+        """장 마감 후 실행할 처리 함수 등록"""
+        if hook not in self._hooks:
+            self._hooks.append(hook)
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def available_dates(self) -> List[str]:
+        """저장된 스냅샷 날짜 목록 (오름차순)"""
+        return sorted(p.name.split(".")[0] for p in self.snapshot_dir.glob("*.pkl")
+                      if p.name.count(".") == 1)
+
+    def latest_date(self) -> Optional[str]:
+        """가장 최근 스냅샷 날짜"""
+        dates = self.available_dates()
+        return dates[-1] if dates else None
+
+    def has_snapshot(self, date: str) -> bool:
+        return self.snapshot_path(date).exists()
+
+    def attach_shared(self, reader) -> None:
+        """공유 스냅샷 연결 등록 (shared_snapshot.SharedSnapshot)"""
+        self._shared = reader
+
+    def _load_shared(self, date: str) -> Optional[CompactSnapshot]:
+        """공유 스냅샷이 해당 거래일이면 mmap 뷰로 구성 (아니면 None)"""
+        try:
+            self._shared.refresh()
+        except (OSError, ValueError):
+            return None
+        if not self._shared.attached or self._shared.date != date:
+            return None
+        return self._shared.to_compact(self.master)
+
+    def load_compact(self, date: str) -> CompactSnapshot:
+        """저장된 스냅샷을 압축 형태로 로드 (없으면 FileNotFoundError)"""
+        if date in self._cache:
+            return self._cache[date]
+        if self._shared is not None:
+            compact = self._load_shared(date)
+            if compact is not None:
+                self._cache[date] = compact
+                return compact
+        path = self.snapshot_path(date)
+        if not path.exists():
+            raise FileNotFoundError(f"{date} 스냅샷이 없습니다")
+        compact = CompactSnapshot.from_frame(pd.read_pickle(path), self.master)
+        self._cache[date] = compact
+        return compact
+
+    def load_snapshot(self, date: str) -> pd.DataFrame:
+        """저장된 스냅샷 DataFrame 로드 (최근 몇 개만 복원본 유지)"""
+        if date in self._frames:
+            self._frames.move_to_end(date)
+            return self._frames[date]
+        frame = self.load_compact(date).to_frame()
+        self._remember_frame(date, frame)
+        return frame
+
+    def _remember_frame(self, date: str, frame: pd.DataFrame) -> None:
+        self._frames[date] = frame
+        self._frames.move_to_end(date)
+        while len(self._frames) > FRAME_CACHE_SIZE:
+            self._frames.popitem(last=False)
+
+    def get_snapshot(self, date: Optional[str] = None) -> pd.DataFrame:
+        """스냅샷 조회. 로컬에 없으면 마감 처리를 수행해 생성합니다."""
+        date = date or self.latest_date()
+        if date is None:
+            date = self.close_session()
+        elif not self.has_snapshot(date):
+            self.close_session(date)
+        return self.load_snapshot(date)
+
+    def load_panel(self, field: str, end_date: Optional[str] = None,
+                   lookback: Optional[int] = None) -> pd.DataFrame:
+        """저장된 스냅샷에서 날짜 x 종목 패널 구성"""
+        dates = self.available_dates()
+        if end_date:
+            dates = [d for d in dates if d <= end_date]
+        if lookback:
+            dates = dates[-lookback:]
+
+        if not dates:
+            return pd.DataFrame()
+        if field == "종목명" or field in CATEGORY_COLUMNS:
+            series = {d: self.load_snapshot(d)[field] for d in dates}
+            panel = pd.DataFrame(series).T
+            panel.index = pd.to_datetime(panel.index, format="%Y%m%d")
+            return panel.sort_index()
+
+        # 압축 스냅샷의 ID 배열로 날짜 x 종목 행렬을 직접 채움
+        compacts = [self.load_compact(d) for d in dates]
+        all_ids = np.unique(np.concatenate([c.ids for c in compacts]))
+        matrix = np.full((len(dates), len(all_ids)), np.nan)
+        for row, compact in enumerate(compacts):
+            matrix[row, np.searchsorted(all_ids, compact.ids)] = compact.columns[field]
+
+        index = pd.to_datetime(pd.Index(dates), format="%Y%m%d")
+        return pd.DataFrame(matrix, index=index, columns=pd.Index(self.master.tickers[all_ids]))
+
+    def load_index_snapshot(self, date: str) -> pd.DataFrame:
+        """저장된 지수 스냅샷 로드 (없으면 빈 DataFrame)"""
+        path = self.index_snapshot_path(date)
+        if not path.exists():
+            return pd.DataFrame(columns=INDEX_COLUMNS)
+        return pd.read_pickle(path)
+
+    def load_index_panel(self, field: str, end_date: Optional[str] = None,
+                         lookback: Optional[int] = None) -> pd.DataFrame:
+        """저장된 지수 스냅샷에서 날짜 x 지수코드 패널 구성 (종목 패널과 같은 날짜 축)"""
+        dates = self.available_dates()
+        if end_date:
+            dates = [d for d in dates if d <= end_date]
+        if lookback:
+            dates = dates[-lookback:]
+
+        series = {d: self.load_index_snapshot(d)[field] for d in dates}
+        if not series:
+            return pd.DataFrame()
+        panel = pd.DataFrame(series).T
+        panel.index = pd.to_datetime(panel.index, format="%Y%m%d")
+        return panel.sort_index()
+
+    # ------------------------------------------------------------------
+    # 수집
+    # ------------------------------------------------------------------
+    def fetch_snapshot(self, date: str) -> pd.DataFrame:
+        """pykrx에서 해당일 전체 시장 스냅샷을 수집"""
+        if not PYKRX_AVAILABLE:
+            raise RuntimeError("pykrx is not installed")
+
+        frames = []
+        for market in SNAPSHOT_MARKETS:
+            ohlcv = stock.get_market_ohlcv(date, market=market)
+            if ohlcv.empty:
+                continue
+            fundamental = stock.get_market_fundamental(date, market=market)
+            cap = stock.get_market_cap(date, market=market)
+            sectors = stock.get_market_sector_classifications(date, market)
+
+            frame = ohlcv.copy()
+            frame["시가총액"] = cap.get("시가총액")
+            frame["상장주식수"] = cap.get("상장주식수")
+            frame = frame.join(fundamental, how="left")
+            frame["종목명"] = sectors.get("종목명")
+            frame["업종명"] = sectors.get("업종명")
+            frame["시장"] = market
+            frames.append(frame)
+
+        if not frames:
+            return pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+
+        snapshot = pd.concat(frames)
+        snapshot = snapshot[~snapshot.index.duplicated(keep="first")]
+        snapshot = snapshot.reindex(columns=SNAPSHOT_COLUMNS)
+        snapshot.index.name = "티커"
+        missing = snapshot["종목명"].isna()
+        if missing.any():
+            snapshot.loc[missing, "종목명"] = [
+                stock.get_market_ticker_name(t) for t in snapshot.index[missing]
+            ]
+        snapshot["업종명"] = snapshot["업종명"].fillna("기타")
+        return snapshot
+
+    def fetch_index_snapshot(self, date: str) -> pd.DataFrame:
+        """pykrx에서 해당일 벤치마크 지수 OHLCV 수집"""
+        if not PYKRX_AVAILABLE:
+            raise RuntimeError("pykrx is not installed")
+
+        rows = {}
+        for index_name, code in BENCHMARK_INDICES.items():
+            df = stock.get_index_ohlcv_by_date(date, date, code)
+            if df.empty:
+                continue
+            row = df.iloc[-1]
+            rows[code] = {"지수명": index_name, **{col: row.get(col) for col in INDEX_COLUMNS[1:]}}
+
+        frame = pd.DataFrame.from_dict(rows, orient="index").reindex(columns=INDEX_COLUMNS)
+        frame.index.name = "지수코드"
+        return frame
+
+    def close_session(self, date: Optional[str] = None) -> str:
+        """장 마감 처리: 스냅샷 수집/저장 후 등록된 훅 실행
+
+        date가 없으면 오늘부터 거슬러 올라가 가장 최근 거래일을 찾습니다.
+        처리한 거래일을 반환합니다.
+        """
+        if date is None:
+            snapshot, date = self._fetch_latest_session()
+        else:
+            snapshot = self.fetch_snapshot(date)
+            if snapshot.empty:
+                raise ValueError(f"{date}은(는) 거래일이 아니거나 데이터가 없습니다")
+
+        snapshot.to_pickle(self.snapshot_path(date))
+        self._cache[date] = CompactSnapshot.from_frame(snapshot, self.master)
+        self._remember_frame(date, snapshot)
+        self.fetch_index_snapshot(date).to_pickle(self.index_snapshot_path(date))
+
+        for hook in self._hooks:
+            try:
+                hook(self, date, snapshot)
+            except Exception as e:
+                # stdio MCP 서버 안에서도 실행되므로 stdout(JSON-RPC)이 아닌 stderr로 출력
+                print(f"Post-close hook {getattr(hook, '__name__', hook)} failed for {date}: {e}",
+                      file=sys.stderr)
+
+        return date
+
+    def _fetch_latest_session(self, max_days: int = 10):
+        """최근 거래일 스냅샷 탐색"""
+        day = datetime.now()
+        for _ in range(max_days):
+            date = day.strftime("%Y%m%d")
+            snapshot = self.fetch_snapshot(date)
+            if not snapshot.empty:
+                return snapshot, date
+            day -= timedelta(days=1)
+        raise ValueError(f"최근 {max_days}일 내 거래일 데이터를 찾을 수 없습니다")
+
+
+if __name__ == "__main__":
+    # 장 마감 후 스케줄러(cron 등)에서 실행: python market_store.py [YYYYMMDD]
+    import sys
+    import factor_ranks
+    import anomaly_scan
+    import market_breadth
+    import sector_perf
+    import shared_snapshot
+
+    store = MarketStore()
+    factor_ranks.register(store)
+    anomaly_scan.register(store)
+    market_breadth.register(store)
+    sector_perf.register(store)
+    shared_snapshot.register(store)
+    closed = store.close_session(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"Session closed: {closed}")
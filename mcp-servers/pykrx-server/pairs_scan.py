@@ -0,0 +1,207 @@
+"""
+페어 트레이딩 스캐너
+업종/바스켓 내 모든 종목 쌍에 대해 상관계수, Engle-Granger 공적분 검정,
+평균회귀 반감기를 계산합니다. 종목 쌍은 프로세스 풀에 분할하고,
+가격 행렬은 공유 메모리로 전달해 워커마다 복사하지 않습니다.
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from market_store import MarketStore
+
+
+# Engle-Granger 잔차 ADF 임계값 (MacKinnon, 변수 2개, 상수항 포함)
+EG_CRITICAL_VALUES = [("1%", -3.90), ("5%", -3.34), ("10%", -3.04)]
+
+# 이 개수 이하의 종목 쌍은 프로세스 풀 없이 현재 프로세스에서 계산
+MIN_PAIRS_FOR_POOL = 200
+
+DEFAULT_WINDOW = 120
+
+# 메모리에 유지하는 최근 스캔 결과 수 (LRU)
+MEMORY_CACHE_SIZE = 32
+# 디스크 캐시(pairs/*.pkl) 보관 기간 (일). 기준일이 지난 결과는 다시 쓰일 일이 드묾
+CACHE_RETENTION_DAYS = 7
+
+# 워커 프로세스에서 공유 메모리에 연결된 가격 행렬
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+_worker_prices: Optional[np.ndarray] = None
+
+
+def _attach_shared_prices(name: str, shape: Tuple[int, int], dtype: str) -> None:
+    """워커 초기화: 공유 메모리 가격 행렬에 읽기 전용으로 연결"""
+    global _worker_shm, _worker_prices
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    _worker_prices = np.ndarray(shape, dtype=dtype, buffer=_worker_shm.buf)
+    _worker_prices.flags.writeable = False
+
+
+def _ols(y: np.ndarray, x: np.ndarray) -> Tuple[float, float, np.ndarray, float]:
+    """단순 회귀 y = a + b*x. (a, b, 잔차, b의 표준오차) 반환"""
+    n = len(y)
+    x_mean, y_mean = x.mean(), y.mean()
+    sxx = ((x - x_mean) ** 2).sum()
+    b = ((x - x_mean) * (y - y_mean)).sum() / sxx
+    a = y_mean - b * x_mean
+    resid = y - a - b * x
+    se_b = np.sqrt((resid ** 2).sum() / (n - 2) / sxx) if n > 2 else np.nan
+    return a, b, resid, se_b
+
+
+def pair_statistics(y: np.ndarray, x: np.ndarray) -> Dict[str, float]:
+    """로그 가격 두 시계열의 공적분 통계"""
+    mask = ~(np.isnan(y) | np.isnan(x))
+    y, x = y[mask], x[mask]
+    if len(y) < 30:
+        return {"hedge_ratio": np.nan, "adf_stat": np.nan, "half_life": np.nan}
+
+    # 1단계: 공적분 회귀
+    _, hedge_ratio, spread, _ = _ols(y, x)
+
+    # 2단계: 잔차 ADF 검정 (Δe_t = a + γ e_{t-1})
+    lagged = spread[:-1]
+    delta = np.diff(spread)
+    _, gamma, _, se_gamma = _ols(delta, lagged)
+    adf_stat = gamma / se_gamma if se_gamma > 0 else np.nan
+
+    # 평균회귀 반감기
+    half_life = -np.log(2) / gamma if gamma < 0 else np.nan
+
+    return {"hedge_ratio": hedge_ratio, "adf_stat": adf_stat, "half_life": half_life}
+
+
+def _scan_shard(pairs: List[Tuple[int, int]]) -> List[Tuple[int, int, Dict[str, float]]]:
+    """워커: 공유 가격 행렬에서 종목 쌍 묶음 계산"""
+    prices = _worker_prices
+    return [(i, j, pair_statistics(prices[:, i], prices[:, j])) for i, j in pairs]
+
+
+def _significance(adf_stat: float) -> Optional[str]:
+    for level, critical in EG_CRITICAL_VALUES:
+        if adf_stat <= critical:
+            return level
+    return None
+
+
+def scan_pairs(prices: pd.DataFrame, min_corr: float = 0.0,
+               max_workers: Optional[int] = None) -> pd.DataFrame:
+    """가격 패널(날짜 x 종목)의 모든 종목 쌍 스캔"""
+    prices = prices.dropna(axis=1, thresh=max(30, int(len(prices) * 0.8)))
+    tickers = list(prices.columns)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_prices = np.log(prices.where(prices > 0).to_numpy(dtype="float64"))
+
+    # 상관계수는 수익률 기준으로 전체 행렬을 한 번에 계산
+    returns = pd.DataFrame(np.diff(log_prices, axis=0), columns=tickers)
+    corr = returns.corr(min_periods=20).to_numpy()
+
+    pairs = [(i, j) for i, j in combinations(range(len(tickers)), 2)
+             if not np.isnan(corr[i, j]) and corr[i, j] >= min_corr]
+
+    if len(pairs) <= MIN_PAIRS_FOR_POOL:
+        results = [(i, j, pair_statistics(log_prices[:, i], log_prices[:, j])) for i, j in pairs]
+    else:
+        results = _scan_in_pool(log_prices, pairs, max_workers)
+
+    rows = []
+    for i, j, stats in results:
+        rows.append({
+            "ticker_a": tickers[i],
+            "ticker_b": tickers[j],
+            "correlation": corr[i, j],
+            "hedge_ratio": stats["hedge_ratio"],
+            "adf_stat": stats["adf_stat"],
+            "significance": _significance(stats["adf_stat"]),
+            "half_life": stats["half_life"],
+        })
+    frame = pd.DataFrame(rows, columns=["ticker_a", "ticker_b", "correlation", "hedge_ratio",
+                                        "adf_stat", "significance", "half_life"])
+    return frame.sort_values("adf_stat").reset_index(drop=True)
+
+
+def _scan_in_pool(log_prices: np.ndarray, pairs: List[Tuple[int, int]],
+                  max_workers: Optional[int]) -> List[Tuple[int, int, Dict[str, float]]]:
+    """공유 메모리 + 프로세스 풀로 종목 쌍 분할 계산"""
+    max_workers = max_workers or os.cpu_count() or 1
+    shm = shared_memory.SharedMemory(create=True, size=log_prices.nbytes)
+    try:
+        shared = np.ndarray(log_prices.shape, dtype=log_prices.dtype, buffer=shm.buf)
+        shared[:] = log_prices
+
+        # 워커당 여러 묶음으로 나눠 부하 불균형 완화
+        n_shards = max_workers * 4
+        shards = [pairs[k::n_shards] for k in range(n_shards) if pairs[k::n_shards]]
+
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_attach_shared_prices,
+            initargs=(shm.name, log_prices.shape, log_prices.dtype.str),
+        ) as pool:
+            results = []
+            for shard_result in pool.map(_scan_shard, shards):
+                results.extend(shard_result)
+        return results
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+class PairsScanner:
+    """바스켓/기간별 결과를 캐시하는 페어 스캐너"""
+
+    def __init__(self, store: MarketStore, max_workers: Optional[int] = None):
+        self.store = store
+        self.max_workers = max_workers
+        self.cache_dir = store.data_dir / "pairs"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._memory: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._prune_files()
+
+    def _cache_key(self, tickers: List[str], window: int, end_date: str, min_corr: float) -> str:
+        payload = json.dumps([sorted(tickers), window, end_date, min_corr])
+        return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+    def scan(self, tickers: List[str], window: int = DEFAULT_WINDOW,
+             end_date: Optional[str] = None, min_corr: float = 0.0) -> pd.DataFrame:
+        """종목 바스켓 페어 스캔 (동일 바스켓/기간/기준일은 캐시 사용)"""
+        end_date = end_date or self.store.latest_date()
+        key = self._cache_key(tickers, window, end_date, min_corr)
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+
+        path = self.cache_dir / f"{key}.pkl"
+        if path.exists():
+            frame = pd.read_pickle(path)
+        else:
+            prices = self.store.load_panel("종가", end_date=end_date, lookback=window)
+            prices = prices.reindex(columns=[t for t in tickers if t in prices.columns])
+            frame = scan_pairs(prices, min_corr=min_corr, max_workers=self.max_workers)
+            frame.to_pickle(path)
+            self._prune_files()
+
+        self._memory[key] = frame
+        while len(self._memory) > MEMORY_CACHE_SIZE:
+            self._memory.popitem(last=False)
+        return frame
+
+    def _prune_files(self) -> None:
+        """보관 기간이 지난 디스크 캐시 파일 삭제"""
+        cutoff = time.time() - CACHE_RETENTION_DAYS * 86400
+        for path in self.cache_dir.glob("*.pkl"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                continue
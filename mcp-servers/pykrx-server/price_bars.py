@@ -0,0 +1,96 @@
+"""
+일봉 캐시 및 기간 리샘플링
+종목 일봉만 조회/저장하고 주봉, 월봉, 분기봉, 연봉, N거래일봉은
+캐시된 일봉에서 벡터 연산으로 집계합니다.
+"""
+
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from market_store import DEFAULT_DATA_DIR
+from range_cache import RangeCache
+
+try:
+    import pykrx.stock as stock
+    PYKRX_AVAILABLE = True
+except ImportError:
+    PYKRX_AVAILABLE = False
+
+
+# 기간 단위 -> pandas Period 빈도
+PERIOD_FREQ = {
+    "week": "W-FRI",
+    "month": "M",
+    "quarter": "Q",
+    "year": "Y",
+}
+PERIODS = ["day"] + list(PERIOD_FREQ) + ["custom"]
+
+# 컬럼별 집계 방법 (등락률은 일별 등락률을 복리 누적)
+AGGREGATIONS = {
+    "시가": "first",
+    "고가": "max",
+    "저가": "min",
+    "종가": "last",
+    "거래량": "sum",
+    "거래대금": "sum",
+}
+
+
+def resample_ohlcv(daily: pd.DataFrame, period: str, bars: Optional[int] = None) -> pd.DataFrame:
+    """일봉을 기간봉으로 집계 (인덱스: 각 구간의 마지막 거래일)
+
+    period가 'custom'이면 bars 거래일씩 묶습니다.
+    """
+    if period == "day" or daily.empty:
+        return daily
+
+    if period == "custom":
+        if not bars or bars < 1:
+            raise ValueError("custom 기간은 bars(거래일 수)가 필요합니다")
+        # 최신 거래일부터 거꾸로 bars일씩 묶어 모자라는 구간은 가장 오래된 봉이 되도록
+        # (키를 음수로 바꿔 시간 순 정렬 유지)
+        n = len(daily)
+        keys = -((n - 1 - np.arange(n)) // bars)
+    elif period in PERIOD_FREQ:
+        keys = daily.index.to_period(PERIOD_FREQ[period])
+    else:
+        raise ValueError(f"지원하지 않는 기간 단위: {period}")
+
+    columns = {col: agg for col, agg in AGGREGATIONS.items() if col in daily.columns}
+    grouped = daily.groupby(keys, sort=True)
+    bars_frame = grouped.agg(columns)
+
+    if "등락률" in daily.columns:
+        # 일별 등락률을 복리로 누적하면 첫 구간도 직전 종가 기준으로 계산됨
+        log_returns = np.log1p(daily["등락률"].astype("float64") / 100)
+        bars_frame["등락률"] = np.expm1(log_returns.groupby(keys, sort=True).sum()) * 100
+
+    last_dates = daily.index.to_series().groupby(keys, sort=True).max()
+    bars_frame.index = pd.DatetimeIndex(last_dates.to_numpy(), name=daily.index.name)
+    return bars_frame[[col for col in daily.columns if col in bars_frame.columns]]
+
+
+class PriceBars:
+    """종목 일봉 캐시"""
+
+    def __init__(self, data_dir: Optional[Path] = None):
+        self.cache = RangeCache(Path(data_dir or DEFAULT_DATA_DIR) / "bars", self._fetch)
+
+    @staticmethod
+    def _fetch(ticker: str, start: str, end: str):
+        if not PYKRX_AVAILABLE:
+            raise RuntimeError("pykrx is not installed")
+        return {"ohlcv": stock.get_market_ohlcv_by_date(start, end, ticker)}
+
+    def daily(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+        """기간 일봉 (캐시 밖의 날짜만 조회)"""
+        return self.cache.load(ticker, start, end)["ohlcv"]
+
+    def bars(self, ticker: str, start: str, end: str, period: str = "day",
+             bars: Optional[int] = None) -> pd.DataFrame:
+        """기간봉 조회 (일봉 외에는 로컬 리샘플링)"""
+        return resample_ohlcv(self.daily(ticker, start, end), period, bars)
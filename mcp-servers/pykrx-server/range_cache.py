@@ -0,0 +1,86 @@
+"""
+날짜 구간 캐시
+키(종목/시장)별로 조회한 날짜 구간을 기록해 두고, 요청 구간 중 캐시 밖의 날짜만
+추가로 조회해 병합합니다. 일별 시세, 투자자 매매 동향 등 기간 조회 데이터에 사용합니다.
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+
+# (key, start, end) -> {이름: 날짜 인덱스 DataFrame}
+RangeFetcher = Callable[[str, str, str], Dict[str, pd.DataFrame]]
+
+
+def shift_date(date: str, days: int) -> str:
+    """YYYYMMDD 날짜를 days만큼 이동"""
+    return (datetime.strptime(date, "%Y%m%d") + timedelta(days=days)).strftime("%Y%m%d")
+
+
+class RangeCache:
+    """키별 날짜 구간 캐시 (메모리 + 디스크)"""
+
+    def __init__(self, cache_dir: Path, fetch: RangeFetcher):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.fetch = fetch
+        self._memory: Dict[str, Dict] = {}
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def _entry(self, key: str) -> Optional[Dict]:
+        if key not in self._memory and self._path(key).exists():
+            self._memory[key] = pd.read_pickle(self._path(key))
+        return self._memory.get(key)
+
+    def _missing(self, entry: Optional[Dict], start: str, end: str) -> List[Tuple[str, str]]:
+        if entry is None:
+            return [(start, end)]
+        pieces = []
+        if start < entry["start"]:
+            pieces.append((start, shift_date(entry["start"], -1)))
+        if end > entry["end"]:
+            pieces.append((shift_date(entry["end"], 1), end))
+        return pieces
+
+    def load(self, key: str, start: str, end: str) -> Dict[str, pd.DataFrame]:
+        """요청 구간 데이터 (캐시 밖의 날짜만 조회)
+
+        오늘 날짜는 장중 값이 바뀔 수 있어 캐시 구간에 포함하지 않습니다.
+        """
+        entry = self._entry(key)
+        pieces = self._missing(entry, start, end)
+
+        if pieces:
+            parts: Dict[str, List[pd.DataFrame]] = {
+                name: [frame] for name, frame in (entry["frames"].items() if entry else [])
+            }
+            for lo, hi in pieces:
+                for name, frame in self.fetch(key, lo, hi).items():
+                    parts.setdefault(name, []).append(frame)
+
+            frames = {}
+            for name, pieces_of_frame in parts.items():
+                non_empty = [f for f in pieces_of_frame if not f.empty]
+                frame = pd.concat(non_empty) if non_empty else pieces_of_frame[0]
+                frames[name] = frame[~frame.index.duplicated(keep="last")].sort_index()
+
+            yesterday = shift_date(datetime.now().strftime("%Y%m%d"), -1)
+            entry = {
+                "start": min(start, entry["start"]) if entry else start,
+                "end": min(max(end, entry["end"]) if entry else end, yesterday),
+                "frames": frames,
+            }
+            if entry["start"] <= entry["end"]:
+                pd.to_pickle(entry, self._path(key))
+            self._memory[key] = entry
+
+        lo, hi = pd.Timestamp(start), pd.Timestamp(end)
+        return {
+            name: frame if frame.empty else frame.loc[lo:hi]
+            for name, frame in entry["frames"].items()
+        }
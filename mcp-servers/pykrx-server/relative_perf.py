@@ -0,0 +1,119 @@
+"""
+지수 대비 성과 분석
+정렬된 종목/지수 수익률 행렬에서 전 종목의 롤링 베타, 알파,
+추적오차, 상대강도를 종목별 회귀 없이 한 번의 행렬 연산으로 계산합니다.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from index_directory import IndexDirectory
+from market_store import BENCHMARK_INDICES, MarketStore
+
+
+TRADING_DAYS = 252
+DEFAULT_WINDOW = 60
+
+STAT_COLUMNS = ["beta", "alpha", "tracking_error", "relative_strength", "correlation", "observations"]
+
+
+def _rolling_sum(matrix: np.ndarray, window: int) -> np.ndarray:
+    """누적합 차분으로 모든 시점의 window 합계 계산"""
+    cum = np.cumsum(matrix, axis=0)
+    out = cum.copy()
+    out[window:] = cum[window:] - cum[:-window]
+    return out
+
+
+def rolling_relative_stats(stock_returns: pd.DataFrame, bench_returns: pd.Series,
+                           window: int = DEFAULT_WINDOW) -> Dict[str, pd.DataFrame]:
+    """전 종목 롤링 베타/알파/추적오차/상대강도 (날짜 x 종목 행렬)
+
+    결측 수익률은 해당 종목의 관측치에서만 제외되며, 지수 쪽 합계도
+    종목별 유효 관측치 기준으로 계산합니다.
+    """
+    bench = bench_returns.reindex(stock_returns.index)
+    x = stock_returns.to_numpy(dtype="float64")
+    m = np.broadcast_to(bench.to_numpy(dtype="float64")[:, None], x.shape)
+
+    valid = ~(np.isnan(x) | np.isnan(m))
+    x0 = np.where(valid, x, 0.0)
+    m0 = np.where(valid, m, 0.0)
+
+    n = _rolling_sum(valid.astype("float64"), window)
+    sx = _rolling_sum(x0, window)
+    sm = _rolling_sum(m0, window)
+    sxm = _rolling_sum(x0 * m0, window)
+    smm = _rolling_sum(m0 * m0, window)
+    sxx = _rolling_sum(x0 * x0, window)
+    # 상대강도용 로그 수익률 합계
+    lx = _rolling_sum(np.where(valid, np.log1p(x0), 0.0), window)
+    lm = _rolling_sum(np.where(valid, np.log1p(m0), 0.0), window)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxm / n - (sx / n) * (sm / n)
+        var_m = smm / n - (sm / n) ** 2
+        var_x = sxx / n - (sx / n) ** 2
+        beta = cov / var_m
+        alpha = (sx / n - beta * sm / n) * TRADING_DAYS
+        # 추적오차: 초과수익률(x - m)의 표준편차
+        diff_mean = (sx - sm) / n
+        diff_sq = (sxx - 2 * sxm + smm) / n
+        tracking_error = np.sqrt(np.maximum(diff_sq - diff_mean ** 2, 0) * n / (n - 1)) * np.sqrt(TRADING_DAYS)
+        relative_strength = np.exp(lx - lm) - 1
+        correlation = cov / np.sqrt(var_x * var_m)
+
+    insufficient = n < max(2, window // 2)
+    stats = {
+        "beta": beta,
+        "alpha": alpha,
+        "tracking_error": tracking_error,
+        "relative_strength": relative_strength,
+        "correlation": correlation,
+        "observations": n,
+    }
+    frames = {}
+    for name, values in stats.items():
+        values = np.where(insufficient, np.nan, values) if name != "observations" else values
+        frames[name] = pd.DataFrame(values, index=stock_returns.index, columns=stock_returns.columns)
+    return frames
+
+
+class RelativePerformance:
+    """로컬 저장소 기반 지수 대비 성과 계산기"""
+
+    def __init__(self, store: MarketStore, directory: Optional[IndexDirectory] = None):
+        self.store = store
+        self.directory = directory or IndexDirectory(store=store)
+
+    def constituents(self, index_name: str, snapshot: pd.DataFrame) -> List[str]:
+        """벤치마크 지수 구성 종목"""
+        if index_name in ("KOSPI", "KOSDAQ"):
+            return snapshot.index[snapshot["시장"] == index_name].tolist()
+        tickers = self.directory.constituents(BENCHMARK_INDICES[index_name])
+        return [t for t in tickers if t in snapshot.index]
+
+    def compute(self, index_name: str, end_date: str, window: int = DEFAULT_WINDOW,
+                tickers: Optional[List[str]] = None, history: int = 1) -> Dict[str, pd.DataFrame]:
+        """구성 종목 전체의 지수 대비 통계 (마지막 history 거래일분)"""
+        if index_name not in BENCHMARK_INDICES:
+            raise ValueError(f"지원하지 않는 벤치마크 지수: {index_name}")
+
+        snapshot = self.store.get_snapshot(end_date)
+        universe = tickers or self.constituents(index_name, snapshot)
+
+        lookback = window + history
+        closes = self.store.load_panel("종가", end_date=end_date, lookback=lookback)
+        closes = closes.reindex(columns=universe)
+        bench = self.store.load_index_panel("종가", end_date=end_date, lookback=lookback)
+        code = BENCHMARK_INDICES[index_name]
+        if code not in bench.columns:
+            raise ValueError(f"{index_name} 지수 이력이 로컬 저장소에 없습니다")
+
+        stock_returns = closes.where(closes > 0).pct_change(fill_method=None).iloc[1:]
+        bench_returns = bench[code].astype("float64").pct_change(fill_method=None).iloc[1:]
+
+        frames = rolling_relative_stats(stock_returns, bench_returns, window)
+        return {name: frame.iloc[-history:] for name, frame in frames.items()}
@@ -0,0 +1,173 @@
+"""
+업종 지수 성과
+시장별 전체 업종 지수를 기간 등락률 한 번의 조회로 수집해 로컬 지수 저장소에
+보관하고, 저장된 일별 업종 지수로 1D/1W/1M/3M/YTD 수익률을 계산합니다.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from market_store import MarketStore, SNAPSHOT_MARKETS
+
+try:
+    import pykrx.stock as stock
+    PYKRX_AVAILABLE = True
+except ImportError:
+    PYKRX_AVAILABLE = False
+
+
+SECTOR_COLUMNS = ["시장", "시가", "종가", "등락률", "거래량", "거래대금"]
+
+# 기간 수익률 (기간명 -> 거래일 수, YTD는 전년도 마지막 거래일 기준)
+PERIODS = {"1D": 1, "1W": 5, "1M": 21, "3M": 63}
+PERIOD_NAMES = list(PERIODS) + ["YTD"]
+
+# 기준 스냅샷 날짜 허용 오차 (평일 수). 휴장일을 구분하지 않으므로 연휴 길이만큼 여유를 두고,
+# 저장소에 빠진 날이 더 많으면 기간이 늘어난 것으로 보고 기간 등락률을 조회
+BASE_DATE_TOLERANCE = 3
+
+
+def _sector_path(store: MarketStore, date: str) -> Path:
+    return store.index_dir / f"{date}.sectors.pkl"
+
+
+def available_sector_dates(store: MarketStore) -> List[str]:
+    """저장된 업종 지수 스냅샷 날짜 목록 (오름차순)"""
+    return sorted(p.name.split(".")[0] for p in store.index_dir.glob("*.sectors.pkl"))
+
+
+def fetch_sector_snapshot(fromdate: str, todate: str) -> pd.DataFrame:
+    """시장별 전체 업종 지수 기간 등락 (시장당 한 번 조회)"""
+    if not PYKRX_AVAILABLE:
+        raise RuntimeError("pykrx is not installed")
+
+    frames = []
+    for market in SNAPSHOT_MARKETS:
+        df = stock.get_index_price_change(fromdate, todate, market)
+        if df.empty:
+            continue
+        df = df.copy()
+        df["시장"] = market
+        frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(columns=SECTOR_COLUMNS)
+    frame = pd.concat(frames).reindex(columns=SECTOR_COLUMNS)
+    frame.index.name = "지수명"
+    return frame
+
+
+def compute_and_store(store: MarketStore, date: str, snapshot: pd.DataFrame) -> None:
+    """마감 후 훅: 당일 전체 업종 지수 스냅샷 저장"""
+    sectors = fetch_sector_snapshot(date, date)
+    if not sectors.empty:
+        sectors.to_pickle(_sector_path(store, date))
+
+
+def register(store: MarketStore) -> None:
+    """저장소에 업종 지수 수집 훅 등록"""
+    store.register_post_close(compute_and_store)
+
+
+def load_sector_snapshot(store: MarketStore, date: str) -> pd.DataFrame:
+    """해당일 업종 지수 스냅샷 (로컬에 없으면 수집 후 저장)"""
+    path = _sector_path(store, date)
+    if path.exists():
+        return pd.read_pickle(path)
+    sectors = fetch_sector_snapshot(date, date)
+    if not sectors.empty:
+        sectors.to_pickle(path)
+    return sectors
+
+
+def load_sector_panel(store: MarketStore, market: str, end_date: str,
+                      lookback: Optional[int] = None) -> pd.DataFrame:
+    """저장된 업종 지수 종가 패널 (날짜 x 지수명)"""
+    dates = [d for d in available_sector_dates(store) if d <= end_date]
+    if lookback:
+        dates = dates[-lookback:]
+
+    series = {}
+    for d in dates:
+        frame = pd.read_pickle(_sector_path(store, d))
+        series[d] = frame.loc[frame["시장"] == market, "종가"]
+    if not series:
+        return pd.DataFrame()
+    panel = pd.DataFrame(series).T.astype("float64")
+    panel.index = pd.to_datetime(panel.index, format="%Y%m%d")
+    return panel.sort_index()
+
+
+def sector_performance(store: MarketStore, date: str, market: str = "KOSPI") -> pd.DataFrame:
+    """전 업종 기간별 수익률(%)
+
+    기간 시작점이 로컬 저장소에 없으면 해당 기간 등락률을 시장당 한 번 조회해 보충합니다.
+    """
+    today = load_sector_snapshot(store, date)
+    today = today[today["시장"] == market]
+    if today.empty:
+        return pd.DataFrame(columns=["종가", "거래대금"] + PERIOD_NAMES)
+
+    result = pd.DataFrame({
+        "종가": today["종가"].astype("float64"),
+        "거래대금": today["거래대금"],
+    })
+
+    panel = load_sector_panel(store, market, date, lookback=max(PERIODS.values()) + 1)
+    closes = panel.reindex(columns=result.index)
+    history = closes[closes.index < pd.Timestamp(date)]
+
+    # 저장된 스냅샷으로 N거래일 전 종가를 찾되, 그 날짜가 실제로 N거래일 전 근처일 때만 사용
+    starts: Dict[str, Optional[pd.Series]] = {}
+    for name, days in PERIODS.items():
+        starts[name] = None
+        if len(history) >= days:
+            base_date = history.index[-days]
+            if _weekdays_between(base_date, date) <= days + BASE_DATE_TOLERANCE:
+                starts[name] = history.iloc[-days]
+
+    # YTD: 전년도 마지막 거래일 종가 기준 (연말 근처의 전년도 스냅샷만 사용)
+    year_end = f"{int(date[:4]) - 1}1231"
+    ytd_panel = load_sector_panel(store, market, year_end, lookback=1)
+    starts["YTD"] = None
+    if len(ytd_panel):
+        base_date = ytd_panel.index[-1]
+        if base_date.year == int(date[:4]) - 1 and _weekdays_between(base_date, year_end) <= BASE_DATE_TOLERANCE:
+            starts["YTD"] = ytd_panel.reindex(columns=result.index).iloc[-1]
+
+    for name, base in starts.items():
+        if base is not None:
+            result[name] = (result["종가"] / base - 1) * 100
+        else:
+            result[name] = _fetch_period_change(store, name, date, market).reindex(result.index)
+
+    return result[["종가", "거래대금"] + PERIOD_NAMES].sort_values("1D", ascending=False)
+
+
+def _weekdays_between(start, end) -> int:
+    """start 다음 날부터 end까지의 평일 수 (휴장일 미구분)"""
+    return int(np.busday_count(pd.Timestamp(start).date(), pd.Timestamp(end).date()))
+
+
+def _period_start(store: MarketStore, period: str, date: str) -> str:
+    """기간 수익률의 기준일 (저장된 거래일 목록이 있으면 거래일 기준)"""
+    if period == "YTD":
+        return f"{int(date[:4]) - 1}1231"
+    days = PERIODS[period]
+    dates = [d for d in store.available_dates() if d <= date]
+    if len(dates) > days:
+        return dates[-days - 1]
+    # 거래일 수를 달력일로 넉넉하게 환산
+    start = pd.Timestamp(date) - pd.Timedelta(days=int(days * 7 / 5) + 1)
+    return start.strftime("%Y%m%d")
+
+
+def _fetch_period_change(store: MarketStore, period: str, date: str, market: str) -> pd.Series:
+    """로컬 이력이 부족한 기간의 전 업종 등락률을 한 번에 조회"""
+    if not PYKRX_AVAILABLE:
+        return pd.Series(dtype="float64")
+    df = stock.get_index_price_change(_period_start(store, period, date), date, market)
+    return df["등락률"].astype("float64") if not df.empty else pd.Series(dtype="float64")
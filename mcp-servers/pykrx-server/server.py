@@ -33,10 +33,36 @@ import mcp.types as types
 from mcp.server.session import ServerSession
 from mcp.server.stdio import stdio_server
 
+from market_store import MarketStore
+import factor_ranks
+import anomaly_scan
+import pairs_scan
+import relative_perf
+import market_breadth
+import sector_perf
+import investor_flow
+import price_bars
+import shared_snapshot
+from market_store import BENCHMARK_INDICES
+from index_directory import INDEX_FAMILIES, IndexDirectory
+
 
 class PyKRXMCPServer:
     def __init__(self):
         self.server = Server("pykrx-server")
+        self.store = MarketStore()
+        factor_ranks.register(self.store)
+        anomaly_scan.register(self.store)
+        market_breadth.register(self.store)
+        sector_perf.register(self.store)
+        shared_snapshot.register(self.store)
+        # 다른 워커가 게시한 최신 거래일 스냅샷은 mmap으로 연결해 pickle 로드/압축을 생략
+        self.shared_snapshot = shared_snapshot.attach(self.store)
+        self.index_directory = IndexDirectory(store=self.store)
+        self.investor_flow = investor_flow.InvestorFlow(self.store.data_dir)
+        self.price_bars = price_bars.PriceBars(self.store.data_dir)
+        self.pairs_scanner = pairs_scan.PairsScanner(self.store)
+        self.relative_perf = relative_perf.RelativePerformance(self.store, self.index_directory)
         self.setup_handlers()
     
     def setup_handlers(self):
@@ -62,7 +88,7 @@ class PyKRXMCPServer:
                 ),
                 Tool(
                     name="get_stock_prices",
-                    description="종목 가격 정보 조회 (일별, 주별, 월별)",
+                    description="종목 가격 정보 조회 (일별, 주별, 월별, 분기별, 연별, N거래일별)",
                     inputSchema={
                         "type": "object",
                         "properties": {
@@ -80,9 +106,13 @@ class PyKRXMCPServer:
                             },
                             "period": {
                                 "type": "string",
-                                "enum": ["day", "week", "month"],
+                                "enum": price_bars.PERIODS,
                                 "description": "조회 기간 단위",
                                 "default": "day"
+                            },
+                            "bars": {
+                                "type": "integer",
+                                "description": "period가 custom일 때 묶을 거래일 수"
                             }
                         },
                         "required": ["ticker", "start_date", "end_date"]
@@ -128,7 +158,7 @@ class PyKRXMCPServer:
                 ),
                 Tool(
                     name="get_sector_performance",
-                    description="업종별 성과 조회",
+                    description="업종별 성과 조회 (전 업종 지수, 1D/1W/1M/3M/YTD 수익률)",
                     inputSchema={
                         "type": "object",
                         "properties": {
@@ -154,7 +184,7 @@ class PyKRXMCPServer:
                         "properties": {
                             "index_name": {
                                 "type": "string",
-                                "description": "지수명 (KOSPI, KOSDAQ, KRX100 등)"
+                                "description": "지수명 또는 지수 코드 (KOSPI, KOSDAQ, 코스피 200, KRX 300, 1028 등)"
                             },
                             "start_date": {
                                 "type": "string",
@@ -178,6 +208,12 @@ class PyKRXMCPServer:
                                 "type": "string",
                                 "description": "종목 코드 (선택사항)"
                             },
+                            "market": {
+                                "type": "string",
+                                "enum": ["KOSPI", "KOSDAQ", "ALL"],
+                                "description": "ticker가 없을 때 조회할 시장",
+                                "default": "KOSPI"
+                            },
                             "start_date": {
                                 "type": "string",
                                 "description": "시작일 (YYYYMMDD 형식)"
@@ -200,6 +236,12 @@ class PyKRXMCPServer:
                                 "type": "string",
                                 "description": "종목 코드 (선택사항)"
                             },
+                            "market": {
+                                "type": "string",
+                                "enum": ["KOSPI", "KOSDAQ", "ALL"],
+                                "description": "ticker가 없을 때 조회할 시장",
+                                "default": "KOSPI"
+                            },
                             "start_date": {
                                 "type": "string",
                                 "description": "시작일 (YYYYMMDD 형식)"
@@ -309,6 +351,261 @@ class PyKRXMCPServer:
                         "required": ["name"]
                     }
                 ),
+                Tool(
+                    name="rank_stocks_by_factors",
+                    description="팩터 백분위/종합 점수 기반 종목 순위 조회 (예: PBR 하위 10% & ROE 상위 25%)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "date": {
+                                "type": "string",
+                                "description": "조회일 (YYYYMMDD 형식, 선택사항 - 기본값: 최근 저장된 거래일)"
+                            },
+                            "filters": {
+                                "type": "array",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "factor": {
+                                            "type": "string",
+                                            "enum": factor_ranks.RAW_METRICS + factor_ranks.SCORES
+                                        },
+                                        "min_pct": {"type": "number"},
+                                        "max_pct": {"type": "number"}
+                                    },
+                                    "required": ["factor"]
+                                },
+                                "description": "백분위 조건 (0~100, 값이 작을수록 낮은 백분위)"
+                            },
+                            "sort_by": {
+                                "type": "string",
+                                "enum": factor_ranks.SCORES,
+                                "description": "정렬 기준 종합 점수",
+                                "default": "composite"
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "반환할 최대 종목 수",
+                                "default": 20
+                            }
+                        }
+                    }
+                ),
+                Tool(
+                    name="scan_market_anomalies",
+                    description="전체 시장 이상 징후 스캔 (거래량 급증, 급등락, 갭 상승/하락, 52주 신고가/신저가)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "kind": {
+                                "type": "string",
+                                "enum": anomaly_scan.ANOMALY_KINDS + ["all"],
+                                "description": "이상 징후 유형",
+                                "default": "volume_spike"
+                            },
+                            "date": {
+                                "type": "string",
+                                "description": "조회일 (YYYYMMDD 형식, 선택사항 - 기본값: 최근 저장된 거래일)"
+                            },
+                            "market": {
+                                "type": "string",
+                                "enum": ["KOSPI", "KOSDAQ", "ALL"],
+                                "description": "시장 구분",
+                                "default": "ALL"
+                            },
+                            "z_threshold": {
+                                "type": "number",
+                                "description": "거래량/수익률 z-score 기준값",
+                                "default": 3.0
+                            },
+                            "gap_threshold": {
+                                "type": "number",
+                                "description": "갭 기준값 (%)",
+                                "default": 3.0
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "유형별 반환할 최대 종목 수",
+                                "default": 20
+                            }
+                        }
+                    }
+                ),
+                Tool(
+                    name="scan_pairs",
+                    description="업종/바스켓 내 페어 트레이딩 후보 스캔 (상관계수, Engle-Granger 공적분, 평균회귀 반감기)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "sector": {
+                                "type": "string",
+                                "description": "업종명 (예: '전기전자'). tickers가 없으면 필수"
+                            },
+                            "tickers": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "직접 지정한 종목 코드 바스켓 (선택사항)"
+                            },
+                            "window": {
+                                "type": "integer",
+                                "description": "분석 기간 (거래일 수)",
+                                "default": pairs_scan.DEFAULT_WINDOW
+                            },
+                            "end_date": {
+                                "type": "string",
+                                "description": "기준일 (YYYYMMDD 형식, 선택사항 - 기본값: 최근 저장된 거래일)"
+                            },
+                            "min_corr": {
+                                "type": "number",
+                                "description": "최소 수익률 상관계수",
+                                "default": 0.5
+                            },
+                            "only_cointegrated": {
+                                "type": "boolean",
+                                "description": "10% 수준에서 공적분인 쌍만 반환",
+                                "default": True
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "반환할 최대 종목 쌍 수",
+                                "default": 20
+                            }
+                        }
+                    }
+                ),
+                Tool(
+                    name="get_relative_performance",
+                    description="지수 대비 성과 조회 (구성 종목 전체의 롤링 베타, 알파, 추적오차, 상대강도)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "index_name": {
+                                "type": "string",
+                                "enum": list(BENCHMARK_INDICES),
+                                "description": "벤치마크 지수",
+                                "default": "KOSPI"
+                            },
+                            "window": {
+                                "type": "integer",
+                                "description": "롤링 기간 (거래일 수)",
+                                "default": relative_perf.DEFAULT_WINDOW
+                            },
+                            "end_date": {
+                                "type": "string",
+                                "description": "기준일 (YYYYMMDD 형식, 선택사항 - 기본값: 최근 저장된 거래일)"
+                            },
+                            "tickers": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "특정 종목만 조회 (선택사항, 지정 시 롤링 이력 포함)"
+                            },
+                            "sector": {
+                                "type": "string",
+                                "description": "업종명으로 종목 제한 (선택사항)"
+                            },
+                            "sort_by": {
+                                "type": "string",
+                                "enum": ["beta", "alpha", "tracking_error", "relative_strength"],
+                                "description": "정렬 기준 (내림차순)",
+                                "default": "relative_strength"
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "반환할 최대 종목 수",
+                                "default": 20
+                            }
+                        }
+                    }
+                ),
+                Tool(
+                    name="get_market_breadth",
+                    description="시장 폭 지표 조회 (상승/하락 종목 수, ADL, 신고가/신저가, 이동평균 상회 비율, 상승 거래량 비율)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "market": {
+                                "type": "string",
+                                "enum": market_breadth.BREADTH_MARKETS,
+                                "description": "시장 구분",
+                                "default": "ALL"
+                            },
+                            "start_date": {
+                                "type": "string",
+                                "description": "시작일 (YYYYMMDD 형식, 선택사항)"
+                            },
+                            "end_date": {
+                                "type": "string",
+                                "description": "종료일 (YYYYMMDD 형식, 선택사항 - 기본값: 최근 저장된 거래일)"
+                            },
+                            "days": {
+                                "type": "integer",
+                                "description": "start_date가 없을 때 반환할 최근 거래일 수",
+                                "default": 20
+                            }
+                        }
+                    }
+                ),
+                Tool(
+                    name="get_index_constituents",
+                    description="KRX 지수 디렉터리 조회 (지수 목록, 지수 구성 종목 및 시가총액 비중)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "index_name": {
+                                "type": "string",
+                                "description": "지수명 또는 지수 코드 (없으면 지수 목록 반환)"
+                            },
+                            "family": {
+                                "type": "string",
+                                "enum": INDEX_FAMILIES,
+                                "description": "지수 목록 조회 시 지수군 필터 (선택사항)"
+                            },
+                            "date": {
+                                "type": "string",
+                                "description": "비중 계산 기준일 (YYYYMMDD 형식, 선택사항 - 기본값: 최근 저장된 거래일)"
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "반환할 구성 종목 수 (비중 상위순)",
+                                "default": 50
+                            }
+                        }
+                    }
+                ),
+                Tool(
+                    name="get_investor_flow",
+                    description="투자자별 매매 동향 조회 (외국인/기관/개인/연기금/기타법인 일별 매수·매도·순매수 및 기간 합계)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "ticker": {
+                                "type": "string",
+                                "description": "종목 코드 (선택사항)"
+                            },
+                            "market": {
+                                "type": "string",
+                                "enum": ["KOSPI", "KOSDAQ", "ALL"],
+                                "description": "ticker가 없을 때 조회할 시장",
+                                "default": "KOSPI"
+                            },
+                            "view": {
+                                "type": "string",
+                                "enum": list(investor_flow.VIEWS) + ["summary"],
+                                "description": "투자자 구분 (summary는 전 구분 기간 합계)",
+                                "default": "summary"
+                            },
+                            "start_date": {
+                                "type": "string",
+                                "description": "시작일 (YYYYMMDD 형식)"
+                            },
+                            "end_date": {
+                                "type": "string",
+                                "description": "종료일 (YYYYMMDD 형식)"
+                            }
+                        },
+                        "required": ["start_date", "end_date"]
+                    }
+                ),
                 Tool(
                     name="get_market_news",
                     description="시장 뉴스 및 리스크 분석 조회",
@@ -367,6 +664,20 @@ class PyKRXMCPServer:
                     return await self.filter_stocks_by_fundamentals(arguments)
                 elif name == "get_market_news":
                     return await self.get_market_news(arguments)
+                elif name == "rank_stocks_by_factors":
+                    return await self.rank_stocks_by_factors(arguments)
+                elif name == "scan_market_anomalies":
+                    return await self.scan_market_anomalies(arguments)
+                elif name == "scan_pairs":
+                    return await self.scan_pairs(arguments)
+                elif name == "get_relative_performance":
+                    return await self.get_relative_performance(arguments)
+                elif name == "get_market_breadth":
+                    return await self.get_market_breadth(arguments)
+                elif name == "get_index_constituents":
+                    return await self.get_index_constituents(arguments)
+                elif name == "get_investor_flow":
+                    return await self.get_investor_flow(arguments)
                 else:
                     return [types.TextContent(
                         type="text",
@@ -460,18 +771,15 @@ class PyKRXMCPServer:
         period = arguments.get("period", "day")
         
         try:
-            if period == "day":
-                df = stock.get_market_ohlcv_by_date(start_date, end_date, ticker)
-            elif period == "week":
-                df = stock.get_market_ohlcv_by_date(start_date, end_date, ticker, freq='w')
-            elif period == "month":
-                df = stock.get_market_ohlcv_by_date(start_date, end_date, ticker, freq='m')
-            else:
+            if period not in price_bars.PERIODS:
                 return [types.TextContent(
                     type="text",
-                    text="잘못된 period 값입니다. 'day', 'week', 'month' 중 하나를 선택하세요."
+                    text=f"잘못된 period 값입니다. {', '.join(price_bars.PERIODS)} 중 하나를 선택하세요."
                 )]
             
+            # 일봉만 조회/캐시하고 주봉 이상은 로컬에서 집계
+            df = self.price_bars.bars(ticker, start_date, end_date, period, arguments.get("bars"))
+            
             if df.empty:
                 return [types.TextContent(
                     type="text",
@@ -608,10 +916,8 @@ class PyKRXMCPServer:
         market = arguments.get("market", "KOSPI")
         
         try:
-            if market == "KOSPI":
-                df = stock.get_market_sector_index_by_date(date, date, "KOSPI")
-            else:
-                df = stock.get_market_sector_index_by_date(date, date, "KOSDAQ")
+            # 시장 전체 업종 지수를 한 번에 조회하고 기간 수익률은 로컬 지수 저장소에서 계산
+            df = sector_perf.sector_performance(self.store, date, market)
             
             if df.empty:
                 return [types.TextContent(
@@ -619,18 +925,17 @@ class PyKRXMCPServer:
                     text=f"해당일({date})에 대한 {market} 업종 데이터가 없습니다."
                 )]
             
-            # 등락률 계산 및 정렬
-            df_result = df.copy()
-            df_result = df_result.sort_values('등락률', ascending=False)
+            def _pct(value):
+                return f"{value:.2f}%" if pd.notna(value) else "N/A"
             
             sectors_data = []
-            for idx, row in df_result.iterrows():
+            for idx, row in df.iterrows():
                 sectors_data.append({
                     "업종명": idx,
-                    "지수": f"{row['지수']:.2f}",
-                    "등락률": f"{row['등락률']:.2f}%",
-                    "거래량": f"{row['거래량']:,}" if '거래량' in row else "N/A",
-                    "거래대금": f"{row['거래대금']:,}원" if '거래대금' in row else "N/A"
+                    "지수": f"{row['종가']:.2f}",
+                    "등락률": _pct(row["1D"]),
+                    "기간수익률": {period: _pct(row[period]) for period in sector_perf.PERIOD_NAMES},
+                    "거래대금": f"{row['거래대금']:,.0f}원" if pd.notna(row["거래대금"]) else "N/A"
                 })
             
             result = {
@@ -657,14 +962,12 @@ class PyKRXMCPServer:
         end_date = arguments["end_date"]
         
         try:
-            # 지수명 매핑
-            index_mapping = {
-                "KOSPI": "1001",
-                "KOSDAQ": "2001", 
-                "KRX100": "1028"
-            }
-            
-            index_code = index_mapping.get(index_name.upper(), index_name)
+            index_code = self.index_directory.resolve(index_name)
+            if index_code is None:
+                return [types.TextContent(
+                    type="text",
+                    text=f"지수를 찾을 수 없습니다: {index_name}"
+                )]
             
             df = stock.get_index_ohlcv_by_date(start_date, end_date, index_code)
             
@@ -684,7 +987,7 @@ class PyKRXMCPServer:
                 df_formatted['거래량'] = df_formatted['거래량'].apply(lambda x: f"{x:,}")
             
             result = {
-                "지수명": index_name,
+                "지수명": self.index_directory.name(index_code),
                 "지수코드": index_code,
                 "조회기간": f"{start_date} ~ {end_date}",
                 "데이터": df_formatted.to_dict('index')
@@ -701,21 +1004,30 @@ class PyKRXMCPServer:
                 text=f"지수 데이터 조회 실패: {str(e)}"
             )]
 
+    def _flow_rows(self, frame: pd.DataFrame, investors: list) -> list:
+        """투자자 구분별 일별 매매 금액 포맷팅"""
+        rows = []
+        for idx in frame.index:
+            for investor in investors:
+                rows.append({
+                    "날짜": idx.strftime("%Y-%m-%d"),
+                    "투자자구분": investor,
+                    "매수금액": f"{frame.at[idx, ('매수', investor)]:,.0f}원",
+                    "매도금액": f"{frame.at[idx, ('매도', investor)]:,.0f}원",
+                    "순매수금액": f"{frame.at[idx, ('순매수', investor)]:,.0f}원"
+                })
+        return rows
+
     async def get_foreign_investment(self, arguments: dict) -> list[types.TextContent]:
         """외국인 투자 현황 조회"""
         start_date = arguments["start_date"]
         end_date = arguments["end_date"]
         ticker = arguments.get("ticker")
+        target = ticker or arguments.get("market", "KOSPI")
         
         try:
-            if ticker:
-                # 특정 종목의 외국인 투자 현황
-                df = stock.get_market_trading_value_by_date(start_date, end_date, ticker, detail=True)
-                df = df[df['투자자'] == '외국인']
-            else:
-                # 전체 시장 외국인 투자 현황
-                df = stock.get_market_trading_value_by_investor(start_date, end_date, "KOSPI", detail=True)
-                df = df[df['투자자'] == '외국인']
+            # 투자자 세부 매매 동향은 공용 캐시에서 조회 (기관 조회와 같은 데이터 공유)
+            df = self.investor_flow.view(target, start_date, end_date, "foreign")
             
             if df.empty:
                 return [types.TextContent(
@@ -723,19 +1035,14 @@ class PyKRXMCPServer:
                     text=f"해당 기간({start_date}~{end_date})에 대한 외국인 투자 데이터가 없습니다."
                 )]
             
-            # 데이터 포맷팅
-            result_data = []
-            for idx, row in df.iterrows():
-                result_data.append({
-                    "날짜": str(idx) if isinstance(idx, str) else idx.strftime("%Y-%m-%d"),
-                    "매수금액": f"{row.get('매수', 0):,}원",
-                    "매도금액": f"{row.get('매도', 0):,}원", 
-                    "순매수금액": f"{row.get('순매수', 0):,}원"
-                })
+            result_data = self._flow_rows(df, ["외국인합계"])
+            for row in result_data:
+                row.pop("투자자구분")
             
             result = {
                 "조회기간": f"{start_date} ~ {end_date}",
-                "종목": stock.get_market_ticker_name(ticker) if ticker else "전체시장",
+                "종목": stock.get_market_ticker_name(ticker) if ticker else f"{target} 전체시장",
+                "기간_순매수합계": f"{df[('순매수', '외국인합계')].sum():,.0f}원",
                 "외국인_투자현황": result_data
             }
             
@@ -755,16 +1062,10 @@ class PyKRXMCPServer:
         start_date = arguments["start_date"]
         end_date = arguments["end_date"]
         ticker = arguments.get("ticker")
+        target = ticker or arguments.get("market", "KOSPI")
         
         try:
-            if ticker:
-                # 특정 종목의 기관 투자 현황
-                df = stock.get_market_trading_value_by_date(start_date, end_date, ticker, detail=True)
-                df = df[df['투자자'].str.contains('기관')]
-            else:
-                # 전체 시장 기관 투자 현황
-                df = stock.get_market_trading_value_by_investor(start_date, end_date, "KOSPI", detail=True)
-                df = df[df['투자자'].str.contains('기관')]
+            df = self.investor_flow.view(target, start_date, end_date, "institutional")
             
             if df.empty:
                 return [types.TextContent(
@@ -772,21 +1073,14 @@ class PyKRXMCPServer:
                     text=f"해당 기간({start_date}~{end_date})에 대한 기관 투자 데이터가 없습니다."
                 )]
             
-            # 데이터 포맷팅
-            result_data = []
-            for idx, row in df.iterrows():
-                result_data.append({
-                    "날짜": str(idx) if isinstance(idx, str) else idx.strftime("%Y-%m-%d"),
-                    "투자자구분": row.get('투자자', ''),
-                    "매수금액": f"{row.get('매수', 0):,}원",
-                    "매도금액": f"{row.get('매도', 0):,}원",
-                    "순매수금액": f"{row.get('순매수', 0):,}원"
-                })
-            
+            investors = investor_flow.INSTITUTION_COLUMNS + ["기관합계"]
             result = {
                 "조회기간": f"{start_date} ~ {end_date}",
-                "종목": stock.get_market_ticker_name(ticker) if ticker else "전체시장",
-                "기관_투자현황": result_data
+                "종목": stock.get_market_ticker_name(ticker) if ticker else f"{target} 전체시장",
+                "기간_순매수합계": {
+                    investor: f"{df[('순매수', investor)].sum():,.0f}원" for investor in investors
+                },
+                "기관_투자현황": self._flow_rows(df, investors)
             }
             
             return [types.TextContent(
@@ -1064,6 +1358,394 @@ class PyKRXMCPServer:
                 text=f"종목 필터링 실패: {str(e)}"
             )]
 
+    async def rank_stocks_by_factors(self, arguments: dict) -> list[types.TextContent]:
+        """사전 계산된 팩터 배열로 종목 순위 조회"""
+        filters = arguments.get("filters", [])
+        sort_by = arguments.get("sort_by", "composite")
+        limit = arguments.get("limit", 20)
+        
+        try:
+            date = arguments.get("date") or self.store.latest_date() or self.store.close_session()
+            snapshot = self.store.get_snapshot(date)
+            table = factor_ranks.FactorTable.load(self.store, date)
+            
+            selected = table.top(sort_by=sort_by, filters=filters, limit=limit)
+            
+            stocks = []
+            for rank, idx in enumerate(selected, 1):
+                ticker = str(table.tickers[idx])
+                info = snapshot.loc[ticker] if ticker in snapshot.index else {}
+                stocks.append({
+                    "rank": rank,
+                    "ticker": ticker,
+                    "name": info.get("종목명", ""),
+                    "market": info.get("시장", ""),
+                    "sector": info.get("업종명", ""),
+                    **table.row(idx)
+                })
+            
+            result = {
+                "date": date,
+                "sort_by": sort_by,
+                "filters": filters,
+                "universe_count": len(table.tickers),
+                "matched_count": int(table.mask(filters).sum()),
+                "stocks": stocks
+            }
+            
+            return [types.TextContent(
+                type="text",
+                text=json.dumps(result, ensure_ascii=False, indent=2, default=str)
+            )]
+            
+        except Exception as e:
+            return [types.TextContent(
+                type="text",
+                text=f"팩터 순위 조회 실패: {str(e)}"
+            )]
+
+    async def scan_market_anomalies(self, arguments: dict) -> list[types.TextContent]:
+        """로컬 저장소 기반 전체 시장 이상 징후 스캔"""
+        kind = arguments.get("kind", "volume_spike")
+        market = arguments.get("market", "ALL")
+        z_threshold = arguments.get("z_threshold", 3.0)
+        gap_threshold = arguments.get("gap_threshold", 3.0)
+        limit = arguments.get("limit", 20)
+        
+        try:
+            snapshot = self.store.get_snapshot(arguments.get("date"))
+            date = arguments.get("date") or self.store.latest_date()
+            frame = anomaly_scan.load_anomalies(self.store, date)
+            
+            tickers = None
+            if market != "ALL":
+                tickers = snapshot.index[snapshot["시장"] == market].tolist()
+            
+            kinds = anomaly_scan.ANOMALY_KINDS if kind == "all" else [kind]
+            anomalies = {}
+            for k in kinds:
+                hits = anomaly_scan.scan(frame, k, z_threshold, gap_threshold, tickers)
+                count = len(hits)
+                hits = hits.head(limit).join(snapshot[["종목명", "종가", "거래량"]], how="left")
+                stocks = []
+                for ticker, row in hits.iterrows():
+                    stocks.append({
+                        "ticker": ticker,
+                        "name": row["종목명"],
+                        "close": int(row["종가"]) if pd.notna(row["종가"]) else None,
+                        "volume": int(row["거래량"]) if pd.notna(row["거래량"]) else None,
+                        **{
+                            col: round(float(row[col]), 2) if pd.notna(row[col]) else None
+                            for col in ["volume_z", "return_pct", "return_z", "gap_pct", "high_52w", "low_52w"]
+                        }
+                    })
+                anomalies[k] = {
+                    "count": count,
+                    "stocks": stocks
+                }
+            
+            result = {
+                "date": date,
+                "market": market,
+                "z_threshold": z_threshold,
+                "gap_threshold": gap_threshold,
+                "universe_count": len(frame) if tickers is None else len(tickers),
+                "anomalies": anomalies
+            }
+            
+            return [types.TextContent(
+                type="text",
+                text=json.dumps(result, ensure_ascii=False, indent=2, default=str)
+            )]
+            
+        except Exception as e:
+            return [types.TextContent(
+                type="text",
+                text=f"이상 징후 스캔 실패: {str(e)}"
+            )]
+
+    async def scan_pairs(self, arguments: dict) -> list[types.TextContent]:
+        """업종/바스켓 페어 트레이딩 후보 스캔"""
+        sector = arguments.get("sector")
+        tickers = arguments.get("tickers")
+        window = arguments.get("window", pairs_scan.DEFAULT_WINDOW)
+        min_corr = arguments.get("min_corr", 0.5)
+        only_cointegrated = arguments.get("only_cointegrated", True)
+        limit = arguments.get("limit", 20)
+        
+        try:
+            snapshot = self.store.get_snapshot(arguments.get("end_date"))
+            end_date = arguments.get("end_date") or self.store.latest_date()
+            
+            if not tickers:
+                if not sector:
+                    return [types.TextContent(
+                        type="text",
+                        text="sector 또는 tickers 중 하나를 지정하세요."
+                    )]
+                tickers = snapshot.index[snapshot["업종명"] == sector].tolist()
+                if not tickers:
+                    return [types.TextContent(
+                        type="text",
+                        text=f"업종 '{sector}'에 해당하는 종목을 찾을 수 없습니다."
+                    )]
+            
+            # CPU 작업은 프로세스 풀에서 수행하고 이벤트 루프는 막지 않음
+            frame = await asyncio.to_thread(
+                self.pairs_scanner.scan, tickers, window, end_date, min_corr
+            )
+            if only_cointegrated:
+                frame = frame[frame["significance"].notna()]
+            
+            names = snapshot["종목명"]
+            pairs = []
+            for _, row in frame.head(limit).iterrows():
+                pairs.append({
+                    "ticker_a": row["ticker_a"],
+                    "name_a": names.get(row["ticker_a"], ""),
+                    "ticker_b": row["ticker_b"],
+                    "name_b": names.get(row["ticker_b"], ""),
+                    "correlation": round(float(row["correlation"]), 3),
+                    "hedge_ratio": round(float(row["hedge_ratio"]), 4) if pd.notna(row["hedge_ratio"]) else None,
+                    "adf_stat": round(float(row["adf_stat"]), 3) if pd.notna(row["adf_stat"]) else None,
+                    "significance": row["significance"],
+                    "half_life_days": round(float(row["half_life"]), 1) if pd.notna(row["half_life"]) else None
+                })
+            
+            result = {
+                "end_date": end_date,
+                "window": window,
+                "basket": sector or "custom",
+                "basket_size": len(tickers),
+                "pairs_found": len(frame),
+                "pairs": pairs
+            }
+            
+            return [types.TextContent(
+                type="text",
+                text=json.dumps(result, ensure_ascii=False, indent=2, default=str)
+            )]
+            
+        except Exception as e:
+            return [types.TextContent(
+                type="text",
+                text=f"페어 스캔 실패: {str(e)}"
+            )]
+
+    async def get_relative_performance(self, arguments: dict) -> list[types.TextContent]:
+        """지수 대비 성과 조회"""
+        index_name = arguments.get("index_name", "KOSPI").upper()
+        window = arguments.get("window", relative_perf.DEFAULT_WINDOW)
+        tickers = arguments.get("tickers")
+        sector = arguments.get("sector")
+        sort_by = arguments.get("sort_by", "relative_strength")
+        limit = arguments.get("limit", 20)
+        
+        try:
+            snapshot = self.store.get_snapshot(arguments.get("end_date"))
+            end_date = arguments.get("end_date") or self.store.latest_date()
+            
+            universe = tickers or self.relative_perf.constituents(index_name, snapshot)
+            if sector:
+                universe = [t for t in universe if t in snapshot.index and snapshot.at[t, "업종명"] == sector]
+            
+            history = 20 if tickers else 1
+            frames = self.relative_perf.compute(index_name, end_date, window, universe, history)
+            latest = pd.DataFrame({name: frame.iloc[-1] for name, frame in frames.items()})
+            latest = latest.dropna(subset=["beta"]).sort_values(sort_by, ascending=False)
+            
+            def _num(value, digits=4):
+                return round(float(value), digits) if pd.notna(value) else None
+            
+            stocks = []
+            for ticker, row in latest.head(limit).iterrows():
+                item = {
+                    "ticker": ticker,
+                    "name": snapshot.at[ticker, "종목명"] if ticker in snapshot.index else "",
+                    "sector": snapshot.at[ticker, "업종명"] if ticker in snapshot.index else "",
+                    "beta": _num(row["beta"], 3),
+                    "alpha_annual_pct": _num(row["alpha"] * 100, 2),
+                    "tracking_error_pct": _num(row["tracking_error"] * 100, 2),
+                    "relative_strength_pct": _num(row["relative_strength"] * 100, 2),
+                    "correlation": _num(row["correlation"], 3)
+                }
+                if tickers:
+                    item["history"] = [
+                        {
+                            "date": idx.strftime("%Y-%m-%d"),
+                            "beta": _num(frames["beta"].at[idx, ticker], 3),
+                            "relative_strength_pct": _num(frames["relative_strength"].at[idx, ticker] * 100, 2)
+                        }
+                        for idx in frames["beta"].index
+                    ]
+                stocks.append(item)
+            
+            result = {
+                "index_name": index_name,
+                "end_date": end_date,
+                "window": window,
+                "universe_count": len(universe),
+                "summary": {
+                    "median_beta": _num(latest["beta"].median(), 3),
+                    "outperforming_ratio_pct": _num((latest["relative_strength"] > 0).mean() * 100, 1)
+                },
+                "sort_by": sort_by,
+                "stocks": stocks
+            }
+            
+            return [types.TextContent(
+                type="text",
+                text=json.dumps(result, ensure_ascii=False, indent=2, default=str)
+            )]
+            
+        except Exception as e:
+            return [types.TextContent(
+                type="text",
+                text=f"지수 대비 성과 조회 실패: {str(e)}"
+            )]
+
+    async def get_market_breadth(self, arguments: dict) -> list[types.TextContent]:
+        """사전 계산된 시장 폭 시계열 조회"""
+        market = arguments.get("market", "ALL")
+        start_date = arguments.get("start_date")
+        end_date = arguments.get("end_date")
+        days = arguments.get("days", 20)
+        
+        try:
+            if not self.store.latest_date():
+                self.store.close_session()
+            series = market_breadth.ensure_breadth(self.store, end_date)
+            series = series[series["market"] == market]
+            if end_date:
+                series = series[series.index <= pd.Timestamp(end_date)]
+            if start_date:
+                series = series[series.index >= pd.Timestamp(start_date)]
+            else:
+                series = series.tail(days)
+            
+            if series.empty:
+                return [types.TextContent(
+                    type="text",
+                    text=f"해당 기간에 대한 {market} 시장 폭 데이터가 없습니다."
+                )]
+            
+            history = []
+            for idx, row in series.iterrows():
+                item = {"date": idx.strftime("%Y-%m-%d")}
+                for col in market_breadth.BREADTH_COLUMNS:
+                    value = row[col]
+                    item[col] = round(float(value), 4) if pd.notna(value) else None
+                history.append(item)
+            
+            result = {
+                "market": market,
+                "period": f"{history[0]['date']} ~ {history[-1]['date']}",
+                "latest": history[-1],
+                "history": history
+            }
+            
+            return [types.TextContent(
+                type="text",
+                text=json.dumps(result, ensure_ascii=False, indent=2)
+            )]
+            
+        except Exception as e:
+            return [types.TextContent(
+                type="text",
+                text=f"시장 폭 조회 실패: {str(e)}"
+            )]
+
+    async def get_index_constituents(self, arguments: dict) -> list[types.TextContent]:
+        """지수 목록/구성 종목 조회"""
+        index_name = arguments.get("index_name")
+        limit = arguments.get("limit", 50)
+        
+        try:
+            if not index_name:
+                indices = self.index_directory.list_indices(arguments.get("family"))
+                result = {
+                    "지수군": arguments.get("family") or "전체",
+                    "지수수": len(indices),
+                    "지수목록": indices
+                }
+            else:
+                index_code = self.index_directory.resolve(index_name)
+                if index_code is None:
+                    return [types.TextContent(
+                        type="text",
+                        text=f"지수를 찾을 수 없습니다: {index_name}"
+                    )]
+                
+                weights = self.index_directory.weights(index_code, arguments.get("date"))
+                snapshot = self.store.get_snapshot(arguments.get("date"))
+                ranked = sorted(weights.items(), key=lambda item: item[1], reverse=True)
+                constituents = [
+                    {
+                        "ticker": ticker,
+                        "name": snapshot.at[ticker, "종목명"] if ticker in snapshot.index else "",
+                        "sector": snapshot.at[ticker, "업종명"] if ticker in snapshot.index else "",
+                        "weight_pct": round(weight * 100, 3)
+                    }
+                    for ticker, weight in ranked[:limit]
+                ]
+                result = {
+                    "지수명": self.index_directory.name(index_code),
+                    "지수코드": index_code,
+                    "구성종목수": len(weights),
+                    "구성종목": constituents
+                }
+            
+            return [types.TextContent(
+                type="text",
+                text=json.dumps(result, ensure_ascii=False, indent=2, default=str)
+            )]
+            
+        except Exception as e:
+            return [types.TextContent(
+                type="text",
+                text=f"지수 구성 종목 조회 실패: {str(e)}"
+            )]
+
+    async def get_investor_flow(self, arguments: dict) -> list[types.TextContent]:
+        """투자자별 매매 동향 조회"""
+        start_date = arguments["start_date"]
+        end_date = arguments["end_date"]
+        ticker = arguments.get("ticker")
+        target = ticker or arguments.get("market", "KOSPI")
+        view = arguments.get("view", "summary")
+        
+        try:
+            result = {
+                "조회기간": f"{start_date} ~ {end_date}",
+                "종목": stock.get_market_ticker_name(ticker) if ticker else f"{target} 전체시장"
+            }
+            
+            if view == "summary":
+                summary = self.investor_flow.summary(target, start_date, end_date)
+                result["투자자별_기간합계"] = {
+                    investor: {side: f"{value:,.0f}원" for side, value in row.items()}
+                    for investor, row in summary.iterrows()
+                }
+            else:
+                df = self.investor_flow.view(target, start_date, end_date, view)
+                investors = list(df["순매수"].columns)
+                result["투자자구분"] = investor_flow.VIEW_LABELS[view]
+                result["기간_순매수합계"] = {
+                    investor: f"{df[('순매수', investor)].sum():,.0f}원" for investor in investors
+                }
+                result["일별_매매동향"] = self._flow_rows(df, investors)
+            
+            return [types.TextContent(
+                type="text",
+                text=json.dumps(result, ensure_ascii=False, indent=2)
+            )]
+            
+        except Exception as e:
+            return [types.TextContent(
+                type="text",
+                text=f"투자자별 매매 동향 조회 실패: {str(e)}"
+            )]
+
     async def get_market_news(self, arguments: dict) -> list[types.TextContent]:
         """시장 뉴스 및 리스크 분석 (샘플 데이터)"""
         try:
@@ -0,0 +1,286 @@
+"""
+프로세스 간 공유 시장 스냅샷
+현재 거래일의 압축 스냅샷을 mmap 파일로 게시하고, 여러 MCP 워커와 백엔드가
+읽기 전용으로 복사 없이 연결합니다. 게시할 때마다 버전 번호가 붙은 새 파일
+(snapshot.00000001.bin)을 쓰고, 현재 버전 파일명을 담은 작은 포인터 파일(CURRENT)만
+원자적으로 교체합니다. 연결 중인(mmap) 파일은 덮어쓰지 않으므로 Windows에서도 게시가
+실패하지 않고, 기존 연결은 다시 연결할 때까지 이전 버전을 유지합니다.
+
+데이터 파일 구조:
+    헤더(고정 길이) | 메타데이터(JSON) | 컬럼 배열(8바이트 정렬)
+"""
+
+import json
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from compact_snapshot import CompactSnapshot, TickerMaster
+from market_store import DEFAULT_DATA_DIR, MarketStore
+
+
+MAGIC = b"PKRXSNAP"
+FORMAT_VERSION = 1
+# magic, 포맷 버전, 게시 버전, 거래일, 종목 수, 메타데이터 길이
+HEADER = struct.Struct("<8sIQ8sII")
+ALIGN = 8
+
+DEFAULT_DIR = DEFAULT_DATA_DIR / "shared"
+POINTER_NAME = "CURRENT"
+# 이전 버전 파일 보관 개수 (아직 연결 중인 읽기 프로세스용, 그보다 오래된 파일은 삭제 시도)
+KEEP_VERSIONS = 2
+# Windows에서 읽는 쪽이 포인터 파일을 잠깐 열고 있을 때 교체 재시도
+REPLACE_RETRIES = 5
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _data_name(version: int) -> str:
+    return f"snapshot.{version:08d}.bin"
+
+
+def _version_of(name: str) -> int:
+    return int(name.split(".")[1])
+
+
+def current_name(directory: Path) -> Optional[str]:
+    """현재 게시된 데이터 파일명 (게시 전이면 None)"""
+    try:
+        name = (Path(directory) / POINTER_NAME).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    return name or None
+
+
+def _replace(src: Path, dst: Path) -> None:
+    for attempt in range(REPLACE_RETRIES):
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if attempt == REPLACE_RETRIES - 1:
+                raise
+            time.sleep(0.05 * (attempt + 1))
+
+
+def _remove_old_versions(directory: Path, version: int) -> None:
+    for path in directory.glob("snapshot.*.bin"):
+        try:
+            if _version_of(path.name) <= version - KEEP_VERSIONS:
+                path.unlink()
+        except ValueError:
+            continue
+        except OSError:
+            # Windows에서 아직 연결된 파일은 삭제되지 않음 (다음 게시 때 다시 시도)
+            pass
+
+
+def publish(compact: CompactSnapshot, date: str, directory: Optional[Path] = None) -> int:
+    """압축 스냅샷을 새 버전 파일로 게시하고 게시 버전을 반환"""
+    directory = Path(directory or DEFAULT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    current = current_name(directory)
+    version = _version_of(current) + 1 if current else 1
+
+    arrays: Dict[str, np.ndarray] = {
+        "티커": compact.tickers.astype("S6"),
+        "ID": compact.ids,
+    }
+    categories: Dict[str, list] = {}
+    for name, values in compact.columns.items():
+        if isinstance(values, pd.Categorical):
+            arrays[name] = values.codes
+            categories[name] = [str(c) for c in values.categories]
+        else:
+            arrays[name] = np.ascontiguousarray(values)
+
+    columns = {}
+    offset = 0
+    for name, values in arrays.items():
+        offset = _aligned(offset)
+        columns[name] = {"dtype": values.dtype.str, "offset": offset}
+        offset += values.nbytes
+
+    meta = json.dumps({
+        "columns": columns,
+        "categories": categories,
+        "names": [str(n) for n in compact.master.names(compact.ids)],
+    }, ensure_ascii=False).encode("utf-8")
+    data_start = _aligned(HEADER.size + len(meta))
+
+    # 새 버전 파일은 아직 아무도 연결하지 않았으므로 바로 이름을 확정할 수 있음
+    path = directory / _data_name(version)
+    tmp = directory / f"{path.name}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, version, date.encode(), len(compact), len(meta)))
+        f.write(meta)
+        for name, values in arrays.items():
+            f.seek(data_start + columns[name]["offset"])
+            f.write(values.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+    # 포인터 파일 교체로 게시 (읽는 쪽은 포인터를 읽은 뒤 데이터 파일에 연결)
+    pointer_tmp = directory / f"{POINTER_NAME}.{os.getpid()}.tmp"
+    with open(pointer_tmp, "w", encoding="utf-8") as f:
+        f.write(path.name)
+        f.flush()
+        os.fsync(f.fileno())
+    _replace(pointer_tmp, directory / POINTER_NAME)
+    _remove_old_versions(directory, version)
+    return version
+
+
+class SharedSnapshot:
+    """공유 스냅샷 읽기 전용 연결 (컬럼은 mmap 위의 numpy 뷰)
+
+    아직 게시된 스냅샷이 없으면 연결되지 않은 상태(attached=False)로 만들어지고,
+    refresh()가 게시를 발견하면 연결합니다.
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = Path(directory or DEFAULT_DIR)
+        self._mmap: Optional[mmap.mmap] = None
+        self._name: Optional[str] = None
+        self.version = 0
+        self.date = ""
+        self.columns: Dict[str, np.ndarray] = {}
+        self.categories: Dict[str, list] = {}
+        self.names: list = []
+        self.refresh()
+
+    @property
+    def attached(self) -> bool:
+        return self._mmap is not None
+
+    def attach(self, name: str) -> None:
+        """게시된 버전 파일에 연결"""
+        path = self.directory / name
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, fmt, version, date, rows, meta_len = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            mapped.close()
+            raise ValueError(f"공유 스냅샷 형식이 아닙니다: {path}")
+        meta = json.loads(bytes(mapped[HEADER.size:HEADER.size + meta_len]).decode("utf-8"))
+        data_start = _aligned(HEADER.size + meta_len)
+
+        columns = {
+            name: np.frombuffer(mapped, dtype=np.dtype(spec["dtype"]), count=rows,
+                                offset=data_start + spec["offset"])
+            for name, spec in meta["columns"].items()
+        }
+
+        self.close()
+        self._mmap, self._name = mapped, name
+        self.version, self.date = version, date.decode()
+        self.columns, self.categories, self.names = columns, meta["categories"], meta["names"]
+
+    def refresh(self) -> bool:
+        """새 버전이 게시되었으면 다시 연결 (교체 여부 반환)"""
+        name = current_name(self.directory)
+        if name is None or name == self._name:
+            return False
+        try:
+            self.attach(name)
+        except FileNotFoundError:
+            # 포인터를 읽은 직후 더 새 버전이 게시되어 파일이 정리된 경우 다음 refresh에서 연결
+            return False
+        return True
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self.columns = {}
+            try:
+                self._mmap.close()
+            except BufferError:
+                # 외부에서 아직 참조 중인 배열이 있으면 GC 시 해제
+                pass
+            self._mmap = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def tickers(self) -> np.ndarray:
+        return self.columns["티커"].astype(str)
+
+    def column(self, name: str) -> np.ndarray:
+        """컬럼 배열 (범주형 컬럼은 값으로 복원)"""
+        values = self.columns[name]
+        if name in self.categories:
+            return np.asarray(self.categories[name], dtype=object)[values]
+        return values
+
+    def to_compact(self, master: TickerMaster) -> Optional[CompactSnapshot]:
+        """종목 마스터 ID를 공유하는 압축 스냅샷 (숫자 컬럼은 mmap 뷰, 복사 없음)
+
+        게시한 프로세스의 종목 마스터와 ID가 맞지 않으면(마스터가 뒤처진 경우) None.
+        """
+        ids = self.columns["ID"]
+        if len(ids) and (ids.max() >= len(master) or
+                         not np.array_equal(master.tickers[ids].astype(str), self.tickers)):
+            return None
+        columns = {}
+        for name, values in self.columns.items():
+            if name in ("티커", "ID"):
+                continue
+            if name in self.categories:
+                columns[name] = pd.Categorical.from_codes(values, self.categories[name])
+            else:
+                columns[name] = values
+        return CompactSnapshot(master, ids, columns)
+
+    def to_frame(self) -> pd.DataFrame:
+        """스냅샷 DataFrame 형태로 복원 (복사 발생)"""
+        data = {"종목명": self.names}
+        for name in self.columns:
+            if name in ("티커", "ID"):
+                continue
+            if name in self.categories:
+                data[name] = pd.Categorical.from_codes(self.columns[name], self.categories[name])
+            else:
+                data[name] = self.columns[name]
+        return pd.DataFrame(data, index=pd.Index(self.tickers, name="티커"))
+
+
+def publish_session(store: MarketStore, date: str, snapshot: pd.DataFrame) -> None:
+    """마감 후 훅: 해당 거래일 스냅샷을 공유 파일로 게시 (최신 거래일만)"""
+    latest = store.latest_date()
+    if latest and date < latest:
+        return
+    publish(store.load_compact(date), date, store.data_dir / "shared")
+
+
+def register(store: MarketStore) -> None:
+    """저장소에 공유 스냅샷 게시 훅 등록"""
+    store.register_post_close(publish_session)
+
+
+def attach(store: MarketStore) -> SharedSnapshot:
+    """저장소가 최신 거래일 스냅샷을 공유 파일에서 읽도록 연결"""
+    reader = SharedSnapshot(store.data_dir / "shared")
+    store.attach_shared(reader)
+    return reader
+
+
+if __name__ == "__main__":
+    # 저장된 최신 스냅샷을 다시 게시: python shared_snapshot.py [YYYYMMDD]
+    import sys
+
+    store = MarketStore()
+    date = sys.argv[1] if len(sys.argv) > 1 else store.latest_date()
+    if date is None:
+        raise SystemExit("게시할 스냅샷이 없습니다")
+    version = publish(store.load_compact(date), date, store.data_dir / "shared")
+    print(f"Published {date} (version {version})")
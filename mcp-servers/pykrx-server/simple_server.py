@@ -24,9 +24,18 @@ from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 
+from index_directory import IndexDirectory
+from market_store import MarketStore
+import sector_perf
+
 # 서버 초기화
 app = Server("pykrx-server")
 
+# 로컬 시장 저장소 및 지수 코드/이름 디렉터리 (하루 한 번 갱신)
+store = MarketStore()
+sector_perf.register(store)
+index_directory = IndexDirectory(store=store)
+
 def format_date(date_str: str) -> str:
     """날짜를 YYYYMMDD 형식으로 변환"""
     if not date_str:
@@ -202,7 +211,7 @@ async def list_tools() -> List[Tool]:
                 "properties": {
                     "index_code": {
                         "type": "string", 
-                        "description": "지수 코드 (1001=코스피, 2001=코스닥, 1028=코스피200 등)"
+                        "description": "지수 코드 또는 지수명 (1001=코스피, 2001=코스닥, 1028=코스피200 등)"
                     },
                     "start_date": {
                         "type": "string",
@@ -507,7 +516,7 @@ async def call_tool(name: str, arguments: dict) -> List[TextContent]:
                 }
             
         elif name == "get_index_ohlcv":
-            index_code = arguments["index_code"]
+            index_code = index_directory.resolve(arguments["index_code"]) or arguments["index_code"]
             start_date = format_date(arguments["start_date"])
             end_date = format_date(arguments.get("end_date", ""))
             
@@ -527,19 +536,10 @@ async def call_tool(name: str, arguments: dict) -> List[TextContent]:
                         "volume": int(row["거래량"])
                     })
             
-            # 지수명 매핑
-            index_names = {
-                "1001": "코스피",
-                "2001": "코스닥",
-                "1028": "코스피200",
-                "1024": "코스피100", 
-                "1003": "코스피50"
-            }
-            
             result = {
                 "success": True,
                 "index_code": index_code,
-                "index_name": index_names.get(index_code, f"지수{index_code}"),
+                "index_name": index_directory.name(index_code),
                 "start_date": start_date,
                 "end_date": end_date,
                 "data_count": len(data),
@@ -551,34 +551,19 @@ async def call_tool(name: str, arguments: dict) -> List[TextContent]:
             market = arguments.get("market", "KOSPI")
             
             try:
-                # 업종 분류 정보 조회
-                sector_df = stock.get_market_sector_classifications(market)
+                # 시장 전체 업종 지수를 한 번에 조회하고 기간 수익률은 로컬 저장소에서 계산
+                perf = sector_perf.sector_performance(store, date, market)
                 
-                if sector_df.empty:
-                    data = []
-                else:
-                    # 업종별 현재 지수 조회
-                    data = []
-                    for idx, row in sector_df.head(10).iterrows():  # 상위 10개 업종만
-                        sector_code = row.get("업종코드", "")
-                        sector_name = row.get("업종명", "")
-                        
-                        try:
-                            # 업종 지수 데이터 조회 시도
-                            index_data = stock.get_index_ohlcv_by_date(date, date, sector_code)
-                            if not index_data.empty:
-                                latest = index_data.iloc[-1]
-                                close_price = float(latest.get("종가", 0))
-                            else:
-                                close_price = 0
-                        except:
-                            close_price = 0
-                        
-                        data.append({
-                            "sector_code": sector_code,
-                            "sector_name": sector_name,
-                            "close_price": close_price
-                        })
+                data = []
+                for sector_name, row in perf.iterrows():
+                    item = {
+                        "sector_name": sector_name,
+                        "close_price": float(row["종가"]),
+                        "trading_value": int(row["거래대금"]) if pd.notna(row["거래대금"]) else 0
+                    }
+                    for period in sector_perf.PERIOD_NAMES:
+                        item[f"return_{period.lower()}"] = round(float(row[period]), 2) if pd.notna(row[period]) else None
+                    data.append(item)
                 
                 result = {
                     "success": True,
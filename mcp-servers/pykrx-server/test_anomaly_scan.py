@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+이상 징후 52주 신고가/신저가 판정 테스트 (합성 패널)
+"""
+
+import numpy as np
+import pandas as pd
+
+from anomaly_scan import BREAKOUT_WINDOW, compute_anomalies
+
+
+def panels(days: int, last_close: float) -> dict:
+    index = pd.bdate_range(end="2024-06-14", periods=days)
+    close = np.full(days, 100.0)
+    close[-1] = last_close
+    frame = lambda values: pd.DataFrame({"005930": values}, index=index)
+    return {"시가": frame(close), "고가": frame(close + 1), "저가": frame(close - 1),
+            "종가": frame(close), "거래량": frame(np.full(days, 1000.0))}
+
+
+def test_short_history_is_not_a_52_week_breakout():
+    frame = compute_anomalies(panels(20, 150.0))
+    assert not frame.loc["005930", "high_52w_flag"]
+    frame = compute_anomalies(panels(20, 50.0))
+    assert not frame.loc["005930", "low_52w_flag"]
+
+
+def test_full_window_breakout_is_flagged():
+    frame = compute_anomalies(panels(BREAKOUT_WINDOW + 1, 150.0))
+    assert frame.loc["005930", "high_52w_flag"]
+    frame = compute_anomalies(panels(BREAKOUT_WINDOW + 1, 50.0))
+    assert frame.loc["005930", "low_52w_flag"]
+
+
+def halted(frame_set: dict, rows) -> dict:
+    """지정한 행을 거래 정지(가격 0, 거래량 0)로 바꾼 패널"""
+    result = {field: frame.copy() for field, frame in frame_set.items()}
+    for frame in result.values():
+        frame.iloc[rows, 0] = 0.0
+    return result
+
+
+def test_single_halted_day_keeps_breakout_flag():
+    frame = compute_anomalies(halted(panels(BREAKOUT_WINDOW + 1, 150.0), [100]))
+    assert frame.loc["005930", "high_52w_flag"]
+    # 기간 시작일이 거래 정지여도 그 이전 이력이 있으면 판정
+    frame = compute_anomalies(halted(panels(BREAKOUT_WINDOW + 5, 50.0), [4]))
+    assert frame.loc["005930", "low_52w_flag"]
+
+
+def test_listing_inside_window_is_not_a_breakout():
+    # 기간 대부분(95%)을 거래했지만 기간 시작 이후 상장
+    late = int(BREAKOUT_WINDOW * 0.05)
+    frame = compute_anomalies(halted(panels(BREAKOUT_WINDOW + 1, 150.0), list(range(late))))
+    assert not frame.loc["005930", "high_52w_flag"]
+    # 기간 내 거래 정지가 너무 많음
+    frame = compute_anomalies(halted(panels(BREAKOUT_WINDOW + 1, 150.0), list(range(50, 100))))
+    assert not frame.loc["005930", "high_52w_flag"]
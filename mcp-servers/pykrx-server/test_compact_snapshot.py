@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+압축 스냅샷 왕복/메모리 테스트 (합성 전체 시장 스냅샷)
+"""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from compact_snapshot import CompactSnapshot, TickerMaster
+from market_store import SNAPSHOT_COLUMNS
+
+
+def market_snapshot(n: int = 2500) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    close = rng.integers(1000, 900000, n)
+    shares = rng.integers(1_000_000, 6_000_000_000, n)
+    frame = pd.DataFrame({
+        "종목명": [f"종목{i}" for i in range(n)],
+        "시장": rng.choice(["KOSPI", "KOSDAQ"], n),
+        "업종명": rng.choice(["전기전자", "화학", "의약품", "서비스업", "금융업"], n),
+        "시가": close, "고가": close + 100, "저가": close - 100, "종가": close,
+        "거래량": rng.integers(0, 50_000_000, n),
+        "거래대금": close * rng.integers(0, 50_000_000, n),
+        "등락률": rng.normal(0, 3, n).round(2),
+        "시가총액": close * shares,
+        "상장주식수": shares,
+        "BPS": rng.integers(100, 500000, n).astype("float64"),
+        "PER": rng.uniform(1, 80, n).round(2),
+        "PBR": rng.uniform(0.1, 10, n).round(2),
+        "EPS": rng.integers(-5000, 50000, n).astype("float64"),
+        "DIV": rng.uniform(0, 8, n).round(2),
+        "DPS": rng.integers(0, 5000, n).astype("float64"),
+    }, index=pd.Index([f"{i:06d}" for i in range(n)], name="티커"))
+    # 삼성전자 규모 (시가총액 약 4e14원, 상장주식수 약 5.97e9주)
+    frame.iloc[0, frame.columns.get_loc("상장주식수")] = 5_969_782_550
+    frame.iloc[0, frame.columns.get_loc("시가총액")] = 5_969_782_550 * 70_100
+    frame.iloc[0, frame.columns.get_loc("거래대금")] = 1_234_567_891_234
+    return frame[SNAPSHOT_COLUMNS]
+
+
+def test_amount_columns_round_trip_exactly():
+    frame = market_snapshot()
+    master = TickerMaster(Path(tempfile.mkdtemp()) / "master.json")
+    restored = CompactSnapshot.from_frame(frame, master).to_frame()
+
+    for col in ["시가", "종가", "거래량", "거래대금", "시가총액", "상장주식수", "BPS", "EPS", "DPS"]:
+        assert (restored[col].to_numpy() == frame[col].to_numpy()).all(), col
+    assert int(restored.loc["000000", "시가총액"]) == 5_969_782_550 * 70_100
+    assert restored["종목명"].tolist() == frame["종목명"].tolist()
+
+
+def test_compact_snapshot_is_several_times_smaller():
+    frame = market_snapshot()
+    master = TickerMaster(Path(tempfile.mkdtemp()) / "master.json")
+    compact = CompactSnapshot.from_frame(frame, master)
+    ratio = frame.memory_usage(deep=True).sum() / compact.nbytes
+    assert ratio >= 4, ratio
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+지수 디렉터리 갱신 실패 처리 테스트 (pykrx 없이 가짜 조회 함수 사용)
+"""
+
+import json
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import index_directory
+from index_directory import IndexDirectory
+
+
+class FakeKrx:
+    """지수 목록 조회 횟수를 세고 fail이면 예외를 내는 pykrx.stock 대역"""
+
+    def __init__(self):
+        self.fail = False
+        self.calls = 0
+
+    def module(self):
+        return SimpleNamespace(get_index_ticker_list=self.ticker_list,
+                               get_index_ticker_name=lambda code: f"지수{code}")
+
+    def ticker_list(self, market):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("KRX 응답 없음")
+        return ["1001"] if market == "KOSPI" else []
+
+
+def make_directory(monkeypatch, fake, clock):
+    monkeypatch.setattr(index_directory, "PYKRX_AVAILABLE", True)
+    monkeypatch.setattr(index_directory, "stock", fake.module(), raising=False)
+    monkeypatch.setattr(index_directory.time, "monotonic", lambda: clock[0])
+    return IndexDirectory(data_dir=Path(tempfile.mkdtemp()))
+
+
+def test_failed_refresh_keeps_previous_directory_and_backs_off(monkeypatch):
+    fake, clock = FakeKrx(), [0.0]
+    directory = make_directory(monkeypatch, fake, clock)
+    assert directory.resolve("1001") == "1001"
+
+    # 다음 날 갱신 실패: 어제 디렉터리를 그대로 쓰고 파일도 덮어쓰지 않음
+    monkeypatch.setattr(IndexDirectory, "_today", staticmethod(lambda: "29991231"))
+    fake.fail, calls = True, fake.calls
+    assert directory.name("1001") == "지수1001"
+    assert json.loads(directory.path.read_text(encoding="utf-8"))["indices"]
+    assert fake.calls == calls + len(index_directory.INDEX_FAMILIES)
+
+    # 대기 시간 동안은 다시 조회하지 않고, 지나면 재시도
+    directory.list_indices()
+    assert fake.calls == calls + len(index_directory.INDEX_FAMILIES)
+    fake.fail = False
+    clock[0] += index_directory.REFRESH_RETRY_SECONDS
+    directory.list_indices()
+    assert directory._load()["built"] == "29991231"
+
+
+def test_first_refresh_failure_is_not_saved(monkeypatch, capsys):
+    fake, clock = FakeKrx(), [0.0]
+    fake.fail = True
+    directory = make_directory(monkeypatch, fake, clock)
+    assert directory.list_indices() == []
+    assert not directory.path.exists()
+    # stdio MCP 서버의 stdout은 JSON-RPC 전용
+    output = capsys.readouterr()
+    assert output.out == "" and "refresh failed" in output.err
+
+    fake.fail = False
+    clock[0] += index_directory.REFRESH_RETRY_SECONDS
+    assert [i["code"] for i in directory.list_indices()] == ["1001"]
+    assert directory.path.exists()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+시장 폭 신고가/신저가, 이동평균 상회 비율, ADL 재계산 테스트 (합성 패널)
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from market_breadth import HIGH_LOW_WINDOW, MA_WINDOWS, compute_and_store, compute_breadth_row, load_breadth
+
+
+def test_new_highs_count_only_tickers_with_full_window():
+    days = HIGH_LOW_WINDOW + 1
+    index = pd.bdate_range(end="2024-06-14", periods=days)
+    closes = pd.DataFrame({"OLD": np.full(days, 100.0), "NEW": np.full(days, 100.0)}, index=index)
+    closes.iloc[:-20, 1] = np.nan  # 최근 20거래일만 있는 신규 종목
+    closes.iloc[-1] = 150.0
+    highs, lows = closes + 1, closes - 1
+    snapshot = pd.DataFrame({"등락률": [50.0, 50.0], "거래량": [1000, 1000]}, index=["OLD", "NEW"])
+
+    row = compute_breadth_row(snapshot, closes, highs, lows)
+    assert row["new_highs"] == 1
+    assert row["high_low_eligible"] == 1
+    assert row["new_lows"] == 0
+
+
+def test_moving_average_counts_only_tickers_covering_the_window():
+    days = max(MA_WINDOWS) + 1
+    index = pd.bdate_range(end="2024-06-14", periods=days)
+    closes = pd.DataFrame({"OLD": np.full(days, 100.0), "NEW": np.full(days, 100.0)}, index=index)
+    closes.iloc[:-5, 1] = np.nan  # 5거래일 전 상장
+    closes.iloc[50, 0] = np.nan   # 하루 거래 정지는 허용
+    closes.iloc[-1] = [90.0, 150.0]
+    snapshot = pd.DataFrame({"등락률": [-10.0, 50.0], "거래량": [1000, 1000]}, index=["OLD", "NEW"])
+
+    row = compute_breadth_row(snapshot, closes, closes + 1, closes - 1)
+    assert row["pct_above_ma200"] == 0.0
+    assert row["pct_above_ma50"] == 0.0
+
+
+def test_recomputing_a_stored_date_shifts_later_ad_line(tmp_path):
+    dates = ["20240612", "20240613", "20240614"]
+    panel = pd.DataFrame({"A": [100.0, 101.0]}, index=pd.to_datetime(dates[:2]))
+    store = SimpleNamespace(data_dir=tmp_path, load_panel=lambda field, end_date, lookback: panel)
+
+    def snapshot(change):
+        return pd.DataFrame({"시장": ["KOSPI"], "등락률": [change], "거래량": [1000]}, index=["A"])
+
+    for date in dates:
+        compute_and_store(store, date, snapshot(1.0))
+    # 가운데 날짜를 하락으로 다시 계산하면 이후 ADL도 2만큼 내려감
+    compute_and_store(store, dates[1], snapshot(-1.0))
+    series = load_breadth(store)
+    assert series[series["market"] == "ALL"]["ad_line"].tolist() == [1, 0, 1]
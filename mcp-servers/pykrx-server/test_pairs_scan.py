@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+페어 스캐너 통계/캐시 테스트 (합성 로그 가격, pykrx 없이 실행)
+"""
+
+import os
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+import pairs_scan
+from pairs_scan import PairsScanner, pair_statistics
+
+
+def random_walk(rng: np.random.Generator, n: int) -> np.ndarray:
+    return np.log(100) + np.cumsum(rng.normal(0, 0.02, n))
+
+
+def test_cointegrated_pair_is_significant_with_finite_half_life():
+    rng = np.random.default_rng(7)
+    x = random_walk(rng, 250)
+    # AR(1) 스프레드 (phi=0.5 -> 반감기 약 1거래일)
+    spread = np.zeros(250)
+    for t in range(1, 250):
+        spread[t] = 0.5 * spread[t - 1] + rng.normal(0, 0.01)
+    y = 0.3 + 1.2 * x + spread
+
+    stats = pair_statistics(y, x)
+    assert abs(stats["hedge_ratio"] - 1.2) < 0.1
+    assert stats["adf_stat"] <= pairs_scan.EG_CRITICAL_VALUES[0][1]
+    assert 0 < stats["half_life"] < 5
+
+
+def test_independent_random_walks_are_rarely_significant():
+    # 독립 랜덤워크 쌍은 5% 유의수준에서 약 5%만 (우연히) 공적분으로 판정되어야 함
+    rng = np.random.default_rng(11)
+    stats = [pair_statistics(random_walk(rng, 250), random_walk(rng, 250)) for _ in range(100)]
+    levels = [pairs_scan._significance(s["adf_stat"]) for s in stats]
+    assert sum(level in ("1%", "5%") for level in levels) <= 10
+
+
+def test_short_overlap_returns_nan():
+    y = np.full(40, np.nan)
+    y[-10:] = 1.0
+    stats = pair_statistics(y, np.arange(40, dtype="float64"))
+    assert np.isnan(stats["adf_stat"])
+
+
+def fake_store(tmp_path):
+    rng = np.random.default_rng(0)
+    prices = pd.DataFrame(np.exp(np.column_stack([random_walk(rng, 60) for _ in range(3)])),
+                          columns=["A", "B", "C"])
+    return SimpleNamespace(data_dir=tmp_path, latest_date=lambda: "20240614",
+                           load_panel=lambda field, end_date, lookback: prices)
+
+
+def test_memory_cache_is_bounded_and_old_files_pruned(tmp_path, monkeypatch):
+    monkeypatch.setattr(pairs_scan, "MEMORY_CACHE_SIZE", 2)
+    store = fake_store(tmp_path)
+    stale = tmp_path / "pairs" / "stale.pkl"
+    stale.parent.mkdir()
+    stale.write_bytes(b"")
+    old = time.time() - (pairs_scan.CACHE_RETENTION_DAYS + 1) * 86400
+    os.utime(stale, (old, old))
+
+    scanner = PairsScanner(store)
+    assert not stale.exists()
+    for end_date in ["20240612", "20240613", "20240614"]:
+        scanner.scan(["A", "B", "C"], window=60, end_date=end_date)
+    assert len(scanner._memory) == 2
+    assert len(list((tmp_path / "pairs").glob("*.pkl"))) == 3
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+일봉 리샘플링 테스트 (pykrx 없이 합성 일봉 사용)
+"""
+
+import numpy as np
+import pandas as pd
+
+from price_bars import resample_ohlcv
+
+
+def synthetic_daily(days: int) -> pd.DataFrame:
+    index = pd.bdate_range("2024-01-02", periods=days, name="날짜")
+    close = 10000 + np.arange(days, dtype="float64") * 10
+    return pd.DataFrame({
+        "시가": close - 5, "고가": close + 20, "저가": close - 20, "종가": close,
+        "거래량": np.full(days, 100), "등락률": np.full(days, 0.1),
+    }, index=index)
+
+
+def test_custom_bars_are_anchored_at_latest_session():
+    daily = synthetic_daily(130)
+    bars = resample_ohlcv(daily, "custom", bars=20)
+
+    assert len(bars) == 7
+    assert bars.index.is_monotonic_increasing
+    assert bars.index[-1] == daily.index[-1]
+    # 최신 봉은 정확히 20거래일, 모자라는 10거래일은 가장 오래된 봉
+    last_span = daily.loc[daily.index > bars.index[-2]]
+    assert len(last_span) == 20
+    assert bars["거래량"].iloc[-1] == 20 * 100
+    assert bars["거래량"].iloc[0] == 10 * 100
+    assert bars["시가"].iloc[-1] == last_span["시가"].iloc[0]
+
+
+def test_custom_bars_divisible_length():
+    bars = resample_ohlcv(synthetic_daily(60), "custom", bars=20)
+    assert list(bars["거래량"]) == [2000, 2000, 2000]
+
+
+if __name__ == "__main__":
+    test_custom_bars_are_anchored_at_latest_session()
+    test_custom_bars_divisible_length()
+    print("OK")
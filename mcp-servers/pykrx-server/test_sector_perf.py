@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+업종 지수 성과 기준일 검증 테스트 (pykrx 없이 합성 스냅샷 사용)
+"""
+
+import tempfile
+
+import pandas as pd
+
+import sector_perf
+from market_store import MarketStore
+
+
+def write_snapshot(store: MarketStore, date: str, close: float) -> None:
+    frame = pd.DataFrame({"시장": ["KOSPI"], "시가": [close], "종가": [close], "등락률": [0.0],
+                          "거래량": [1], "거래대금": [1]}, index=pd.Index(["전기전자"], name="지수명"))
+    frame.to_pickle(sector_perf._sector_path(store, date))
+
+
+def run(dates, today="20240617", monkeypatch=None):
+    store = MarketStore(tempfile.mkdtemp())
+    for i, d in enumerate(dates):
+        write_snapshot(store, d, 100.0 + i)
+    write_snapshot(store, today, 200.0)
+    fetched = []
+
+    def fake_fetch(store, period, date, market):
+        fetched.append(period)
+        return pd.Series({"전기전자": -1.0})
+
+    monkeypatch.setattr(sector_perf, "_fetch_period_change", fake_fetch)
+    return sector_perf.sector_performance(store, today), fetched
+
+
+def test_complete_history_uses_stored_bases(monkeypatch):
+    dates = [d.strftime("%Y%m%d") for d in pd.bdate_range(end="2024-06-14", periods=70)]
+    result, fetched = run(dates + ["20231229"], monkeypatch=monkeypatch)
+    assert fetched == []
+    # 1D 기준은 직전 거래일 종가 (마지막 저장값 100 + 69)
+    assert round(result.loc["전기전자", "1D"], 6) == round((200 / 169 - 1) * 100, 6)
+
+
+def test_gaps_and_stale_year_end_fall_back_to_period_fetch(monkeypatch):
+    # 최근 5거래일은 저장됐지만 그 이전은 두 달 공백, 전년도 스냅샷은 11월
+    recent = [d.strftime("%Y%m%d") for d in pd.bdate_range(end="2024-06-14", periods=5)]
+    old = [d.strftime("%Y%m%d") for d in pd.bdate_range(end="2024-05-01", periods=40)]
+    result, fetched = run(["20231115"] + old + recent, monkeypatch=monkeypatch)
+    assert "1D" not in fetched and "1W" not in fetched
+    assert set(fetched) == {"1M", "3M", "YTD"}
+    assert result.loc["전기전자", "YTD"] == -1.0
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+공유 스냅샷 게시/연결 테스트 (pykrx 없이 합성 스냅샷 사용)
+"""
+
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import shared_snapshot
+from market_store import MarketStore
+
+DATE = "20240614"
+
+
+def synthetic_snapshot(close_offset: int = 0) -> pd.DataFrame:
+    tickers = ["005930", "000660", "035420"]
+    return pd.DataFrame({
+        "종목명": ["삼성전자", "SK하이닉스", "NAVER"],
+        "시장": ["KOSPI"] * 3,
+        "종가": np.array([70000, 180000, 170000]) + close_offset,
+        "PER": [12.5, 20.1, 30.2],
+    }, index=pd.Index(tickers, name="티커"))
+
+
+def publish(store: MarketStore, frame: pd.DataFrame) -> int:
+    frame.to_pickle(store.snapshot_path(DATE))
+    store._cache.pop(DATE, None)
+    compact = store.load_compact(DATE)
+    store.master.save()
+    return shared_snapshot.publish(compact, DATE, store.data_dir / "shared")
+
+
+def test_reader_store_loads_latest_session_from_mmap():
+    data_dir = tempfile.mkdtemp()
+    publisher = MarketStore(data_dir)
+    assert publish(publisher, synthetic_snapshot()) == 1
+
+    reader = MarketStore(data_dir)
+    shared = shared_snapshot.attach(reader)
+    assert shared.attached and shared.version == 1
+
+    compact = reader.load_compact(DATE)
+    assert isinstance(compact.columns["종가"], np.ndarray)
+    assert not compact.columns["종가"].flags.writeable  # mmap 뷰 (복사 아님)
+    frame = reader.load_snapshot(DATE)
+    assert list(frame.index) == ["005930", "000660", "035420"]
+    assert frame.loc["000660", "종목명"] == "SK하이닉스"
+    assert frame.loc["005930", "종가"] == 70000
+
+
+def test_republish_uses_new_file_and_swaps_pointer():
+    data_dir = tempfile.mkdtemp()
+    store = MarketStore(data_dir)
+    publish(store, synthetic_snapshot())
+    reader = shared_snapshot.SharedSnapshot(store.data_dir / "shared")
+    first_file = reader._name
+
+    for offset in (100, 200, 300):
+        publish(store, synthetic_snapshot(offset))
+    assert reader.refresh()
+    assert reader.version == 4 and reader._name != first_file
+    assert int(reader.column("종가")[0]) == 70300
+
+    # 오래된 버전 파일은 정리되고 포인터는 최신 버전을 가리킴
+    files = sorted(p.name for p in (store.data_dir / "shared").glob("snapshot.*.bin"))
+    assert files == ["snapshot.00000003.bin", "snapshot.00000004.bin"]
+    assert shared_snapshot.current_name(store.data_dir / "shared") == "snapshot.00000004.bin"
+
+
+def test_reader_without_publication_stays_detached():
+    store = MarketStore(tempfile.mkdtemp())
+    shared = shared_snapshot.attach(store)
+    assert not shared.attached and not shared.refresh()